@@ -0,0 +1,110 @@
+"""
+OpenAPI schema 設定。
+
+schema 只在部署時 (manage.py generate_swagger) 或每個行程第一次被請求時產生一次，
+之後直接回傳同一份內容並以 ETag 回應 304。
+
+部署時產生靜態檔：
+    python manage.py generate_swagger --overwrite --url https://<host> openapi.json
+"""
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from drf_yasg import openapi
+from drf_yasg.renderers import OpenAPIRenderer, SwaggerJSONRenderer
+from drf_yasg.views import get_schema_view
+
+
+api_info = openapi.Info(
+    title="司律考題題庫系統 API",
+    default_version='v1',
+    description="提供題庫、考試、快閃卡、使用者管理等功能的 RESTful API",
+    contact=openapi.Contact(email="admin@exambank.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+
+class PrebuiltSchema:
+    """
+    行程內保存的 schema 內容：優先讀取 OPENAPI_SCHEMA_PATH 靜態檔，沒有時產生一次後重複使用
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generated = {}
+        self.artifact = None
+        self.artifact_mtime = None
+
+    def load_artifact(self):
+        """回傳靜態檔的 (JSON bytes, ETag)，檔案不存在時回傳 None"""
+        path = getattr(settings, "OPENAPI_SCHEMA_PATH", None)
+        if not path or not os.path.exists(path):
+            return None
+        mtime = os.path.getmtime(path)
+        if self.artifact is None or mtime != self.artifact_mtime:
+            with self.lock, open(path, "rb") as f:
+                self.artifact = _with_etag(f.read())
+                self.artifact_mtime = mtime
+        return self.artifact
+
+    def get(self, key, generate):
+        result = self.generated.get(key)
+        if result is None:
+            with self.lock:
+                result = self.generated.get(key)
+                if result is None:
+                    result = self.generated[key] = _with_etag(generate())
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.generated.clear()
+            self.artifact = self.artifact_mtime = None
+
+
+def _with_etag(content):
+    return content, f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+prebuilt_schema = PrebuiltSchema()
+
+
+def get_prebuilt_schema_view(url=None, **kwargs):
+    # schema 的 host 取自設定的 OPENAPI_BASE_URL，未設定時不輸出 host (即提供文件的主機)，
+    # 不使用請求的 Host 標頭，快取內容不會因請求而不同
+    url = url or getattr(settings, "OPENAPI_BASE_URL", "")
+    base_view = get_schema_view(api_info, url=url, **kwargs)
+
+    class PrebuiltSchemaView(base_view):
+        def get(self, request, version="", format=None):
+            renderer = request.accepted_renderer
+            codec_class = getattr(renderer, "codec_class", None)
+            if codec_class is None:
+                # Swagger UI / ReDoc 頁面本身不含 API 定義，不需快取
+                return super().get(request, version, format)
+
+            artifact = None
+            if isinstance(renderer, (SwaggerJSONRenderer, OpenAPIRenderer)):
+                artifact = prebuilt_schema.load_artifact()
+            if artifact is None:
+                version = request.version or version
+                artifact = prebuilt_schema.get(
+                    (version, url, renderer.format),
+                    lambda: codec_class(renderer.validators).encode(
+                        super(PrebuiltSchemaView, self).get(request, version, format).data
+                    ),
+                )
+
+            content, etag = artifact
+            if request.headers.get("If-None-Match") == etag:
+                response = HttpResponseNotModified()
+            else:
+                response = HttpResponse(content, content_type=renderer.media_type)
+            response["ETag"] = etag
+            patch_cache_control(response, public=True, no_cache=True)
+            return response
+
+    return PrebuiltSchemaView
@@ -45,6 +45,7 @@ INSTALLED_APPS = [
 
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'drf_yasg',
     'django_filters',
     'corsheaders',
@@ -56,9 +57,11 @@ INSTALLED_APPS = [
     'users',
     'exams',
     'flashcards',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -67,6 +70,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'monitoring.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'ExamQuestionBank.urls'
@@ -164,7 +168,8 @@ CORS_ALLOW_CREDENTIALS = True
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # 使用者資料快取於共用快取，每個請求不查詢 users 資料表
+        'users.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -190,9 +195,41 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    # 由 token_blacklist 記錄；過期的紀錄以 manage.py flushexpiredtokens 清除
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Cache Settings
+# 多個 worker 需共用版本戳記與排行榜時請設定 REDIS_URL (未設定時排行榜存於行程記憶體，僅供開發與測試)
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'OPTIONS': {
+                'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            },
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# 行程內考試目錄檢查共用版本戳記的間隔 (秒)
+CATALOG_VERSION_CHECK_INTERVAL = float(os.getenv('CATALOG_VERSION_CHECK_INTERVAL', '1.0'))
+
+# API Documentation Settings
+SWAGGER_SETTINGS = {
+    'DEFAULT_INFO': 'ExamQuestionBank.openapi.api_info',
+}
+# schema 中 API 的 host 與 scheme (例如 https://api.example.com)，未設定時不輸出 host
+OPENAPI_BASE_URL = os.getenv('OPENAPI_BASE_URL', '')
+# manage.py generate_swagger 產生的靜態 schema，不存在時於第一次請求時產生
+OPENAPI_SCHEMA_PATH = os.getenv('OPENAPI_SCHEMA_PATH', os.path.join(BASE_DIR, 'openapi.json'))
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -201,3 +238,41 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
     'guardian.backends.ObjectPermissionBackend',
 ]
+
+# History Archive Settings
+HISTORY_ARCHIVE_ROOT = os.getenv('HISTORY_ARCHIVE_ROOT', os.path.join(BASE_DIR, 'archive'))
+HISTORY_ARCHIVE_AFTER_DAYS = int(os.getenv('HISTORY_ARCHIVE_AFTER_DAYS', '365'))
+
+# PDF Extraction Settings
+# 上傳檔一律寫入暫存檔，PDFParser 直接由路徑讀取，不在記憶體中保留整份檔案
+FILE_UPLOAD_HANDLERS = ['django.core.files.uploadhandler.TemporaryFileUploadHandler']
+FILE_UPLOAD_TEMP_DIR = os.getenv('FILE_UPLOAD_TEMP_DIR') or None
+# ASGI 端點解析 PDF 使用的 executor：thread 或 process
+PDF_EXECUTOR = os.getenv('PDF_EXECUTOR', 'thread')
+PDF_EXECUTOR_WORKERS = int(os.getenv('PDF_EXECUTOR_WORKERS', '2'))
+# 每個行程同時轉換的 PDF 數量上限 (全部 / 每位使用者)，超過時排隊，佇列滿或逾時回應 429
+PDF_ADMISSION_MAX_CONCURRENT = int(os.getenv('PDF_ADMISSION_MAX_CONCURRENT', '2'))
+PDF_ADMISSION_PER_USER = int(os.getenv('PDF_ADMISSION_PER_USER', '1'))
+PDF_ADMISSION_QUEUE_SIZE = int(os.getenv('PDF_ADMISSION_QUEUE_SIZE', '8'))
+PDF_ADMISSION_TIMEOUT = float(os.getenv('PDF_ADMISSION_TIMEOUT', '30'))
+
+# Question Bank Settings
+# 近似重複題的相似度門檻 (MinHash 估計的 Jaccard 相似度)
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.7'))
+# 整份試卷包 (gzip JSON) 的存放目錄；設定 PAPER_BUNDLE_URL 時由前端伺服器或 CDN 提供檔案，
+# API 轉址到 <PAPER_BUNDLE_URL><檔名>，檔名含內容雜湊，可設定長期快取
+PAPER_BUNDLE_DIR = os.getenv('PAPER_BUNDLE_DIR', os.path.join(BASE_DIR, 'bundles'))
+PAPER_BUNDLE_URL = os.getenv('PAPER_BUNDLE_URL', '')
+# 排行榜：作答題數達此門檻才列入正確率排行；每週排行保留的過去週數
+LEADERBOARD_MIN_ATTEMPTS = int(os.getenv('LEADERBOARD_MIN_ATTEMPTS', '20'))
+LEADERBOARD_WEEKS_KEPT = int(os.getenv('LEADERBOARD_WEEKS_KEPT', '1'))
+
+# Monitoring Settings
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'False') == 'True'
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Profiling Settings
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+PROFILING_SAMPLE_RATE = int(os.getenv('PROFILING_SAMPLE_RATE', '0'))  # 每 N 個請求抽樣一次，0 為不抽樣
+PROFILING_DIR = os.getenv('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_PROFILES = int(os.getenv('PROFILING_MAX_PROFILES', '50'))
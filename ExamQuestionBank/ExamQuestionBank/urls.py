@@ -8,18 +8,12 @@ from django.conf.urls.static import static
 
 from rest_framework import permissions
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-
-schema_view = get_schema_view(
-   openapi.Info(
-      title="司律考題題庫系統 API",
-      default_version='v1',
-      description="提供題庫、考試、快閃卡、使用者管理等功能的 RESTful API",
-      contact=openapi.Contact(email="admin@exambank.com"),
-      license=openapi.License(name="MIT License"),
-   ),
+
+from users.views import LogoutView
+from .openapi import get_prebuilt_schema_view
+
+
+schema_view = get_prebuilt_schema_view(
    public=True,
    permission_classes=(permissions.AllowAny,),
 )
@@ -36,10 +30,17 @@ urlpatterns = [
     # JWT Authentication
     path('api/v1/auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/v1/auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/v1/auth/logout/', LogoutView.as_view(), name='token_logout'),
 
    # Question Bank URLs
     path("api/question_bank/", include("question_bank.urls")),
 
+    # Exam Catalog URLs
+    path("api/exams/", include("exams.urls")),
+
+    # Monitoring URLs
+    path("api/monitoring/", include("monitoring.urls")),
+
     # App URLs (to be created)
     # path('api/v1/', include('users.urls')),
     # path('api/v1/', include('exams.urls')),
@@ -0,0 +1,52 @@
+"""
+Benchmark 共用設定：以記憶體內 SQLite 啟動 Django，不需連線 SQL Server。
+
+用法 (於 ExamQuestionBank/ 目錄下)：
+    python benchmarks/bench_xxx.py
+"""
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOCAL_APPS = ["question_bank", "users", "exams", "flashcards", "monitoring"]
+
+
+def setup_django(database=":memory:", **overrides):
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "ExamQuestionBank.settings")
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["*"]
+    settings.DATABASES = {
+        "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": database},
+    }
+    # 直接依模型建立資料表
+    settings.MIGRATION_MODULES = {app: None for app in LOCAL_APPS}
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def create_catalog():
+    from exams.models import ExamSeries, ExamSession, Subject
+
+    series = ExamSeries.objects.create(name="律師", code="LAWYER")
+    session = ExamSession.objects.create(exam_series=series, year=2024, session_number=1, is_published=True)
+    subject = Subject.objects.create(name="民法", code="CIVIL")
+    return series, session, subject
+
+
+def create_user(username="bench", **extra):
+    from users.models import User
+
+    return User.objects.create_user(
+        username=username, email=f"{username}@example.com", password="bench-password", **extra
+    )
@@ -0,0 +1,201 @@
+"""
+產生 benchmark 用的合成試卷 / 答案 PDF (不需外部套件)。
+
+使用 Identity-H 編碼的 Type0 字型並附 ToUnicode 對照表，不嵌入字形；
+pdfplumber 只依對照表與字寬取出文字與座標，因此可直接放入中文與選項符號。
+"""
+import os
+import zlib
+
+OPTION_MARKS = ["\ue18c", "\ue18d", "\ue18e", "\ue18f"]
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+
+class FixturePDF:
+    def __init__(self, width=PAGE_WIDTH, height=PAGE_HEIGHT):
+        self.width = width
+        self.height = height
+        self.pages = []
+        self.cids = {}
+        self.padding = 0
+
+    def new_page(self):
+        self.pages.append([])
+
+    def text(self, x, top, text, size=10):
+        """以 pdfplumber 的座標 (由頁面上緣算起的 top) 放置一段文字，每個字寬等於字級"""
+        codes = "".join(f"{self.cid(ch):04X}" for ch in text)
+        baseline = self.height - top - size * 0.88
+        self.pages[-1].append(f"BT /F1 {size} Tf 1 0 0 1 {x:.2f} {baseline:.2f} Tm <{codes}> Tj ET")
+
+    def line(self, x0, top0, x1, top1):
+        self.pages[-1].append(
+            f"{x0:.2f} {self.height - top0:.2f} m {x1:.2f} {self.height - top1:.2f} l S"
+        )
+
+    def cid(self, ch):
+        if ch not in self.cids:
+            self.cids[ch] = len(self.cids) + 1
+        return self.cids[ch]
+
+    def to_bytes(self):
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        descriptor = add(
+            b"<< /Type /FontDescriptor /FontName /Fixture /Flags 4 /FontBBox [0 -120 1000 880] "
+            b"/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 700 /StemV 80 >>"
+        )
+        cid_font = add(
+            b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Fixture "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            b"/FontDescriptor %d 0 R /DW 1000 /CIDToGIDMap /Identity >>" % descriptor
+        )
+        to_unicode = add(_stream(self.to_unicode_cmap()))
+        font = add(
+            b"<< /Type /Font /Subtype /Type0 /BaseFont /Fixture /Encoding /Identity-H "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (cid_font, to_unicode)
+        )
+
+        kids = []
+        for operations in self.pages:
+            contents = add(_stream("\n".join(operations).encode("ascii")))
+            kids.append(add(
+                b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                % (pages, self.width, self.height, font, contents)
+            ))
+
+        if self.padding:
+            # 模擬嵌入字型、掃描影像等大型物件 (解析文字時不會讀取)
+            add(b"<< /Length %d >>\nstream\n%s\nendstream" % (self.padding, os.urandom(self.padding)))
+
+        objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages
+        objects[pages - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)
+        )
+
+        output = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(output))
+            output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(output)
+        output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            output += b"%010d 00000 n \n" % offset
+        output += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1, catalog, xref
+        )
+        return bytes(output)
+
+    def to_unicode_cmap(self):
+        entries = sorted(self.cids.items(), key=lambda item: item[1])
+        lines = [
+            "/CIDInit /ProcSet findresource begin",
+            "12 dict begin",
+            "begincmap",
+            "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+            "/CMapName /Fixture-UCS def",
+            "/CMapType 2 def",
+            "1 begincodespacerange <0000> <FFFF> endcodespacerange",
+        ]
+        for start in range(0, len(entries), 100):
+            chunk = entries[start:start + 100]
+            lines.append(f"{len(chunk)} beginbfchar")
+            lines.extend(f"<{cid:04X}> <{ord(ch):04X}>" for ch, cid in chunk)
+            lines.append("endbfchar")
+        lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+        return "\n".join(lines).encode("ascii")
+
+
+def _stream(data):
+    compressed = zlib.compress(data)
+    return b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(compressed), compressed)
+
+
+def question_paper(question_count=80, code="1101", padding=0):
+    """
+    依 PDFParser.parse_questions 的版面產生選擇題試卷：
+    第一頁上方 205pt 為標題與注意事項，題號位於 x < 55，選項以私用區符號開頭，
+    第二頁起每頁有「代號」與「頁次」頁首。padding 為額外加入的大型物件位元組數。
+    """
+    pdf = FixturePDF()
+    pdf.padding = padding
+    size, line_height, bottom = 11, 16, PAGE_HEIGHT - 50
+    top = None
+    page_count = 0
+
+    def new_page():
+        nonlocal top, page_count
+        pdf.new_page()
+        page_count += 1
+        if page_count == 1:
+            pdf.text(200, 60, "一一三年專門職業及技術人員高等考試", size=14)
+            pdf.text(60, 120, "※注意：本試題為單一選擇題，請選出一個正確或最適當的答案。", size=size)
+            pdf.text(60, 150, "禁止使用電子計算器。", size=size)
+            top = 210
+        else:
+            pdf.text(60, 30, f"代號：{code}", size=9)
+            pdf.text(450, 30, f"頁次：4－{page_count}", size=9)
+            top = 60
+
+    new_page()
+    for number in range(1, question_count + 1):
+        if top + line_height * 6 > bottom:
+            new_page()
+        pdf.text(40, top, str(number), size=size)
+        pdf.text(60, top, f"關於民法第{number}條之規定，下列敘述何者正確？", size=size)
+        top += line_height
+        pdf.text(60, top, f"依據題幹所述之法律關係與實務見解，第{number}題請選擇最適當之選項：", size=size)
+        top += line_height
+        for index, mark in enumerate(OPTION_MARKS):
+            pdf.text(60, top, f"{mark}選項內容{number}之{index + 1}，債權人得請求損害賠償", size=size)
+            top += line_height
+        top += 4
+    return pdf.to_bytes()
+
+
+def answer_sheet(question_count=80, per_row=20, voided=(3,), rows_per_page=12):
+    """
+    依 PDFParser.parse_answers 的版面產生答案 PDF：
+    每 per_row 題一個「題號 / 答案」兩列表格 (一律給分的題目答案為 #)，
+    每頁最多 rows_per_page 個表格，最後一頁下方為「備 註：」更正說明。
+    """
+    pdf = FixturePDF()
+    labels = "ABCD"
+    left, label_width, cell_width, row_height = 40, 40, 25, 20
+    top = None
+    for table_index, start in enumerate(range(1, question_count + 1, per_row)):
+        if table_index % rows_per_page == 0:
+            pdf.new_page()
+            pdf.text(180, 40, "一一三年專門職業及技術人員高等考試 測驗式試題標準答案", size=12)
+            top = 80
+        numbers = list(range(start, min(start + per_row, question_count + 1)))
+        width = label_width + cell_width * len(numbers)
+        for row in range(3):
+            pdf.line(left, top + row * row_height, left + width, top + row * row_height)
+        pdf.line(left, top, left, top + 2 * row_height)
+        for column in range(len(numbers) + 1):
+            x = left + label_width + column * cell_width
+            pdf.line(x, top, x, top + 2 * row_height)
+
+        pdf.text(left + 4, top + 5, "題號", size=9)
+        pdf.text(left + 4, top + row_height + 5, "答案", size=9)
+        for column, number in enumerate(numbers):
+            x = left + label_width + column * cell_width
+            pdf.text(x + 2, top + 5, f"第{number}題", size=4)
+            answer = "#" if number in voided else labels[(number * 7) % 4]
+            pdf.text(x + 9, top + row_height + 5, answer, size=9)
+        top += 2 * row_height + 20
+
+    if voided:
+        note = "、".join(f"第{number}題" for number in voided)
+        pdf.text(left, top + 20, f"備 註： {note}一律給分。", size=10)
+    return pdf.to_bytes()
@@ -0,0 +1,105 @@
+"""
+依答對率排序：在 Python 計算後排序與資料庫計算欄位 (Question.accuracy_rate，已建立索引) 的比較。
+
+建立 --questions 題 (平均分配到 --subjects 個科目)，量測「某科目作答 MIN_ATTEMPTS 次以上最難的 20 題」：
+- Python：載入該科目所有題目，以作答與答對次數計算答對率後排序 (原本 accuracy_rate 為 property 時的作法)
+- 資料庫：filter(subject, attempt_count__gte).order_by("accuracy_rate")[:20]
+並輸出 SQLite 的查詢計畫，確認排序使用 (subject, accuracy_rate) 索引而非暫存排序。
+
+用法：
+    python benchmarks/bench_accuracy_ordering.py [--questions 200000] [--subjects 10]
+"""
+import argparse
+import random
+import time
+
+from _bootstrap import setup_django
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+
+from exams.models import ExamSeries, ExamSession, Subject  # noqa: E402
+from question_bank.models import Question  # noqa: E402
+
+TOP = 20
+MIN_ATTEMPTS = 10
+BATCH_SIZE = 5000
+
+
+def accuracy(question):
+    if question.attempt_count == 0:
+        return 0
+    return round((question.correct_count / question.attempt_count) * 100, 2)
+
+
+def measure(label, function, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        result = function()
+    elapsed = (time.perf_counter() - started) / rounds
+    print(f"  {label:<6} {elapsed * 1000:9.2f} ms/次")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=200000)
+    parser.add_argument("--subjects", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    series = ExamSeries.objects.create(name="律師", code="LAWYER")
+    session = ExamSession.objects.create(exam_series=series, year=2024, session_number=1, is_published=True)
+    subjects = Subject.objects.bulk_create([
+        Subject(name=f"科目 {number}", code=f"S{number}") for number in range(args.subjects)
+    ])
+    subject_ids = list(Subject.objects.order_by("id").values_list("id", flat=True))
+
+    started = time.perf_counter()
+    for start in range(0, args.questions, BATCH_SIZE):
+        questions = []
+        for number in range(start, min(start + BATCH_SIZE, args.questions)):
+            attempts = rng.randint(0, 200)
+            questions.append(Question(
+                exam_session=session, subject_id=subject_ids[number % len(subjects)],
+                question_number=str(number + 1), content=f"題目 {number}", status="published",
+                attempt_count=attempts, correct_count=rng.randint(0, attempts),
+            ))
+        Question.objects.bulk_create(questions)
+    print(f"建立 {args.questions} 題：{time.perf_counter() - started:.1f} 秒")
+
+    subject_id = subject_ids[0]
+
+    def in_python():
+        questions = Question.objects.filter(subject_id=subject_id, attempt_count__gte=MIN_ATTEMPTS)
+        return [question.id for question in sorted(questions, key=accuracy)[:TOP]]
+
+    queryset = (
+        Question.objects.filter(subject_id=subject_id, attempt_count__gte=MIN_ATTEMPTS)
+        .order_by("accuracy_rate", "id")
+    )
+
+    def in_database():
+        return list(queryset.values_list("id", flat=True)[:TOP])
+
+    print(f"科目 (約 {args.questions // len(subjects)} 題) 中最難的 {TOP} 題：")
+    before, expected = measure("Python", in_python, args.rounds)
+    after, result = measure("資料庫", in_database, args.rounds)
+    assert sorted(accuracy(question) for question in Question.objects.filter(id__in=expected)) == sorted(
+        accuracy(question) for question in Question.objects.filter(id__in=result)
+    )
+    print(f"  加速 {before / after:.0f} 倍")
+
+    sql, params = queryset[:TOP].query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        print("查詢計畫：")
+        for row in cursor.fetchall():
+            print(f"  {row[-1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+比較答案 PDF 的兩種解析方式：文字座標 (words) 與 pdfplumber 表格偵測 (tables)，
+並確認兩者在各種合成答案卷上取得相同的答案與備註。
+
+用法：
+    python benchmarks/bench_answer_extraction.py [--rounds 5]
+"""
+import argparse
+import time
+
+from _bootstrap import setup_django
+from _pdf_fixtures import answer_sheet
+
+setup_django()
+
+from question_bank.services.pdf_parser import PDFParser  # noqa: E402
+
+FIXTURES = {
+    "80 題": dict(question_count=80),
+    "50 題 (不滿一列)": dict(question_count=50, voided=(7, 49)),
+    "100 題 無備註": dict(question_count=100, voided=()),
+    "400 題 多頁": dict(question_count=400, rows_per_page=6, voided=(12, 250, 399)),
+}
+
+
+def best_of(rounds, func):
+    best = None
+    result = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    mismatches = 0
+    for name, options in FIXTURES.items():
+        content = answer_sheet(**options)
+        timings = {}
+        results = {}
+        for engine in ("words", "tables"):
+            timings[engine], results[engine] = best_of(
+                args.rounds, lambda: PDFParser.parse_answers(_stream(content), engine=engine)
+            )
+        same = results["words"] == results["tables"]
+        mismatches += not same
+        print(
+            f"{name:16s} {len(results['words']['answers']):4d} 題  "
+            f"words {timings['words'] * 1000:8.1f}ms  tables {timings['tables'] * 1000:8.1f}ms  "
+            f"x{timings['tables'] / timings['words']:5.1f}  {'相同' if same else '不一致'}"
+        )
+    if mismatches:
+        raise SystemExit(f"{mismatches} 份答案卷的結果不一致")
+
+
+def _stream(content):
+    import io
+
+    return io.BytesIO(content)
+
+
+if __name__ == "__main__":
+    main()
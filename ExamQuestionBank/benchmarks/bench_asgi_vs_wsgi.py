@@ -0,0 +1,150 @@
+"""
+比較 PDF 上傳尖峰時，WSGI (同步 view、固定 worker 執行緒) 與 ASGI (async view + PDF executor)
+下一般 API 請求的延遲與吞吐量。
+
+模擬方式 (同一行程內，不需啟動伺服器)：
+    - 數個上傳者持續上傳合成試卷 PDF，同時數個一般使用者持續讀取考試場次列表。
+    - WSGI：所有請求共用 --wsgi-threads 個 worker 執行緒 (相當於 gunicorn --threads)。
+    - ASGI：請求在同一個事件迴圈上處理，PDF 解析交給 PDF_EXECUTOR_WORKERS 個 executor worker。
+
+實際伺服器比較可用 loadtest 指令分別對 gunicorn 與 uvicorn 執行
+pdf.extract_questions / pdf.extract_questions_async 與 catalog 流程。
+
+用法：
+    python benchmarks/bench_asgi_vs_wsgi.py [--executor thread|process]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import threading
+import time
+
+from _bootstrap import setup_django, create_catalog, create_user
+from _pdf_fixtures import question_paper
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--uploaders", type=int, default=4)
+parser.add_argument("--uploads-each", type=int, default=3)
+parser.add_argument("--readers", type=int, default=8)
+parser.add_argument("--questions", type=int, default=120, help="每份試卷題數")
+parser.add_argument("--wsgi-threads", type=int, default=4)
+parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+parser.add_argument("--executor-workers", type=int, default=2)
+args = parser.parse_args()
+
+database = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+setup_django(
+    database=database,
+    PDF_EXECUTOR=args.executor,
+    PDF_EXECUTOR_WORKERS=args.executor_workers,
+)
+
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.test import AsyncClient, Client  # noqa: E402
+from rest_framework_simplejwt.tokens import AccessToken  # noqa: E402
+
+from monitoring.loadtest import percentile  # noqa: E402
+from question_bank.services.pdf_executor import shutdown_executor  # noqa: E402
+
+SYNC_PATH = "/api/question_bank/extract-questions-pdf/"
+ASYNC_PATH = "/api/question_bank/async/extract-questions-pdf/"
+READ_PATH = "/api/exams/sessions/"
+
+create_catalog()
+TOKEN = f"Bearer {AccessToken.for_user(create_user())}"
+PDF = question_paper(args.questions)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reads = []
+        self.uploads = []
+        self.stop = False
+
+    def report(self, label, elapsed):
+        reads = sorted(self.reads)
+        uploads = sorted(self.uploads)
+        print(
+            f"{label:5s} 總時間 {elapsed:6.2f}s | 讀取 {len(reads):5d} 次 "
+            f"{len(reads) / elapsed:7.1f} req/s p50 {percentile(reads, 0.5) * 1000:7.1f}ms "
+            f"p95 {percentile(reads, 0.95) * 1000:7.1f}ms | "
+            f"上傳 {len(uploads)} 份 p50 {percentile(uploads, 0.5):5.2f}s max {uploads[-1]:5.2f}s"
+        )
+
+
+def run_wsgi():
+    stats = Stats()
+    workers = threading.Semaphore(args.wsgi_threads)
+
+    def request(method, *request_args, **kwargs):
+        client = Client(headers={"Authorization": TOKEN})
+        with workers:
+            response = getattr(client, method)(*request_args, **kwargs)
+        assert response.status_code == 200, response.status_code
+
+    def uploader():
+        for _ in range(args.uploads_each):
+            start = time.perf_counter()
+            request("post", SYNC_PATH, {"file": SimpleUploadedFile("questions.pdf", PDF)})
+            with stats.lock:
+                stats.uploads.append(time.perf_counter() - start)
+
+    def reader():
+        while not stats.stop:
+            start = time.perf_counter()
+            request("get", READ_PATH)
+            with stats.lock:
+                stats.reads.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    uploaders = [threading.Thread(target=uploader) for _ in range(args.uploaders)]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in uploaders + readers:
+        thread.start()
+    for thread in uploaders:
+        thread.join()
+    stats.stop = True
+    for thread in readers:
+        thread.join()
+    stats.report("WSGI", time.perf_counter() - started)
+
+
+async def run_asgi():
+    stats = Stats()
+    client = AsyncClient()
+    headers = {"Authorization": TOKEN}
+
+    async def uploader():
+        for _ in range(args.uploads_each):
+            start = time.perf_counter()
+            response = await client.post(
+                ASYNC_PATH, {"file": SimpleUploadedFile("questions.pdf", PDF)}, headers=headers
+            )
+            assert response.status_code == 200, response.status_code
+            stats.uploads.append(time.perf_counter() - start)
+
+    async def reader():
+        while not stats.stop:
+            start = time.perf_counter()
+            response = await client.get(READ_PATH, headers=headers)
+            assert response.status_code == 200, response.status_code
+            stats.reads.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    readers = [asyncio.create_task(reader()) for _ in range(args.readers)]
+    await asyncio.gather(*(uploader() for _ in range(args.uploaders)))
+    stats.stop = True
+    await asyncio.gather(*readers)
+    stats.report("ASGI", time.perf_counter() - started)
+
+
+print(
+    f"{args.uploaders} 個上傳者 x {args.uploads_each} 份 ({len(PDF) // 1024} KB, {args.questions} 題)，"
+    f"{args.readers} 個讀取者；WSGI {args.wsgi_threads} 執行緒，"
+    f"ASGI executor={args.executor} x {args.executor_workers}"
+)
+run_wsgi()
+asyncio.run(run_asgi())
+shutdown_executor()
@@ -0,0 +1,98 @@
+"""
+自動標籤：Aho-Corasick 自動機與逐一比對標籤名稱 (name in text) 的掃描速度，以及回填的整體吞吐量。
+
+以隨機中文字產生標籤與題目，題目中隨機嵌入標籤名稱與法條引用 (含中文數字與「同法」)；
+逐一比對的耗時與標籤數成正比，自動機只與文字長度成正比。
+
+用法：
+    python benchmarks/bench_auto_tagger.py [--questions 20000] [--tags 5000]
+"""
+import argparse
+import random
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from django.db import transaction  # noqa: E402
+
+from question_bank.models import Question, QuestionOption, QuestionTag, QuestionTagRelation  # noqa: E402
+from question_bank.services import tagger  # noqa: E402
+
+CHARS = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+NUMERALS = ["一百八十四", "二十", "十二", "三百零五"]
+BATCH_SIZE = 1000
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(CHARS) for _ in range(length))
+
+
+def question_content(rng, tag_names):
+    parts = [random_text(rng, rng.randint(20, 60))]
+    for name in rng.sample(tag_names, 2):
+        parts.extend([name, random_text(rng, rng.randint(5, 20))])
+    law = rng.choice(tagger.LAW_NAMES)
+    parts.append(f"依{law}第{rng.choice([str(rng.randint(1, 300)), rng.choice(NUMERALS)])}條")
+    if rng.random() < 0.3:
+        parts.append(f"及同法第{rng.randint(1, 300)}條之1")
+    return "，".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--tags", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    tag_names = list({random_text(rng, rng.randint(2, 6)) for _ in range(args.tags)})
+    QuestionTag.objects.bulk_create([QuestionTag(name=name, category="概念") for name in tag_names])
+    for start in range(0, args.questions, BATCH_SIZE):
+        with transaction.atomic():
+            questions = Question.objects.bulk_create([
+                Question(
+                    exam_session=session, subject=subject, question_number=str(number + 1),
+                    content=question_content(rng, tag_names), analysis=random_text(rng, rng.randint(40, 120)),
+                )
+                for number in range(start, min(start + BATCH_SIZE, args.questions))
+            ])
+            QuestionOption.objects.bulk_create([
+                QuestionOption(question=question, option_label=label, content=random_text(rng, 12), order=order)
+                for question in questions
+                for order, label in enumerate("ABCD")
+            ])
+
+    question_ids = list(Question.objects.order_by("id").values_list("id", flat=True))
+    texts = list(tagger.question_texts(question_ids[:2000]).values())
+    characters = sum(map(len, texts))
+    auto_tagger = tagger.AutoTagger()
+
+    started = time.perf_counter()
+    for text in texts:
+        auto_tagger.tag(text)
+    automaton = time.perf_counter() - started
+    names = [tagger.normalize(name) for name in tag_names]
+    started = time.perf_counter()
+    for text in texts:
+        text = tagger.normalize(text)
+        [name for name in names if name in text]
+    naive = time.perf_counter() - started
+    print(f"{len(names)} 個標籤，掃描 {len(texts)} 題 ({characters} 字)：")
+    print(f"  自動機    {automaton * 1000:8.1f}ms ({characters / automaton:,.0f} 字/秒，含法條解析)")
+    print(f"  逐一比對  {naive * 1000:8.1f}ms ({characters / naive:,.0f} 字/秒，只比對標籤名稱)")
+
+    stats = tagger.backfill(question_ids)
+    print(
+        f"回填 {stats['questions']} 題：新增 {stats['relations']} 個關聯、{stats['tags']} 個法條標籤；"
+        f"建立自動機 {stats['compile_seconds']:.2f} 秒，掃描與寫入 {stats['seconds']:.1f} 秒 "
+        f"({stats['questions'] / stats['seconds']:.0f} 題/秒，{stats['characters'] / stats['seconds']:,.0f} 字/秒)"
+    )
+    print(f"關聯總數 {QuestionTagRelation.objects.count()}，法條標籤 {QuestionTag.objects.filter(category='法條').count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+量測題庫匯出的峰值 RSS 增量：不同題數下各格式的記憶體應大致固定，
+對照組 (list) 則一次把所有題目讀進記憶體。
+
+資料以 generate_dataset 產生於暫存 SQLite 檔，每種格式在獨立子行程中執行。
+
+用法：
+    python benchmarks/bench_export_memory.py [--questions 20000,100000] [--formats list,jsonl,csv,xlsx]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+FORMATS = ["list", "jsonl", "csv", "xlsx"]
+
+
+def peak_rss_mb():
+    # VmHWM 為目前行程映像的 RSS 峰值 (ru_maxrss 會沿用父行程的峰值)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(export_format, database):
+    from _bootstrap import setup_django
+
+    setup_django(database=database)
+
+    from exams.catalog import catalog
+    from question_bank.models import Question
+    from question_bank.services import export
+
+    catalog.get()
+    queryset = Question.objects.order_by("id")
+    before = peak_rss_mb()
+    start = time.perf_counter()
+    size = 0
+    if export_format == "list":
+        rows = list(export.export_rows(queryset))
+        size = len(rows)
+    elif export_format == "xlsx":
+        with export.xlsx_file(export.export_rows(queryset)) as f:
+            size = f.seek(0, os.SEEK_END)
+    else:
+        stream = export.jsonl_stream if export_format == "jsonl" else export.csv_stream
+        for chunk in stream(export.export_rows(queryset)):
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"{size} {elapsed:.2f} {before:.1f} {peak_rss_mb():.1f}")
+
+
+def create_dataset(database, questions):
+    subprocess.run(
+        [sys.executable, __file__, "--generate", database, str(questions)],
+        check=True, capture_output=True,
+    )
+
+
+def generate(database, questions):
+    from _bootstrap import setup_django
+
+    setup_django(database=database)
+
+    from django.core.management import call_command
+
+    call_command(
+        "generate_dataset", questions=questions, users=1, attempts=0, flashcards=0, reviews=0,
+        verbosity=0,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", default="20000,100000", help="以逗號分隔的題數")
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    args = parser.parse_args()
+
+    formats = args.formats.split(",")
+    for questions in (int(value) for value in args.questions.split(",")):
+        with tempfile.TemporaryDirectory() as directory:
+            database = os.path.join(directory, "bench.sqlite3")
+            start = time.perf_counter()
+            create_dataset(database, questions)
+            print(f"{questions} 題 (產生資料 {time.perf_counter() - start:.1f} 秒)")
+            for export_format in formats:
+                output = subprocess.run(
+                    [sys.executable, __file__, "--child", export_format, database],
+                    check=True, capture_output=True, text=True,
+                ).stdout.splitlines()[-1]
+                size, elapsed, before, after = output.split()
+                unit = "筆" if export_format == "list" else "bytes"
+                print(
+                    f"  {export_format:5s} 峰值 RSS 增加 {float(after) - float(before):7.1f} MB  "
+                    f"{float(elapsed):6.1f} 秒  {int(size):,} {unit}"
+                )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    elif len(sys.argv) == 4 and sys.argv[1] == "--generate":
+        generate(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,93 @@
+"""
+作答評分：每題查詢正確選項與以行程內答案索引 (grading.answer_keys) 評分的比較。
+
+題目各有 4 個選項，其中 1/4 為複選題；作答隨機產生，量測評分本身 (不含寫入作答紀錄)：
+- 查詢：每次作答查詢該題的正確選項後比較 (原本的作法)
+- 索引：grading.answer_keys 已預熱，評分不查詢資料庫
+
+用法：
+    python benchmarks/bench_grading.py [--questions 2000] [--attempts 20000]
+"""
+import argparse
+import random
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from question_bank.models import Question, QuestionOption  # noqa: E402
+from question_bank.services import grading  # noqa: E402
+
+LABELS = "ABCD"
+
+
+def grade_with_query(question_id, selected):
+    correct = set(
+        QuestionOption.objects.filter(question_id=question_id, is_correct=True).values_list("option_label", flat=True)
+    )
+    return bool(correct) and set(selected) == correct
+
+
+def measure(label, function, answers):
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        for question_id, selected in answers:
+            function(question_id, selected)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<4} {elapsed / len(answers) * 1e6:8.1f}µs/次  查詢 {len(queries)} 次")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--attempts", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    questions = Question.objects.bulk_create([
+        Question(
+            exam_session=session, subject=subject, question_number=str(number + 1), content=f"題目 {number}",
+            question_type="multiple" if number % 4 == 0 else "single",
+        )
+        for number in range(args.questions)
+    ])
+    question_ids = list(Question.objects.order_by("id").values_list("id", flat=True))
+    answers = {}
+    options = []
+    for question_id, question in zip(question_ids, questions):
+        count = rng.randint(2, 3) if question.question_type == "multiple" else 1
+        answers[question_id] = rng.sample(LABELS, count)
+        options.extend(
+            QuestionOption(
+                question_id=question_id, option_label=label, content=label,
+                is_correct=label in answers[question_id], order=order,
+            )
+            for order, label in enumerate(LABELS)
+        )
+    QuestionOption.objects.bulk_create(options)
+
+    attempts = []
+    for _ in range(args.attempts):
+        question_id = rng.choice(question_ids)
+        # 約一半作答正確
+        selected = answers[question_id] if rng.random() < 0.5 else rng.sample(LABELS, len(answers[question_id]))
+        attempts.append((question_id, selected))
+
+    started = time.perf_counter()
+    grading.answer_keys.get_many(question_ids)
+    print(f"載入 {len(question_ids)} 題答案索引：{(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"評分 {len(attempts)} 次作答：")
+    before = measure("查詢", grade_with_query, attempts)
+    after = measure("索引", grading.grade, attempts)
+    print(f"  加速 {before / after:.0f} 倍")
+
+
+if __name__ == "__main__":
+    main()
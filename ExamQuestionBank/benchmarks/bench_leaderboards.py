@@ -0,0 +1,100 @@
+"""
+排行榜：每次請求彙總 QuestionAttempt 與由 sorted set 回應的比較。
+
+建立 --users 位使用者、--attempts 筆作答 (同一科目)，量測取得正確率前 20 名與目前使用者名次：
+- 彙總：依使用者 GROUP BY 計算正確率後排序 (原本的作法)
+- 排行榜：leaderboards.board (未設定 REDIS_URL 時為行程內的替代；設定時量測實際的 Redis)
+另量測 rebuild 與每次作答遞增更新的時間。
+
+用法：
+    python benchmarks/bench_leaderboards.py [--users 2000] [--attempts 200000]
+"""
+import argparse
+import random
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.db.models import Count, FloatField, Q  # noqa: E402
+from django.db.models.functions import Cast  # noqa: E402
+
+from question_bank.models import Question, QuestionAttempt  # noqa: E402
+from question_bank.services import leaderboards  # noqa: E402
+from users.models import User  # noqa: E402
+
+TOP = 20
+
+
+def aggregate(subject_id, user_id):
+    rows = list(
+        QuestionAttempt.objects.filter(question__subject_id=subject_id)
+        .values("user_id")
+        .annotate(answered=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+        .filter(answered__gte=settings.LEADERBOARD_MIN_ATTEMPTS)
+        .annotate(rate=Cast("correct", FloatField()) / Cast("answered", FloatField()))
+        .order_by("-rate")
+    )
+    ranks = {row["user_id"]: rank for rank, row in enumerate(rows, start=1)}
+    return rows[:TOP], ranks.get(user_id)
+
+
+def measure(label, function, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    elapsed = (time.perf_counter() - started) / rounds
+    print(f"  {label:<6} {elapsed * 1000:8.2f} ms/次")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--attempts", type=int, default=200000)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    User.objects.bulk_create([
+        User(username=f"user{number}", email=f"user{number}@example.com") for number in range(args.users)
+    ])
+    user_ids = list(User.objects.values_list("id", flat=True))
+    Question.objects.bulk_create([
+        Question(exam_session=session, subject=subject, question_number=str(number + 1), content=f"題目 {number}")
+        for number in range(500)
+    ])
+    question_ids = list(Question.objects.values_list("id", flat=True))
+    skill = {user_id: rng.random() for user_id in user_ids}
+    attempts = []
+    for _ in range(args.attempts):
+        user_id = rng.choice(user_ids)
+        attempts.append(QuestionAttempt(
+            user_id=user_id, question_id=rng.choice(question_ids), selected_options=["A"],
+            is_correct=rng.random() < skill[user_id],
+        ))
+    QuestionAttempt.objects.bulk_create(attempts, batch_size=5000)
+
+    started = time.perf_counter()
+    count = leaderboards.rebuild()
+    print(f"由 {args.attempts} 筆作答重建 {count} 個排行榜：{time.perf_counter() - started:.2f} 秒")
+
+    user_id = rng.choice(user_ids)
+    print(f"正確率前 {TOP} 名與目前使用者名次：")
+    before = measure("彙總", lambda: aggregate(subject.id, user_id), args.rounds)
+    after = measure("排行榜", lambda: leaderboards.board(
+        leaderboards.ACCURACY, leaderboards.SUBJECT, subject.id, leaderboards.ALL, user_id=user_id, limit=TOP,
+    ), args.rounds)
+    print(f"  加速 {before / after:.0f} 倍")
+
+    rows = [(subject.id, session.id, rng.random() < 0.5) for _ in range(10)]
+    print("每次交卷 (10 題) 的遞增更新：")
+    measure("更新", lambda: leaderboards.record(user_id, rows), args.rounds)
+
+
+if __name__ == "__main__":
+    main()
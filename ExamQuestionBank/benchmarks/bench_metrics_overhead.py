@@ -0,0 +1,100 @@
+"""
+量測 MetricsMiddleware 對一般 API 請求的額外負擔 (目標 < 2%)。
+
+以 QuestionListSerializer 列出 20 題的 view 模擬典型列表請求，
+交錯執行啟用 / 停用指標的回合，取各自最快的回合以排除雜訊。
+"""
+import sys
+import time
+import types
+
+from _bootstrap import setup_django, create_catalog, create_user
+
+setup_django()
+
+from django.test import Client, override_settings  # noqa: E402
+from django.urls import path  # noqa: E402
+from rest_framework.response import Response  # noqa: E402
+from rest_framework.views import APIView  # noqa: E402
+
+from question_bank.models import Question  # noqa: E402
+from question_bank.serializers import QuestionListSerializer  # noqa: E402
+
+REQUESTS_PER_ROUND = 300
+ROUNDS = 15
+
+
+class BenchQuestionListView(APIView):
+    def get(self, request):
+        questions = Question.objects.select_related("exam_session__exam_series", "subject")[:20]
+        return Response(QuestionListSerializer(questions, many=True).data)
+
+
+urlconf = types.ModuleType("bench_metrics_urls")
+urlconf.urlpatterns = [path("bench/questions/", BenchQuestionListView.as_view(), name="bench-questions")]
+sys.modules[urlconf.__name__] = urlconf
+
+
+def run_round(client):
+    start = time.perf_counter()
+    for _ in range(REQUESTS_PER_ROUND):
+        client.get("/bench/questions/")
+    return (time.perf_counter() - start) / REQUESTS_PER_ROUND
+
+
+def middleware_cost(request_count=20000):
+    """直接量測中介層本身 (含 execute_wrapper 與指標紀錄) 的耗時"""
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+    from django.urls import resolve
+
+    from monitoring.middleware import MetricsMiddleware
+
+    request = RequestFactory().get("/bench/questions/")
+    request.resolver_match = resolve("/bench/questions/")
+    response = HttpResponse()
+    with override_settings(METRICS_ENABLED=True):
+        middleware = MetricsMiddleware(lambda request: response)
+    start = time.perf_counter()
+    for _ in range(request_count):
+        middleware(request)
+    return (time.perf_counter() - start) / request_count
+
+
+def main():
+    _, session, subject = create_catalog()
+    user = create_user()
+    Question.objects.bulk_create([
+        Question(exam_session=session, subject=subject, question_number=str(i), content="題目內容" * 20)
+        for i in range(100)
+    ])
+
+    results = {False: [], True: []}
+    with override_settings(ROOT_URLCONF=urlconf.__name__):
+        clients = {}
+        for enabled in (False, True):
+            with override_settings(METRICS_ENABLED=enabled):
+                client = Client()
+                client.force_login(user)
+                run_round(client)  # warm up
+                clients[enabled] = client
+
+        for _ in range(ROUNDS):
+            for enabled in (False, True):
+                with override_settings(METRICS_ENABLED=enabled):
+                    results[enabled].append(run_round(clients[enabled]))
+
+    baseline = min(results[False])
+    instrumented = min(results[True])
+    overhead = (instrumented - baseline) / baseline * 100
+    print(f"停用指標: {baseline * 1e6:8.1f} µs/request")
+    print(f"啟用指標: {instrumented * 1e6:8.1f} µs/request")
+    print(f"額外負擔: {overhead:+.2f}% ({(instrumented - baseline) * 1e6:+.1f} µs/request)")
+
+    with override_settings(ROOT_URLCONF=urlconf.__name__):
+        cost = middleware_cost()
+    print(f"中介層本身: {cost * 1e6:8.1f} µs/request ({cost / baseline * 100:.2f}% of baseline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+近似重複題索引：建立指紋的速度、查詢延遲，以及改寫題目的召回率。
+
+以隨機中文字產生題目，其中一部分另外產生「改寫版」(替換少量字元、對調選項)，
+建立索引後以改寫版查詢，確認原題是否出現在結果中，並與逐題比較的暴力法比較耗時。
+
+用法：
+    python benchmarks/bench_near_duplicates.py [--questions 20000] [--variants 500] [--edits 3]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from django.db import transaction  # noqa: E402
+
+from question_bank.models import Question, QuestionOption  # noqa: E402
+from question_bank.services import duplicates  # noqa: E402
+
+# 常用字範圍內取字，避免產生大量相同片段
+CHARS = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+BATCH_SIZE = 1000
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(CHARS) for _ in range(length))
+
+
+def reword(rng, content, options, edits):
+    """替換 edits 個字元並對調兩個選項"""
+    chars = list(content)
+    for position in rng.sample(range(len(chars)), edits):
+        chars[position] = rng.choice(CHARS)
+    options = list(options)
+    i, j = rng.sample(range(len(options)), 2)
+    options[i], options[j] = options[j], options[i]
+    return "".join(chars), options
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--variants", type=int, default=500)
+    parser.add_argument("--edits", type=int, default=3, help="改寫版替換的字元數")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    corpus = {}
+    for start in range(0, args.questions, BATCH_SIZE):
+        with transaction.atomic():
+            questions = Question.objects.bulk_create([
+                Question(
+                    exam_session=session, subject=subject, question_number=str(number + 1),
+                    content=random_text(rng, rng.randint(40, 120)),
+                )
+                for number in range(start, min(start + BATCH_SIZE, args.questions))
+            ])
+            options = []
+            for question in questions:
+                texts = [random_text(rng, rng.randint(8, 20)) for _ in range(4)]
+                corpus[question.id] = (question.content, texts)
+                options.extend(
+                    QuestionOption(question=question, option_label=label, content=text, order=order)
+                    for order, (label, text) in enumerate(zip("ABCD", texts))
+                )
+            QuestionOption.objects.bulk_create(options)
+
+    question_ids = sorted(corpus)
+    started = time.perf_counter()
+    for start in range(0, len(question_ids), BATCH_SIZE):
+        duplicates.index_questions(question_ids[start:start + BATCH_SIZE])
+    elapsed = time.perf_counter() - started
+    print(f"建立 {len(question_ids)} 題指紋：{elapsed:.1f} 秒 ({len(question_ids) / elapsed:.0f} 題/秒)")
+
+    latencies = []
+    found = 0
+    false_positives = 0
+    samples = rng.sample(question_ids, min(args.variants, len(question_ids)))
+    for question_id in samples:
+        content, options = reword(rng, *corpus[question_id], args.edits)
+        started = time.perf_counter()
+        matches = duplicates.find_similar(content, options)
+        latencies.append((time.perf_counter() - started) * 1000)
+        found += any(match_id == question_id for match_id, _ in matches)
+        false_positives += sum(match_id != question_id for match_id, _ in matches)
+    latencies.sort()
+    print(
+        f"查詢 {len(samples)} 題改寫版 (替換 {args.edits} 字並對調選項)："
+        f"召回 {found / len(samples):.1%}，誤判 {false_positives} 題，"
+        f"p50 {statistics.median(latencies):.2f}ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}ms"
+    )
+
+    # 對照：與所有題目的簽章逐一比較
+    packed = list(
+        Question.objects.filter(fingerprint__isnull=False).values_list("fingerprint__signature", flat=True)
+    )
+    content, options = reword(rng, *corpus[samples[0]], args.edits)
+    started = time.perf_counter()
+    query = duplicates.SIGNATURE.pack(*duplicates.signature(duplicates.question_text(content, options)))
+    [duplicates.similarity(query, bytes(other)) for other in packed]
+    print(f"對照：逐一比較 {len(packed)} 個簽章 {(time.perf_counter() - started) * 1000:.1f}ms (不含讀取)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+物件權限：逐筆 user.has_perm 與整頁一次查詢 (users.permissions.ObjectPermissions) 的比較。
+
+建立 --notes 則他人的筆記，使用者以個人或群組權限取得其中約 1/3 的 change 權限，
+量測每頁 PAGE_SIZE 則筆記判斷是否可編輯的查詢次數與時間：
+- 逐筆：guardian ObjectPermissionBackend (user.has_perm(perm, obj))，每個新的使用者物件都重新查詢
+- 批次：ObjectPermissions.prefetch 一次查詢整頁後逐筆 has_perm
+
+用法：
+    python benchmarks/bench_object_permissions.py [--notes 2000]
+"""
+import argparse
+import random
+import time
+
+from _bootstrap import create_catalog, create_user, setup_django
+
+setup_django()
+
+from django.contrib.auth.models import Group  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from guardian.shortcuts import assign_perm  # noqa: E402
+
+from question_bank.models import Question, QuestionNote  # noqa: E402
+from users.models import User  # noqa: E402
+from users.permissions import CHANGE, ObjectPermissions  # noqa: E402
+
+PAGE_SIZE = 20
+PERMISSION = "question_bank.change_questionnote"
+
+
+def measure(label, function, pages):
+    started = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        for page in pages:
+            function(page)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<4} {elapsed / len(pages) * 1000:7.2f} ms/頁  查詢 {len(queries) / len(pages):5.1f} 次/頁")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    Question.objects.bulk_create([
+        Question(exam_session=session, subject=subject, question_number=str(number + 1), content=f"題目 {number}")
+        for number in range(args.notes)
+    ])
+    User.objects.bulk_create([
+        User(username=f"author{number}", email=f"author{number}@example.com") for number in range(50)
+    ])
+    authors = list(User.objects.filter(username__startswith="author"))
+    QuestionNote.objects.bulk_create([
+        QuestionNote(user=rng.choice(authors), question_id=question_id, content="筆記", is_private=False)
+        for question_id in Question.objects.values_list("id", flat=True)
+    ])
+    notes = list(QuestionNote.objects.order_by("id"))
+
+    user = create_user()
+    group = Group.objects.create(name="reviewers")
+    user.groups.add(group)
+    for note in notes:
+        chance = rng.random()
+        if chance < 0.2:
+            assign_perm(PERMISSION, user, note)
+        elif chance < 0.33:
+            assign_perm(PERMISSION, group, note)
+
+    pages = [notes[start:start + PAGE_SIZE] for start in range(0, len(notes), PAGE_SIZE)]
+
+    def per_object(page):
+        # 每個請求都是新的使用者物件 (與實際請求相同，guardian 的快取不跨請求)
+        request_user = User.objects.get(pk=user.pk)
+        return [request_user.has_perm(PERMISSION, note) for note in page]
+
+    def batched(page):
+        request_user = User.objects.get(pk=user.pk)
+        permissions = ObjectPermissions(request_user)
+        permissions.prefetch(page, CHANGE)
+        return [permissions.has_perm(note, CHANGE) for note in page]
+
+    assert [per_object(page) for page in pages[:5]] == [batched(page) for page in pages[:5]]
+    print(f"每頁 {PAGE_SIZE} 則筆記的編輯權限 (含載入使用者)：")
+    before = measure("逐筆", per_object, pages)
+    after = measure("批次", batched, pages)
+    print(f"  加速 {before / after:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+預先產生的題目 JSON：以序列化器輸出與串接 QuestionPayload 片段的 CPU 時間比較。
+
+題目各有 4 個選項與 3 個標籤，比較：
+- 詳細資料：QuestionDetailSerializer (含選項與標籤的 prefetch 查詢) vs payloads.fragments
+- 列表：每頁 PAGE_SIZE 題的 QuestionListSerializer vs payloads.render_list
+兩者都輸出 JSON 位元組，片段於量測前先產生一次 (模擬已預熱的狀態)。
+
+用法：
+    python benchmarks/bench_question_payloads.py [--questions 2000] [--rounds 3]
+"""
+import argparse
+import random
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from question_bank.models import Question, QuestionOption, QuestionTag, QuestionTagRelation  # noqa: E402
+from question_bank.serializers import QuestionDetailSerializer, QuestionListSerializer  # noqa: E402
+from question_bank.services import payloads  # noqa: E402
+
+CHARS = [chr(code) for code in range(0x4E00, 0x4E00 + 3000)]
+PAGE_SIZE = 20
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(CHARS) for _ in range(length))
+
+
+def measure(label, function, rounds, count):
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    for _ in range(rounds):
+        function()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    print(f"  {label:<8} CPU {cpu / rounds / count * 1e6:7.1f}µs/題  實際 {wall / rounds / count * 1e6:7.1f}µs/題")
+    return cpu
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    questions = Question.objects.bulk_create([
+        Question(
+            exam_session=session, subject=subject, question_number=str(number + 1), status="published",
+            content=random_text(rng, 100), analysis=random_text(rng, 200), answer_explanation=random_text(rng, 50),
+        )
+        for number in range(args.questions)
+    ])
+    QuestionOption.objects.bulk_create([
+        QuestionOption(question=question, option_label=label, content=random_text(rng, 20), order=order)
+        for question in questions
+        for order, label in enumerate("ABCD")
+    ])
+    tags = QuestionTag.objects.bulk_create([QuestionTag(name=random_text(rng, 4)) for _ in range(200)])
+    QuestionTagRelation.objects.bulk_create([
+        QuestionTagRelation(question=question, tag=tag) for question in questions for tag in rng.sample(tags, 3)
+    ])
+
+    question_ids = list(Question.objects.order_by("id").values_list("id", flat=True))
+    renderer = JSONRenderer()
+    started = time.perf_counter()
+    for start in range(0, len(question_ids), 500):
+        payloads.render_payloads(question_ids[start:start + 500])
+    print(f"產生 {len(question_ids)} 題片段：{time.perf_counter() - started:.1f} 秒")
+
+    def detail_serializer():
+        for question_id in question_ids:
+            question = (
+                Question.objects.select_related("created_by")
+                .prefetch_related("options", "tag_relations__tag").get(pk=question_id)
+            )
+            renderer.render(QuestionDetailSerializer(question).data)
+
+    def detail_payload():
+        for question_id in question_ids:
+            payloads.fragments([Question.objects.get(pk=question_id)], payloads.DETAIL)
+
+    def list_serializer():
+        for start in range(0, len(question_ids), PAGE_SIZE):
+            page = Question.objects.filter(id__in=question_ids[start:start + PAGE_SIZE])
+            renderer.render(QuestionListSerializer(page, many=True).data)
+
+    def list_payload():
+        for start in range(0, len(question_ids), PAGE_SIZE):
+            payloads.render_list(list(Question.objects.filter(id__in=question_ids[start:start + PAGE_SIZE])))
+
+    count = len(question_ids)
+    print("詳細資料 (含查詢)：")
+    before = measure("序列化器", detail_serializer, args.rounds, count)
+    after = measure("預先產生", detail_payload, args.rounds, count)
+    print(f"  CPU 減少 {1 - after / before:.0%}")
+    print(f"列表 (每頁 {PAGE_SIZE} 題，含查詢)：")
+    before = measure("序列化器", list_serializer, args.rounds, count)
+    after = measure("預先產生", list_payload, args.rounds, count)
+    print(f"  CPU 減少 {1 - after / before:.0%}")
+
+
+if __name__ == "__main__":
+    main()
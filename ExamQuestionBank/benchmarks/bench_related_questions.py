@@ -0,0 +1,134 @@
+"""
+相關題目推薦：全部重算、修改少量題目後的增量更新，以及查詢相關題目的耗時。
+
+題目由約 5000 個共用詞彙 (依 Zipf 分布，常用詞出現在大量題目中) 與所屬主題的專有詞彙組成，
+分散在多個場次；另以完整內積的結果檢查只用高權重詞項找候選的準確度。
+
+用法：
+    python benchmarks/bench_related_questions.py [--questions 20000] [--sessions 20] [--edits 100]
+"""
+import argparse
+import heapq
+import random
+import statistics
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from django.db import transaction  # noqa: E402
+
+from exams.models import ExamSession  # noqa: E402
+from question_bank.models import Question, QuestionOption, QuestionTermVector  # noqa: E402
+from question_bank.services import related  # noqa: E402
+
+BATCH_SIZE = 1000
+
+
+def vocabulary(rng, size):
+    chars = [chr(code) for code in range(0x4E00, 0x4E00 + 2000)]
+    return ["".join(rng.choice(chars) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def sentence(rng, words, weights, length, topic=()):
+    """約一半為主題詞彙"""
+    picked = rng.choices(words, weights, k=length)
+    if topic:
+        picked[::2] = rng.choices(topic, k=len(picked[::2]))
+    return "".join(picked)
+
+
+def exact_neighbors(index, question_id):
+    """對照：以所有詞項與所有其他場次題目計算內積"""
+    terms, weights = index.vectors[question_id]
+    query = dict(zip(terms, weights))
+    scores = []
+    for other, (other_terms, other_weights) in index.vectors.items():
+        if index.sessions[other] != index.sessions[question_id]:
+            scores.append((sum(weight * query.get(term, 0.0) for term, weight in zip(other_terms, other_weights)), other))
+    return {other for _, other in heapq.nlargest(related.TOP_K, scores)}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=100, help="增量更新前修改的題數")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    series, _, subject = create_catalog()
+    sessions = [ExamSession.objects.create(exam_series=series, year=2000 + year) for year in range(args.sessions)]
+    words = vocabulary(rng, 5000)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    topics = [vocabulary(rng, 20) for _ in range(max(1, args.questions // 20))]
+
+    for start in range(0, args.questions, BATCH_SIZE):
+        with transaction.atomic():
+            numbers = range(start, min(start + BATCH_SIZE, args.questions))
+            questions = Question.objects.bulk_create([
+                Question(
+                    exam_session=rng.choice(sessions), subject=subject, question_number=str(number + 1),
+                    content=sentence(rng, words, weights, rng.randint(15, 40), rng.choice(topics)),
+                    status="published",
+                )
+                for number in numbers
+            ])
+            QuestionOption.objects.bulk_create([
+                QuestionOption(
+                    question=question, option_label=label, content=sentence(rng, words, weights, rng.randint(3, 8)),
+                    order=order,
+                )
+                for question in questions
+                for order, label in enumerate("ABCD")
+            ])
+
+    stats = related.update_related(full=True)
+    print(
+        f"全部重算 {stats['questions']} 題：斷詞與索引 {stats['index_seconds']:.1f} 秒，"
+        f"計算相關題目 {stats['seconds'] - stats['index_seconds']:.1f} 秒"
+    )
+
+    index = related.TfidfIndex(
+        {
+            question_id: related.unpack(bytes(terms))
+            for question_id, terms in QuestionTermVector.objects.values_list("question_id", "terms")
+        },
+        dict(Question.objects.values_list("id", "exam_session_id")),
+    )
+    sample = rng.sample(sorted(index.vectors), 200)
+    overlap = statistics.mean(
+        len({other for _, other in index.neighbors(question_id, related.TOP_K)} & exact_neighbors(index, question_id))
+        / related.TOP_K
+        for question_id in sample
+    )
+    print(f"與完整內積的前 {related.TOP_K} 名重疊率：{overlap:.1%}")
+
+    stats = related.update_related()
+    print(f"未變動時增量更新：重算 {stats['recomputed']} 題，{stats['seconds']:.1f} 秒")
+
+    question_ids = list(Question.objects.values_list("id", flat=True))
+    for question_id in rng.sample(question_ids, args.edits):
+        Question.objects.filter(id=question_id).update(content=sentence(rng, words, weights, 30))
+    stats = related.update_related()
+    print(
+        f"修改 {args.edits} 題後增量更新：重算 {stats['recomputed']} 題，"
+        f"斷詞與索引 {stats['index_seconds']:.1f} 秒，計算相關題目 {stats['seconds'] - stats['index_seconds']:.1f} 秒"
+    )
+
+    latencies = []
+    for question_id in rng.sample(question_ids, 500):
+        started = time.perf_counter()
+        list(
+            Question.objects.filter(related_from__question_id=question_id)
+            .order_by("related_from__rank")[:related.TOP_K]
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(f"查詢相關題目：p50 {statistics.median(latencies):.2f}ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
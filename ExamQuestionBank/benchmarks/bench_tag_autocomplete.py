@@ -0,0 +1,86 @@
+"""
+標籤自動完成：行程內前綴索引與資料庫查詢 (name__istartswith + 使用次數排序) 的延遲。
+
+以隨機中文字產生標籤與標籤關聯 (使用次數呈長尾分布)，以 1 至 3 字的前綴模擬逐字輸入。
+
+用法：
+    python benchmarks/bench_tag_autocomplete.py [--tags 50000] [--relations 200000] [--queries 2000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from _bootstrap import create_catalog, setup_django
+
+setup_django()
+
+from django.db.models import Count  # noqa: E402
+
+from question_bank.models import Question, QuestionTag, QuestionTagRelation  # noqa: E402
+from question_bank.services.tag_index import tag_index  # noqa: E402
+
+CHARS = [chr(code) for code in range(0x4E00, 0x4E00 + 500)]
+BATCH_SIZE = 5000
+
+
+def percentiles(latencies):
+    latencies = sorted(latencies)
+    return f"p50 {statistics.median(latencies):.3f}ms  p99 {latencies[int(len(latencies) * 0.99) - 1]:.3f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tags", type=int, default=50000)
+    parser.add_argument("--relations", type=int, default=200000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    _, session, subject = create_catalog()
+    names = list({"".join(rng.choice(CHARS) for _ in range(rng.randint(2, 8))) for _ in range(args.tags)})
+    QuestionTag.objects.bulk_create(
+        [QuestionTag(name=name, category=rng.choice(["法條", "概念", "重點"])) for name in names], batch_size=BATCH_SIZE,
+    )
+    tag_ids = list(QuestionTag.objects.values_list("id", flat=True))
+    questions = Question.objects.bulk_create(
+        [
+            Question(exam_session=session, subject=subject, question_number=str(number + 1), content="題目")
+            for number in range(args.relations // 5)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    pairs = {
+        (rng.choice(questions).id, tag_ids[int(rng.paretovariate(1.2)) % len(tag_ids)])
+        for _ in range(args.relations)
+    }
+    QuestionTagRelation.objects.bulk_create(
+        [QuestionTagRelation(question_id=question_id, tag_id=tag_id) for question_id, tag_id in pairs],
+        batch_size=BATCH_SIZE,
+    )
+
+    started = time.perf_counter()
+    tag_index.get()
+    print(f"{len(names)} 個標籤、{len(pairs)} 個關聯，載入索引 {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    prefixes = [rng.choice(names)[:rng.randint(1, 3)] for _ in range(args.queries)]
+    for label, search in [
+        ("前綴索引", lambda prefix: tag_index.search(prefix)),
+        ("資料庫", lambda prefix: list(
+            QuestionTag.objects.filter(name__istartswith=prefix)
+            .annotate(usage_count=Count("question_relations"))
+            .order_by("-usage_count", "name")
+            .values("id", "name", "category", "usage_count")[:10]
+        )),
+    ]:
+        latencies = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            search(prefix)
+            latencies.append((time.perf_counter() - started) * 1000)
+        print(f"  {label}  {percentiles(latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+量測解析一份上傳 PDF 時的峰值 RSS 增量：舊做法 io.BytesIO(file.read()) 與直接使用暫存檔路徑 / mmap。
+
+每種模式在獨立子行程中執行並比較解析前後的 RSS 峰值，
+試卷含一個大型物件 (模擬嵌入字型或掃描影像) 使檔案大小明顯高於文字內容。
+
+用法：
+    python benchmarks/bench_upload_memory.py [--size-mb 64] [--questions 200]
+"""
+import argparse
+import io
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+
+MODES = {
+    "copy": "舊做法：io.BytesIO(upload.read())",
+    "path": "TemporaryUploadedFile.temporary_file_path()",
+    "mmap": "一般檔案物件 (mmap)",
+}
+
+
+def peak_rss_mb():
+    # VmHWM 為目前行程映像的 RSS 峰值 (ru_maxrss 會沿用父行程的峰值)
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def child(mode, path):
+    from _bootstrap import setup_django
+
+    setup_django()
+
+    from django.core.files.uploadedfile import TemporaryUploadedFile
+
+    from question_bank.services.pdf_parser import PDFParser
+
+    size = os.path.getsize(path)
+    upload = TemporaryUploadedFile("questions.pdf", "application/pdf", size, None)
+    with open(path, "rb") as f:
+        shutil.copyfileobj(f, upload.file, 1024 * 1024)
+    upload.seek(0)
+
+    before = peak_rss_mb()
+    if mode == "copy":
+        questions = PDFParser.parse_questions(io.BytesIO(upload.read()))
+    elif mode == "path":
+        questions = PDFParser.parse_questions(upload)
+    else:
+        with open(path, "rb") as f:
+            questions = PDFParser.parse_questions(f)
+    after = peak_rss_mb()
+    upload.close()
+    print(f"{len(questions)} {before:.1f} {after:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--questions", type=int, default=200)
+    args = parser.parse_args()
+
+    from _pdf_fixtures import question_paper
+
+    content = question_paper(args.questions, padding=args.size_mb * 1024 * 1024)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(content)
+        path = f.name
+    del content
+
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    print(f"試卷 {size_mb:.1f} MB，{args.questions} 題")
+    try:
+        for mode, description in MODES.items():
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout.splitlines()[-1]
+            count, before, after = output.split()
+            print(
+                f"{mode:5s} 峰值 RSS 增加 {float(after) - float(before):7.1f} MB "
+                f"(解析 {count} 題)  {description}"
+            )
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
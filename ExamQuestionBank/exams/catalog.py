@@ -0,0 +1,115 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from monitoring.metrics import record_cache
+from .models import ExamSeries, ExamSession, Subject
+from .versioning import get_version
+
+
+CATALOG = "catalog"
+
+
+class CatalogSnapshot:
+    """
+    某一版本的考試目錄 (載入後不再修改，可在執行緒間共用)
+    """
+    def __init__(self, version, series, sessions, subjects):
+        self.version = version
+        self.series = {row["id"]: row for row in series}
+        self.sessions = {row["id"]: row for row in sessions}
+        self.subjects = {row["id"]: row for row in subjects}
+        self.series_by_code = {row["code"]: row for row in series}
+        self.subjects_by_code = {row["code"]: row for row in subjects}
+
+        self.sessions_by_series = {}
+        for row in sessions:
+            self.sessions_by_series.setdefault(row["exam_series_id"], []).append(row["id"])
+            series_row = self.series.get(row["exam_series_id"])
+            if series_row is not None:
+                row["name"] = ExamSession.display_name(series_row["name"], row["year"], row["session_number"])
+
+
+class Catalog:
+    """
+    每個 worker 行程內的考試別、場次、科目目錄。
+
+    其他行程的異動透過共用快取中的版本戳記 (exams.versioning) 得知，
+    最多每 CATALOG_VERSION_CHECK_INTERVAL 秒檢查一次；同一行程內的異動在交易提交後立即失效。
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.checked_at = 0.0
+
+    def invalidate(self):
+        self.snapshot = None
+
+    def get(self):
+        snapshot = self.snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self.checked_at < settings.CATALOG_VERSION_CHECK_INTERVAL:
+            return snapshot
+
+        version = get_version(CATALOG)
+        self.checked_at = now
+        if snapshot is not None and snapshot.version == version:
+            record_cache(CATALOG, True)
+            return snapshot
+
+        record_cache(CATALOG, False)
+        with self.lock:
+            if self.snapshot is None or self.snapshot.version != version:
+                self.snapshot = self.load(version)
+            return self.snapshot
+
+    def load(self, version):
+        return CatalogSnapshot(
+            version,
+            list(ExamSeries.objects.values("id", "name", "code", "is_active")),
+            list(ExamSession.objects.values("id", "exam_series_id", "year", "session_number", "is_published")),
+            list(Subject.objects.values("id", "name", "code", "parent_id")),
+        )
+
+    # Lookups
+
+    def series(self, series_id):
+        return self.get().series.get(series_id)
+
+    def session(self, session_id):
+        return self.get().sessions.get(session_id)
+
+    def subject(self, subject_id):
+        return self.get().subjects.get(subject_id)
+
+    def series_name(self, series_id):
+        row = self.series(series_id)
+        return row["name"] if row else None
+
+    def session_name(self, session_id):
+        row = self.session(session_id)
+        return row.get("name") if row else None
+
+    def subject_name(self, subject_id):
+        row = self.subject(subject_id)
+        return row["name"] if row else None
+
+    def series_id_for_code(self, code):
+        row = self.get().series_by_code.get(code)
+        return row["id"] if row else None
+
+    def subject_id_for_code(self, code):
+        row = self.get().subjects_by_code.get(code)
+        return row["id"] if row else None
+
+    def session_ids_for_series(self, series_id):
+        return self.get().sessions_by_series.get(series_id, [])
+
+
+catalog = Catalog()
+
+
+def invalidate_catalog():
+    transaction.on_commit(catalog.invalidate)
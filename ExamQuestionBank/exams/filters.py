@@ -0,0 +1,25 @@
+import django_filters
+from django_filters.constants import EMPTY_VALUES
+
+from .catalog import catalog
+from .subject_tree import descendants
+
+
+class SubjectTreeFilter(django_filters.NumberFilter):
+    """
+    依科目篩選並包含所有下層科目 (透過閉包表的單一索引子查詢)
+    """
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return qs.filter(**{f"{self.field_name}__in": descendants(value)})
+
+
+class ExamSeriesFilter(django_filters.NumberFilter):
+    """
+    依考試別篩選，由行程內考試目錄換成場次 id，不需 join 考試場次資料表
+    """
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        return qs.filter(**{f"{self.field_name}__in": catalog.session_ids_for_series(value)})
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from exams import subject_tree
+
+
+class Command(BaseCommand):
+    help = "重建或檢查科目樹閉包表 (subject_closures)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["rebuild", "verify"], help="rebuild: 依 parent 重建；verify: 檢查是否一致")
+
+    def handle(self, *args, **options):
+        if options["action"] == "rebuild":
+            count = subject_tree.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"已重建科目樹閉包表，共 {count} 筆"))
+            return
+
+        missing, extra = subject_tree.verify()
+        for (ancestor_id, descendant_id), depth in sorted(missing.items()):
+            self.stderr.write(f"缺少：{ancestor_id} -> {descendant_id} (depth={depth})")
+        for (ancestor_id, descendant_id), depth in sorted(extra.items()):
+            self.stderr.write(f"多餘或錯誤：{ancestor_id} -> {descendant_id} (depth={depth})")
+        if missing or extra:
+            raise CommandError(f"科目樹閉包表不一致：缺少 {len(missing)} 筆，多餘 {len(extra)} 筆，請執行 rebuild")
+        self.stdout.write(self.style.SUCCESS("科目樹閉包表一致"))
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamSeries',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=128, unique=True, verbose_name='考試名稱')),
+                ('code', models.CharField(max_length=32, unique=True, verbose_name='考試代碼')),
+                ('description', models.TextField(blank=True, verbose_name='考試描述')),
+                ('is_active', models.BooleanField(default=True, verbose_name='啟用狀態')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+            ],
+            options={
+                'verbose_name': '考試別',
+                'verbose_name_plural': '考試別',
+                'db_table': 'exam_series',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Subject',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=128, unique=True, verbose_name='科目名稱')),
+                ('code', models.CharField(max_length=32, unique=True, verbose_name='科目代碼')),
+                ('description', models.TextField(blank=True, verbose_name='科目描述')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='children', to='exams.subject', verbose_name='上層科目')),
+            ],
+            options={
+                'verbose_name': '科目',
+                'verbose_name_plural': '科目',
+                'db_table': 'subjects',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamSession',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('year', models.IntegerField(verbose_name='年度')),
+                ('session_number', models.IntegerField(default=1, verbose_name='場次')),
+                ('exam_date', models.DateField(blank=True, null=True, verbose_name='考試日期')),
+                ('description', models.TextField(blank=True, verbose_name='場次說明')),
+                ('is_published', models.BooleanField(default=False, verbose_name='已發布')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+                ('exam_series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='exams.examseries', verbose_name='考試別')),
+            ],
+            options={
+                'verbose_name': '考試場次',
+                'verbose_name_plural': '考試場次',
+                'db_table': 'exam_sessions',
+                'ordering': ['-year', '-session_number'],
+                'unique_together': {('exam_series', 'year', 'session_number')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SubjectClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.IntegerField(default=0, verbose_name='層數')),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='exams.subject', verbose_name='上層科目')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='exams.subject', verbose_name='下層科目')),
+            ],
+            options={
+                'verbose_name': '科目樹閉包',
+                'verbose_name_plural': '科目樹閉包',
+                'db_table': 'subject_closures',
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='subject_clo_descend_c203bd_idx')],
+                'unique_together': {('ancestor', 'descendant')},
+            },
+        ),
+    ]
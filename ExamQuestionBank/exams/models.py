@@ -1,7 +1,11 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
 
 
+PARENT_CYCLE_ERROR = "不可將科目移到自己或其下層科目之下"
+
+
 class ExamSeries(models.Model):
     """
     考試別 (e.g., 司法官, 律師)
@@ -49,7 +53,18 @@ class ExamSession(models.Model):
         ordering = ['-year', '-session_number']
 
     def __str__(self):
-        return f"{self.exam_series.name} {self.year}年 第{self.session_number}場"
+        from .catalog import catalog
+
+        if ExamSession.exam_series.is_cached(self):
+            series_name = self.exam_series.name
+        else:
+            # 由行程內目錄取得考試別名稱，避免每個場次多一次查詢
+            series_name = catalog.series_name(self.exam_series_id) or self.exam_series.name
+        return self.display_name(series_name, self.year, self.session_number)
+
+    @staticmethod
+    def display_name(series_name, year, session_number):
+        return f"{series_name} {year}年 第{session_number}場"
 
 
 class Subject(models.Model):
@@ -72,4 +87,35 @@ class Subject(models.Model):
         ordering = ['code']
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+    def creates_cycle(self, parent_id):
+        """parent_id 為自身或下層科目 (以閉包表判斷) 時回傳 True"""
+        return (
+            self.pk is not None and parent_id is not None
+            and SubjectClosure.objects.filter(ancestor_id=self.pk, descendant_id=parent_id).exists()
+        )
+
+    def clean(self):
+        if self.creates_cycle(self.parent_id):
+            raise ValidationError({'parent': PARENT_CYCLE_ERROR})
+
+class SubjectClosure(models.Model):
+    """
+    科目樹閉包表 (每個科目與其所有上層科目的配對，含自身，depth 為相隔層數)
+    """
+    ancestor = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='descendant_links', verbose_name="上層科目")
+    descendant = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='ancestor_links', verbose_name="下層科目")
+    depth = models.IntegerField(default=0, verbose_name="層數")
+
+    class Meta:
+        db_table = 'subject_closures'
+        verbose_name = '科目樹閉包'
+        verbose_name_plural = '科目樹閉包'
+        unique_together = [['ancestor', 'descendant']]
+        indexes = [
+            models.Index(fields=['descendant', 'depth']),
+        ]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+from .models import PARENT_CYCLE_ERROR, ExamSeries, ExamSession, Subject
+
+
+class ExamSeriesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExamSeries
+        fields = ['id', 'name', 'code', 'description', 'is_active']
+
+
+class ExamSessionSerializer(serializers.ModelSerializer):
+    exam_series_name = serializers.CharField(source='exam_series.name', read_only=True)
+    name = serializers.CharField(source='__str__', read_only=True)
+
+    class Meta:
+        model = ExamSession
+        fields = [
+            'id', 'exam_series', 'exam_series_name', 'name', 'year',
+            'session_number', 'exam_date', 'description', 'is_published'
+        ]
+
+
+class SubjectSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Subject
+        fields = ['id', 'name', 'code', 'description', 'parent']
+
+    def validate_parent(self, parent):
+        if parent is not None and self.instance is not None and self.instance.creates_cycle(parent.pk):
+            raise serializers.ValidationError(PARENT_CYCLE_ERROR)
+        return parent
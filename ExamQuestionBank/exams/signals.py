@@ -0,0 +1,53 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import subject_tree
+from .catalog import CATALOG, invalidate_catalog
+from .models import PARENT_CYCLE_ERROR, ExamSeries, ExamSession, Subject, SubjectClosure
+from .versioning import bump_version
+
+
+@receiver([post_save, post_delete], sender=ExamSeries)
+@receiver([post_save, post_delete], sender=ExamSession)
+@receiver([post_save, post_delete], sender=Subject)
+def bump_catalog_version(sender, **kwargs):
+    bump_version(CATALOG)
+    invalidate_catalog()
+
+
+@receiver(pre_save, sender=Subject)
+def remember_subject_parent(sender, instance, raw=False, **kwargs):
+    instance._previous_parent_id = None
+    if raw or instance.pk is None:
+        return
+    previous = Subject.objects.filter(pk=instance.pk).values_list('parent_id', flat=True).first()
+    instance._previous_parent_id = previous
+    # 最後的防護：admin 與序列化器已於 Subject.clean / validate_parent 回報驗證錯誤
+    if instance.parent_id is not None and instance.parent_id != previous:
+        if subject_tree.is_descendant(instance.pk, instance.parent_id):
+            raise ValueError(PARENT_CYCLE_ERROR)
+
+
+@receiver(post_save, sender=Subject)
+def update_subject_closure(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        subject_tree.insert_node(instance)
+    elif instance.parent_id != instance._previous_parent_id:
+        subject_tree.move_node(instance)
+
+
+@receiver(pre_delete, sender=Subject)
+def remember_subject_subtree(sender, instance, **kwargs):
+    instance._child_subtree_ids = list(
+        SubjectClosure.objects
+        .filter(ancestor_id=instance.pk, depth__gt=0)
+        .values_list('descendant_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Subject)
+def detach_subject_children(sender, instance, **kwargs):
+    if instance._child_subtree_ids:
+        subject_tree.detach_children(instance._child_subtree_ids)
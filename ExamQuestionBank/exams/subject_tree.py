@@ -0,0 +1,105 @@
+from django.db import transaction
+
+from .models import Subject, SubjectClosure
+
+
+def descendants(subject_id):
+    """科目本身與所有下層科目 id 的子查詢，可直接用於 subject_id__in"""
+    return SubjectClosure.objects.filter(ancestor_id=subject_id).values('descendant_id')
+
+
+def ancestor_ids(subject_id):
+    """由近到遠的上層科目 id (含自身)"""
+    return list(
+        SubjectClosure.objects
+        .filter(descendant_id=subject_id)
+        .order_by('depth')
+        .values_list('ancestor_id', flat=True)
+    )
+
+
+def expected_closure():
+    """依 parent 欄位計算完整閉包 {(ancestor, descendant): depth}"""
+    parents = dict(Subject.objects.values_list('id', 'parent_id'))
+    closure = {}
+    for subject_id in parents:
+        node, depth, seen = subject_id, 0, set()
+        while node is not None and node not in seen:
+            seen.add(node)
+            closure[node, subject_id] = depth
+            node, depth = parents.get(node), depth + 1
+    return closure
+
+
+def is_descendant(subject_id, candidate_id):
+    return SubjectClosure.objects.filter(ancestor_id=subject_id, descendant_id=candidate_id).exists()
+
+
+def insert_node(subject):
+    """新增科目時建立自身與所有上層科目的配對"""
+    links = [SubjectClosure(ancestor_id=subject.id, descendant_id=subject.id, depth=0)]
+    if subject.parent_id is not None:
+        links += [
+            SubjectClosure(ancestor_id=ancestor_id, descendant_id=subject.id, depth=depth + 1)
+            for ancestor_id, depth in SubjectClosure.objects
+            .filter(descendant_id=subject.parent_id)
+            .values_list('ancestor_id', 'depth')
+        ]
+    SubjectClosure.objects.bulk_create(links)
+
+
+def move_node(subject):
+    """
+    科目搬移到新的上層科目：移除子樹與舊上層的配對，再與新上層科目的所有上層科目建立配對
+    """
+    subtree = list(
+        SubjectClosure.objects.filter(ancestor_id=subject.id).values_list('descendant_id', 'depth')
+    )
+    subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+    with transaction.atomic():
+        SubjectClosure.objects.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+        if subject.parent_id is None:
+            return
+        new_ancestors = SubjectClosure.objects.filter(descendant_id=subject.parent_id).values_list('ancestor_id', 'depth')
+        SubjectClosure.objects.bulk_create([
+            SubjectClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=ancestor_depth + depth + 1)
+            for ancestor_id, ancestor_depth in new_ancestors
+            for descendant_id, depth in subtree
+        ])
+
+
+def detach_children(child_subtree_ids):
+    """
+    刪除科目後其下層科目變為最上層 (parent SET_NULL)，移除下層科目與原上層科目的配對
+    """
+    SubjectClosure.objects.filter(descendant_id__in=child_subtree_ids).exclude(
+        ancestor_id__in=child_subtree_ids
+    ).delete()
+
+
+def rebuild():
+    """依 parent 欄位重建整個閉包表"""
+    closure = expected_closure()
+    with transaction.atomic():
+        SubjectClosure.objects.all().delete()
+        SubjectClosure.objects.bulk_create(
+            [
+                SubjectClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=depth)
+                for (ancestor_id, descendant_id), depth in closure.items()
+            ],
+            batch_size=1000,
+        )
+    return len(closure)
+
+
+def verify():
+    """回傳 (缺少的配對, 多餘或層數錯誤的配對)"""
+    expected = expected_closure()
+    actual = {
+        (ancestor_id, descendant_id): depth
+        for ancestor_id, descendant_id, depth in SubjectClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth')
+    }
+    missing = {key: depth for key, depth in expected.items() if actual.get(key) != depth}
+    extra = {key: depth for key, depth in actual.items() if expected.get(key) != depth}
+    return missing, extra
@@ -0,0 +1,14 @@
+from django.urls import path
+from .views import (
+    ExamSeriesListView, ExamSeriesDetailView, ExamSessionListView,
+    ExamSessionDetailView, SubjectListView, SubjectDetailView
+)
+
+urlpatterns = [
+    path("series/", ExamSeriesListView.as_view(), name="exam-series-list"),
+    path("series/<int:pk>/", ExamSeriesDetailView.as_view(), name="exam-series-detail"),
+    path("sessions/", ExamSessionListView.as_view(), name="exam-session-list"),
+    path("sessions/<int:pk>/", ExamSessionDetailView.as_view(), name="exam-session-detail"),
+    path("subjects/", SubjectListView.as_view(), name="subject-list"),
+    path("subjects/<int:pk>/", SubjectDetailView.as_view(), name="subject-detail"),
+]
@@ -0,0 +1,43 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+VERSION_KEY = "version-stamp:{}"
+
+
+def get_version(namespace):
+    """
+    取得命名空間目前的版本戳記 (微秒時間戳)，所有 worker 透過共用快取看到同一個值
+    """
+    key = VERSION_KEY.format(namespace)
+    version = cache.get(key)
+    if version is None:
+        # 快取被清空時重新建立，客戶端只會多重新驗證一次
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(namespaces):
+    """多個命名空間的版本戳記 {命名空間: 版本}，以一次快取查詢取得"""
+    keys = {VERSION_KEY.format(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(list(keys))
+    return {
+        namespace: found[key] if key in found else get_version(namespace)
+        for key, namespace in keys.items()
+    }
+
+
+def bump_version(namespace):
+    """資料異動後更新版本戳記 (交易提交後才生效)"""
+    def bump():
+        key = VERSION_KEY.format(namespace)
+        version = time.time_ns() // 1000
+        current = cache.get(key)
+        if current is not None and current >= version:
+            version = current + 1
+        cache.set(key, version, timeout=None)
+
+    transaction.on_commit(bump)
@@ -1,3 +1,92 @@
-from django.shortcuts import render
+import datetime
 
-# Create your views here.
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from rest_framework import generics
+from rest_framework.permissions import AllowAny
+
+from .catalog import CATALOG
+from .models import ExamSeries, ExamSession, Subject
+from .serializers import ExamSeriesSerializer, ExamSessionSerializer, SubjectSerializer
+from .versioning import get_version
+
+
+def catalog_etag(request, *args, **kwargs):
+    return f'"{CATALOG}-{get_version(CATALOG)}"'
+
+
+def catalog_last_modified(request, *args, **kwargs):
+    return datetime.datetime.fromtimestamp(get_version(CATALOG) / 1_000_000, tz=datetime.timezone.utc)
+
+
+# 版本戳記未變時直接回應 304，不查詢資料庫；瀏覽器每次都需重新驗證
+catalog_conditional = [
+    cache_control(public=True, no_cache=True),
+    condition(etag_func=catalog_etag, last_modified_func=catalog_last_modified),
+]
+
+
+class CatalogMixin:
+    """
+    考試別、場次、科目等目錄資料：不需登入、不分頁，內容與使用者無關
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    pagination_class = None
+
+
+@method_decorator(catalog_conditional, name='dispatch')
+class ExamSeriesListView(CatalogMixin, generics.ListAPIView):
+    """
+    考試別列表
+    """
+    queryset = ExamSeries.objects.filter(is_active=True)
+    serializer_class = ExamSeriesSerializer
+
+
+@method_decorator(catalog_conditional, name='dispatch')
+class ExamSeriesDetailView(CatalogMixin, generics.RetrieveAPIView):
+    """
+    考試別詳細資料
+    """
+    queryset = ExamSeries.objects.filter(is_active=True)
+    serializer_class = ExamSeriesSerializer
+
+
+@method_decorator(catalog_conditional, name='dispatch')
+class ExamSessionListView(CatalogMixin, generics.ListAPIView):
+    """
+    已發布的考試場次列表
+    """
+    queryset = ExamSession.objects.filter(is_published=True).select_related('exam_series')
+    serializer_class = ExamSessionSerializer
+    filterset_fields = ['exam_series', 'year']
+
+
+@method_decorator(catalog_conditional, name='dispatch')
+class ExamSessionDetailView(CatalogMixin, generics.RetrieveAPIView):
+    """
+    考試場次詳細資料
+    """
+    queryset = ExamSession.objects.filter(is_published=True).select_related('exam_series')
+    serializer_class = ExamSessionSerializer
+
+
+@method_decorator(catalog_conditional, name='dispatch')
+class SubjectListView(CatalogMixin, generics.ListAPIView):
+    """
+    科目列表
+    """
+    queryset = Subject.objects.all()
+    serializer_class = SubjectSerializer
+    filterset_fields = ['parent']
+
+
+@method_decorator(catalog_conditional, name='dispatch')
+class SubjectDetailView(CatalogMixin, generics.RetrieveAPIView):
+    """
+    科目詳細資料
+    """
+    queryset = Subject.objects.all()
+    serializer_class = SubjectSerializer
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:19
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('question_bank', '0002_historyarchive_paperbundle_questionfingerprint_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Flashcard',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('ease_factor', models.FloatField(default=2.5, verbose_name='難易度係數')),
+                ('interval', models.IntegerField(default=1, verbose_name='複習間隔（天）')),
+                ('repetitions', models.IntegerField(default=0, verbose_name='重複次數')),
+                ('next_review_date', models.DateTimeField(default=django.utils.timezone.now, verbose_name='下次複習時間')),
+                ('last_review_date', models.DateTimeField(blank=True, null=True, verbose_name='上次複習時間')),
+                ('review_count', models.IntegerField(default=0, verbose_name='複習次數')),
+                ('correct_streak', models.IntegerField(default=0, verbose_name='連續答對次數')),
+                ('total_correct', models.IntegerField(default=0, verbose_name='總答對次數')),
+                ('total_wrong', models.IntegerField(default=0, verbose_name='總答錯次數')),
+                ('status', models.CharField(choices=[('new', '新卡片'), ('learning', '學習中'), ('review', '複習中'), ('mastered', '已掌握'), ('suspended', '已暫停')], default='new', max_length=20, verbose_name='狀態')),
+                ('custom_front', models.TextField(blank=True, verbose_name='自訂正面內容')),
+                ('custom_back', models.TextField(blank=True, verbose_name='自訂背面內容')),
+                ('personal_notes', models.TextField(blank=True, verbose_name='個人筆記')),
+                ('tags', models.JSONField(blank=True, default=list, verbose_name='標籤')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flashcards', to='question_bank.question', verbose_name='題目')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flashcards', to=settings.AUTH_USER_MODEL, verbose_name='使用者')),
+            ],
+            options={
+                'verbose_name': '快閃卡',
+                'verbose_name_plural': '快閃卡',
+                'db_table': 'flashcards',
+                'ordering': ['next_review_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FlashcardDeck',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=256, verbose_name='牌組名稱')),
+                ('description', models.TextField(blank=True, verbose_name='牌組描述')),
+                ('color', models.CharField(default='#007bff', max_length=20, verbose_name='顏色標籤')),
+                ('daily_new_cards', models.IntegerField(default=20, verbose_name='每日新卡片數')),
+                ('daily_review_limit', models.IntegerField(default=100, verbose_name='每日複習上限')),
+                ('is_active', models.BooleanField(default=True, verbose_name='啟用狀態')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+                ('flashcards', models.ManyToManyField(blank=True, related_name='decks', to='flashcards.flashcard', verbose_name='快閃卡')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flashcard_decks', to=settings.AUTH_USER_MODEL, verbose_name='使用者')),
+            ],
+            options={
+                'verbose_name': '快閃卡牌組',
+                'verbose_name_plural': '快閃卡牌組',
+                'db_table': 'flashcard_decks',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FlashcardReview',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('quality', models.IntegerField(verbose_name='質量評分')),
+                ('time_spent', models.IntegerField(default=0, verbose_name='花費時間（秒）')),
+                ('ease_factor_before', models.FloatField(verbose_name='複習前難易度')),
+                ('ease_factor_after', models.FloatField(verbose_name='複習後難易度')),
+                ('interval_before', models.IntegerField(verbose_name='複習前間隔')),
+                ('interval_after', models.IntegerField(verbose_name='複習後間隔')),
+                ('reviewed_at', models.DateTimeField(auto_now_add=True, verbose_name='複習時間')),
+                ('flashcard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='flashcards.flashcard', verbose_name='快閃卡')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flashcard_reviews', to=settings.AUTH_USER_MODEL, verbose_name='使用者')),
+            ],
+            options={
+                'verbose_name': '快閃卡複習紀錄',
+                'verbose_name_plural': '快閃卡複習紀錄',
+                'db_table': 'flashcard_reviews',
+                'ordering': ['-reviewed_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'next_review_date'], name='flashcards_user_id_39ccba_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='flashcard',
+            index=models.Index(fields=['user', 'status'], name='flashcards_user_id_06de73_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='flashcard',
+            unique_together={('user', 'question')},
+        ),
+        migrations.AddIndex(
+            model_name='flashcardreview',
+            index=models.Index(fields=['user', 'reviewed_at'], name='flashcard_r_user_id_8bffd1_idx'),
+        ),
+    ]
@@ -137,6 +137,9 @@ class FlashcardReview(models.Model):
         db_table = 'flashcard_reviews'
         verbose_name = '快閃卡複習紀錄'
         verbose_name_plural = '快閃卡複習紀錄'
+        indexes = [
+            models.Index(fields=['user', 'reviewed_at']),
+        ]
         ordering = ['-reviewed_at']
 
     def __str__(self):
@@ -0,0 +1,319 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections
+from django.test import Client
+
+
+FLOWS = {}
+
+
+def flow(name, weight=1):
+    """
+    註冊一個負載測試流程。流程函式接收 (session, context)，
+    以 session.get / session.post 發出請求，回應狀態碼不符時會拋出 FlowError。
+    """
+    def decorator(func):
+        FLOWS[name] = {"func": func, "weight": weight}
+        return func
+    return decorator
+
+
+class FlowError(Exception):
+    pass
+
+
+class Response:
+    def __init__(self, status_code, body, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class InProcessSession:
+    """
+    以 django.test.Client 在同一行程內送出請求 (經過完整 middleware)
+    """
+    def __init__(self):
+        self.client = Client()
+        self.headers = {}
+
+    def request(self, method, path, data=None, expect=200, headers=None, **kwargs):
+        extra = {
+            f"HTTP_{key.upper().replace('-', '_')}": value
+            for key, value in {**self.headers, **(headers or {})}.items()
+        }
+        if method == "GET":
+            response = self.client.get(path, data, **extra)
+        elif "files" in kwargs:
+            files = {
+                name: SimpleUploadedFile(filename, content)
+                for name, (filename, content) in kwargs["files"].items()
+            }
+            response = self.client.post(path, {**(data or {}), **files}, **extra)
+        else:
+            response = self.client.post(path, data or {}, content_type="application/json", **extra)
+        return _check(method, path, Response(response.status_code, response.content, response.headers), expect)
+
+    def get(self, path, data=None, expect=200, headers=None):
+        return self.request("GET", path, data, expect, headers)
+
+    def post(self, path, data=None, expect=200, **kwargs):
+        return self.request("POST", path, data, expect, **kwargs)
+
+
+class HTTPSession:
+    """
+    對執行中的伺服器 (runserver / gunicorn / uvicorn) 送出 HTTP 請求
+    """
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {}
+
+    def request(self, method, path, data=None, expect=200, headers=None, **kwargs):
+        url = self.base_url + path
+        headers = {**self.headers, **(headers or {})}
+        body = None
+        if "files" in kwargs:
+            body, content_type = _multipart(data or {}, kwargs["files"])
+            headers["Content-Type"] = content_type
+        elif method == "GET" and data:
+            url += "?" + urllib.parse.urlencode(data)
+        elif method != "GET":
+            body = json.dumps(data or {}).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=60) as response:
+                result = Response(response.status, response.read(), response.headers)
+        except urllib.error.HTTPError as e:
+            result = Response(e.code, e.read(), e.headers)
+        return _check(method, path, result, expect)
+
+    def get(self, path, data=None, expect=200, headers=None):
+        return self.request("GET", path, data, expect, headers)
+
+    def post(self, path, data=None, expect=200, **kwargs):
+        return self.request("POST", path, data, expect, **kwargs)
+
+
+def _check(method, path, response, expect):
+    expected = expect if isinstance(expect, (tuple, list, set)) else (expect,)
+    if response.status_code not in expected:
+        raise FlowError(f"{method} {path} 回應 {response.status_code}")
+    return response
+
+
+def _multipart(fields, files):
+    boundary = f"----loadtest{time.time_ns()}"
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode("utf-8")
+        )
+    for name, (filename, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode("utf-8") + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode("utf-8"))
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class LoadTestResult:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.error_samples = {}
+
+    def record(self, name, elapsed, error=None):
+        with self.lock:
+            if error is None:
+                self.latencies.setdefault(name, []).append(elapsed)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+                self.error_samples.setdefault(name, str(error))
+
+    def report(self, duration):
+        rows = []
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            latencies = sorted(self.latencies.get(name, []))
+            rows.append({
+                "flow": name,
+                "requests": len(latencies),
+                "errors": self.errors.get(name, 0),
+                "throughput": len(latencies) / duration if duration else 0,
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0,
+                "error_sample": self.error_samples.get(name, ""),
+            })
+        return rows
+
+
+def run_load_test(session_factory, context_factory, flows, concurrency, duration=None, iterations=None):
+    """
+    以 concurrency 個執行緒依權重輪流執行 flows，直到時間或次數用完。
+    每個執行緒有自己的 session 與 context (例如登入後的 JWT)。
+    """
+    result = LoadTestResult()
+    schedule = [name for name in flows for _ in range(FLOWS[name]["weight"])]
+    deadline = time.perf_counter() + duration if duration else None
+    remaining = [iterations] if iterations else None
+    remaining_lock = threading.Lock()
+
+    def take():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if remaining is not None:
+            with remaining_lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+        return True
+
+    def worker(index):
+        rng = random.Random(index)
+        try:
+            session = session_factory()
+            context = context_factory(session, index)
+            while take():
+                name = rng.choice(schedule)
+                start = time.perf_counter()
+                try:
+                    FLOWS[name]["func"](session, context)
+                except Exception as e:
+                    result.record(name, time.perf_counter() - start, error=e)
+                else:
+                    result.record(name, time.perf_counter() - start)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return result.report(time.perf_counter() - started)
+
+
+# Key API flows
+
+@flow("auth.login")
+def login_flow(session, context):
+    session.post("/api/v1/auth/login/", {"username": context["username"], "password": context["password"]})
+
+
+@flow("auth.refresh")
+def refresh_flow(session, context):
+    response = session.post("/api/v1/auth/refresh/", {"refresh": context["refresh"]})
+    # ROTATE_REFRESH_TOKENS 開啟時需改用新的 refresh token
+    context["refresh"] = response.json().get("refresh", context["refresh"])
+
+
+@flow("schema.openapi")
+def schema_flow(session, context):
+    session.get("/swagger.json/")
+
+
+@flow("catalog.sessions", weight=3)
+def catalog_sessions_flow(session, context):
+    response = session.get("/api/exams/sessions/")
+    context["catalog_etag"] = response.headers.get("ETag")
+
+
+@flow("catalog.sessions_conditional", weight=3)
+def catalog_sessions_conditional_flow(session, context):
+    headers = {"If-None-Match": context["catalog_etag"]} if context.get("catalog_etag") else {}
+    response = session.get("/api/exams/sessions/", headers=headers, expect=(200, 304))
+    context["catalog_etag"] = response.headers.get("ETag")
+
+
+@flow("catalog.subjects")
+def catalog_subjects_flow(session, context):
+    subjects = session.get("/api/exams/subjects/").json()
+    roots = [subject["id"] for subject in subjects if subject["parent"] is None]
+    if roots:
+        context["subject_id"] = random.choice(roots)
+
+
+@flow("questions.list", weight=3)
+def questions_list_flow(session, context):
+    params = {"subject": context["subject_id"]} if context.get("subject_id") else {}
+    response = session.get("/api/question_bank/questions/", params)
+    results = response.json()["results"]
+    if results:
+        context["question_id"] = results[0]["id"]
+
+
+@flow("questions.detail", weight=3)
+def question_detail_flow(session, context):
+    if not context.get("question_id"):
+        questions_list_flow(session, context)
+    if context.get("question_id"):
+        session.get(f"/api/question_bank/questions/{context['question_id']}/")
+
+
+@flow("attempts.stats")
+def attempt_stats_flow(session, context):
+    session.get("/api/question_bank/attempts/stats/")
+
+
+@flow("pdf.extract_questions")
+def extract_questions_flow(session, context):
+    if not context.get("question_pdf"):
+        raise FlowError("未指定 --question-pdf")
+    session.post(
+        "/api/question_bank/extract-questions-pdf/",
+        files={"file": ("questions.pdf", context["question_pdf"])},
+    )
+
+
+@flow("pdf.extract_answers")
+def extract_answers_flow(session, context):
+    if not context.get("answer_pdf"):
+        raise FlowError("未指定 --answer-pdf")
+    session.post(
+        "/api/question_bank/extract-answers-pdf/",
+        files={"file": ("answers.pdf", context["answer_pdf"])},
+    )
+
+
+@flow("pdf.extract_questions_async")
+def extract_questions_async_flow(session, context):
+    if not context.get("question_pdf"):
+        raise FlowError("未指定 --question-pdf")
+    session.post(
+        "/api/question_bank/async/extract-questions-pdf/",
+        files={"file": ("questions.pdf", context["question_pdf"])},
+    )
+
+
+@flow("pdf.extract_answers_async")
+def extract_answers_async_flow(session, context):
+    if not context.get("answer_pdf"):
+        raise FlowError("未指定 --answer-pdf")
+    session.post(
+        "/api/question_bank/async/extract-answers-pdf/",
+        files={"file": ("answers.pdf", context["answer_pdf"])},
+    )
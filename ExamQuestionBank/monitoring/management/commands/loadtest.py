@@ -0,0 +1,94 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.loadtest import FLOWS, InProcessSession, HTTPSession, run_load_test
+
+
+class Command(BaseCommand):
+    help = "以多執行緒同時執行主要 API 流程，回報各流程的吞吐量與 p50/p95/p99 延遲"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flows", help=f"以逗號分隔的流程名稱，可用：{', '.join(sorted(FLOWS))}")
+        parser.add_argument("--concurrency", type=int, default=8, help="同時執行的執行緒數")
+        parser.add_argument("--duration", type=float, default=30, help="執行秒數")
+        parser.add_argument("--iterations", type=int, help="總執行次數 (指定時忽略 --duration)")
+        parser.add_argument("--base-url", help="對執行中的伺服器送出請求，未指定時於本行程內執行")
+        parser.add_argument("--username-prefix", default="user", help="登入使用的帳號前綴 (generate_dataset 產生)")
+        parser.add_argument("--password", default="loadtest-password", help="登入密碼")
+        parser.add_argument("--question-pdf", help="pdf.extract_questions 使用的試卷 PDF")
+        parser.add_argument("--answer-pdf", help="pdf.extract_answers 使用的答案 PDF")
+        parser.add_argument("--json-output", help="將結果另存為 JSON")
+
+    def handle(self, *args, **options):
+        pdfs = {}
+        for key in ("question_pdf", "answer_pdf"):
+            if options[key]:
+                with open(options[key], "rb") as f:
+                    pdfs[key] = f.read()
+
+        if options["flows"]:
+            flows = [name.strip() for name in options["flows"].split(",") if name.strip()]
+            unknown = [name for name in flows if name not in FLOWS]
+            if unknown:
+                raise CommandError(f"未知的流程：{', '.join(unknown)}")
+        else:
+            flows = [
+                name for name in sorted(FLOWS)
+                if not (name.startswith("pdf.extract_questions") and "question_pdf" not in pdfs)
+                and not (name.startswith("pdf.extract_answers") and "answer_pdf" not in pdfs)
+            ]
+
+        usernames = list(
+            get_user_model().objects
+            .filter(username__startswith=options["username_prefix"], is_active=True)
+            .order_by("id")
+            .values_list("username", flat=True)[:options["concurrency"]]
+        )
+        if not usernames:
+            raise CommandError("找不到可登入的使用者，請先執行 generate_dataset")
+
+        if options["base_url"]:
+            session_factory = lambda: HTTPSession(options["base_url"])  # noqa: E731
+        else:
+            session_factory = InProcessSession
+
+        def context_factory(session, index):
+            context = {
+                "username": usernames[index % len(usernames)],
+                "password": options["password"],
+                **pdfs,
+            }
+            tokens = session.post("/api/v1/auth/login/", {
+                "username": context["username"],
+                "password": context["password"],
+            }).json()
+            context["refresh"] = tokens["refresh"]
+            session.headers["Authorization"] = f"Bearer {tokens['access']}"
+            return context
+
+        duration = None if options["iterations"] else options["duration"]
+        self.stdout.write(
+            f"流程：{', '.join(flows)}，{options['concurrency']} 個執行緒，"
+            + (f"共 {options['iterations']} 次" if options["iterations"] else f"{duration:g} 秒")
+        )
+        rows = run_load_test(
+            session_factory, context_factory, flows,
+            concurrency=options["concurrency"], duration=duration, iterations=options["iterations"],
+        )
+
+        self.stdout.write(
+            f"{'flow':<28}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['flow']:<28}{row['requests']:>10}{row['errors']:>8}{row['throughput']:>10.1f}"
+                f"{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}{row['p99'] * 1000:>10.1f}"
+            )
+            if row["error_sample"]:
+                self.stderr.write(f"  {row['flow']} 錯誤範例：{row['error_sample']}")
+
+        if options["json_output"]:
+            with open(options["json_output"], "w", encoding="utf-8") as f:
+                json.dump(rows, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.profiling import ProfileStore
+
+
+class Command(BaseCommand):
+    help = "列出、檢視或清除 ProfilingMiddleware 儲存的請求 profile"
+
+    def add_arguments(self, parser):
+        subparsers = parser.add_subparsers(dest="action", required=True)
+
+        subparsers.add_parser("list", help="由新到舊列出 profile")
+
+        show = subparsers.add_parser("show", help="輸出單一 profile 耗時最多的函式")
+        show.add_argument("profile_id", help="profile 編號，可用開頭字元或 latest")
+        show.add_argument(
+            "--sort",
+            default="cumulative",
+            choices=["cumulative", "tottime", "ncalls", "pcalls"],
+            help="排序方式",
+        )
+        show.add_argument("--limit", type=int, default=30, help="列出的函式數量")
+
+        subparsers.add_parser("clear", help="刪除所有 profile")
+
+    def handle(self, *args, **options):
+        store = ProfileStore()
+
+        if options["action"] == "list":
+            profiles = store.list()
+            if not profiles:
+                self.stdout.write("尚無 profile")
+            for item in profiles:
+                self.stdout.write(
+                    f"{item['id']}  {item['created_at']}  {item['method']} {item['path']}  "
+                    f"view={item['view']} role={item['user_role']} status={item['status']}  "
+                    f"{item['duration'] * 1000:.1f}ms  queries={item['query_count']} "
+                    f"({item['query_time'] * 1000:.1f}ms)  [{item['trigger']}]"
+                )
+
+        elif options["action"] == "show":
+            profile_id = self.find(store, options["profile_id"])
+            item = store.metadata(profile_id)
+            self.stdout.write(
+                f"{item['method']} {item['path']} (view={item['view']}, role={item['user_role']}, "
+                f"queries={item['query_count']}, {item['duration'] * 1000:.1f}ms)"
+            )
+            self.stdout.write(store.render(profile_id, sort=options["sort"], limit=options["limit"]))
+
+        elif options["action"] == "clear":
+            store.clear()
+            self.stdout.write(self.style.SUCCESS("已刪除所有 profile"))
+
+    def find(self, store, prefix):
+        ids = store.ids()
+        if prefix == "latest" and ids:
+            return ids[-1]
+        matches = [profile_id for profile_id in ids if profile_id.startswith(prefix)]
+        if len(matches) != 1:
+            raise CommandError(f"找不到唯一符合 {prefix} 的 profile")
+        return matches[0]
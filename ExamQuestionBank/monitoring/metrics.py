@@ -0,0 +1,244 @@
+import bisect
+import contextlib
+import threading
+import time
+
+from django.conf import settings
+
+
+# 秒
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+QUEUE_WAIT_BUCKETS = (0, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Gauge:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self.lock:
+            self.value -= amount
+
+    def snapshot(self):
+        return {"value": self.value}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """以桶上界估計分位數"""
+        if self.count == 0:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.sum / self.count if self.count else 0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class MetricFamily:
+    """
+    同名指標的集合，依標籤值區分
+    """
+    def __init__(self, name, kind, documentation, labelnames, buckets=None):
+        self.name = name
+        self.kind = kind
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = buckets
+        self.children = {}
+
+    def labels(self, *values):
+        child = self.children.get(values)
+        if child is None:
+            if self.kind == "histogram":
+                child = Histogram(self.buckets)
+            elif self.kind == "gauge":
+                child = Gauge()
+            else:
+                child = Counter()
+            child = self.children.setdefault(values, child)
+        return child
+
+
+class MetricsRegistry:
+    """
+    行程內的指標彙總，各 worker 各自累計
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.families = {}
+
+    def _family(self, name, kind, documentation, labelnames, buckets=None):
+        family = self.families.get(name)
+        if family is None:
+            with self.lock:
+                family = self.families.setdefault(
+                    name, MetricFamily(name, kind, documentation, labelnames, buckets)
+                )
+        return family
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._family(name, "counter", documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._family(name, "gauge", documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._family(name, "histogram", documentation, labelnames, buckets)
+
+    def reset(self):
+        with self.lock:
+            for family in self.families.values():
+                family.children.clear()
+
+    def render_prometheus(self):
+        """輸出 Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            families = sorted(self.families.values(), key=lambda f: f.name)
+            for family in families:
+                lines.append(f"# HELP {family.name} {family.documentation}")
+                lines.append(f"# TYPE {family.name} {family.kind}")
+                for values, child in sorted(family.children.items()):
+                    labels = dict(zip(family.labelnames, values))
+                    if family.kind == "histogram":
+                        cumulative = 0
+                        for bound, count in zip(family.buckets, child.counts):
+                            cumulative += count
+                            lines.append(f"{family.name}_bucket{_labels(labels, le=_number(bound))} {cumulative}")
+                        lines.append(f"{family.name}_bucket{_labels(labels, le='+Inf')} {child.count}")
+                        lines.append(f"{family.name}_sum{_labels(labels)} {_number(child.sum)}")
+                        lines.append(f"{family.name}_count{_labels(labels)} {child.count}")
+                    else:
+                        lines.append(f"{family.name}{_labels(labels)} {_number(child.value)}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """輸出 JSON 摘要"""
+        result = {}
+        with self.lock:
+            for family in self.families.values():
+                result[family.name] = [
+                    {"labels": dict(zip(family.labelnames, values)), **child.snapshot()}
+                    for values, child in sorted(family.children.items())
+                ]
+        return result
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, **extra):
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = MetricsRegistry()
+
+request_latency = registry.histogram(
+    "http_request_duration_seconds", "API 請求處理時間", ["view", "method", "status"],
+)
+db_queries = registry.histogram(
+    "http_request_db_queries", "每個請求的資料庫查詢次數", ["view"], buckets=QUERY_COUNT_BUCKETS,
+)
+db_time = registry.counter(
+    "http_request_db_seconds_total", "每個 view 累計資料庫查詢時間", ["view"],
+)
+cache_requests = registry.counter(
+    "cache_requests_total", "快取查詢次數", ["cache", "result"],
+)
+phase_latency = registry.histogram(
+    "phase_duration_seconds", "處理階段耗時 (如 PDF 解析)", ["phase"],
+)
+admission_active = registry.gauge(
+    "admission_active_requests", "通過准入控制、執行中的請求數", ["pool"],
+)
+admission_queue_depth = registry.gauge(
+    "admission_queue_depth", "排隊等待執行的請求數", ["pool"],
+)
+admission_wait = registry.histogram(
+    "admission_wait_seconds", "請求在准入佇列中的等待時間", ["pool", "result"], buckets=QUEUE_WAIT_BUCKETS,
+)
+admission_rejected = registry.counter(
+    "admission_rejected_total", "被拒絕 (429) 的請求數", ["pool", "reason"],
+)
+
+
+def enabled():
+    return getattr(settings, "METRICS_ENABLED", False)
+
+
+def record_cache(cache, hit):
+    """紀錄快取命中 / 未命中"""
+    if enabled():
+        cache_requests.labels(cache, "hit" if hit else "miss").inc()
+
+
+@contextlib.contextmanager
+def observe_phase(phase):
+    """量測處理階段耗時"""
+    if not enabled():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_latency.labels(phase).observe(time.perf_counter() - start)
@@ -0,0 +1,187 @@
+import cProfile
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from . import metrics
+from .profiling import ProfileStore
+
+
+class QueryTracker:
+    """
+    connection.execute_wrapper，累計查詢次數與耗時
+    """
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+def add_wrapper(tracker):
+    # connection 依執行緒區分，須在 sync_to_async 的執行緒中取得
+    connection.execute_wrappers.append(tracker)
+
+
+def remove_wrapper(tracker):
+    connection.execute_wrappers.remove(tracker)
+
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        # 未對應到路由的請求合併為同一標籤，避免標籤數量無限成長
+        return "<unmatched>"
+    return match.view_name or match._func_path
+
+
+class MetricsMiddleware:
+    """
+    紀錄每個 view 的延遲分佈、資料庫查詢次數與時間 (METRICS_ENABLED 為 True 時啟用)
+
+    ASGI 下查詢在請求專屬的 sync_to_async (thread_sensitive) 執行緒中執行，
+    因此在同一執行緒的連線上掛上 QueryTracker。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "METRICS_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        tracker = QueryTracker()
+        start = time.perf_counter()
+        with connection.execute_wrapper(tracker):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        self.record(request, response, elapsed, tracker)
+        return response
+
+    async def __acall__(self, request):
+        tracker = QueryTracker()
+        await sync_to_async(add_wrapper)(tracker)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            elapsed = time.perf_counter() - start
+            await sync_to_async(remove_wrapper)(tracker)
+        self.record(request, response, elapsed, tracker)
+        return response
+
+    def record(self, request, response, elapsed, tracker):
+        view = view_label(request)
+        metrics.request_latency.labels(view, request.method, str(response.status_code)).observe(elapsed)
+        metrics.db_queries.labels(view).observe(tracker.count)
+        metrics.db_time.labels(view).inc(tracker.duration)
+
+
+def is_admin(user):
+    return bool(user and user.is_authenticated and (user.is_staff or getattr(user, "role", None) == "admin"))
+
+
+def resolve_user(request):
+    """
+    在 view 執行前以 DRF 的驗證類別 (JWT / Session) 取得使用者
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        return Request(request, authenticators=authenticators).user
+    except APIException:
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    對單一請求執行 cProfile 並存入 ProfileStore。
+
+    觸發方式：管理員帶 X-Profile: 1 標頭或 ?profile=1 參數，
+    或依 PROFILING_SAMPLE_RATE 每 N 個請求隨機抽樣一次。
+
+    只在 WSGI 下 profiling：ASGI 的事件迴圈同時執行多個請求，結果無法歸屬於單一請求，因此直接放行。
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.store = ProfileStore()
+
+    def trigger(self, request):
+        if request.headers.get("X-Profile") == "1" or request.GET.get("profile") == "1":
+            if is_admin(resolve_user(request)):
+                return "admin"
+        # 非管理員帶標頭時照常抽樣，不能藉此避開抽樣
+        if self.sample_rate and random.randrange(self.sample_rate) == 0:
+            return "sample"
+        return None
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.get_response(request)
+
+        trigger = self.trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        tracker = QueryTracker()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        with connection.execute_wrapper(tracker):
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = time.perf_counter() - start
+
+        user = getattr(request, "user", None)
+        authenticated = bool(user and user.is_authenticated)
+        profile_id = self.store.save(profiler, {
+            "created_at": timezone.now().isoformat(),
+            "trigger": trigger,
+            "method": request.method,
+            "path": request.path,
+            "view": view_label(request),
+            "status": response.status_code,
+            "user_id": user.pk if authenticated else None,
+            "user_role": getattr(user, "role", None) if authenticated else "anonymous",
+            "duration": elapsed,
+            "query_count": tracker.count,
+            "query_time": tracker.duration,
+        })
+        if trigger == "admin":
+            response["X-Profile-Id"] = profile_id
+        return response
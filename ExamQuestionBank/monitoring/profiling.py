@@ -0,0 +1,77 @@
+import io
+import json
+import os
+import pstats
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+
+class ProfileStore:
+    """
+    固定容量的 profile 環狀儲存區，超過上限時刪除最舊的紀錄
+    """
+    def __init__(self, directory=None, max_profiles=None):
+        self.directory = Path(directory or settings.PROFILING_DIR)
+        self.max_profiles = max_profiles or settings.PROFILING_MAX_PROFILES
+
+    def _meta_path(self, profile_id):
+        return self.directory / f"{profile_id}.json"
+
+    def _stats_path(self, profile_id):
+        return self.directory / f"{profile_id}.prof"
+
+    def save(self, profiler, metadata):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # 以時間為前綴，檔名排序即為時間順序
+        profile_id = f"{time.time_ns() // 1000:x}-{uuid.uuid4().hex[:6]}"
+        profiler.dump_stats(self._stats_path(profile_id))
+        metadata = {"id": profile_id, **metadata}
+        with open(self._meta_path(profile_id), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, ensure_ascii=False)
+        self.prune()
+        return profile_id
+
+    def ids(self):
+        if not self.directory.exists():
+            return []
+        return sorted(path.stem for path in self.directory.glob("*.json"))
+
+    def prune(self):
+        ids = self.ids()
+        for profile_id in ids[:max(0, len(ids) - self.max_profiles)]:
+            self.delete(profile_id)
+
+    def delete(self, profile_id):
+        for path in (self._meta_path(profile_id), self._stats_path(profile_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for profile_id in self.ids():
+            self.delete(profile_id)
+
+    def metadata(self, profile_id):
+        with open(self._meta_path(profile_id), encoding="utf-8") as f:
+            return json.load(f)
+
+    def list(self):
+        """由新到舊列出所有 profile 的請求資訊"""
+        result = []
+        for profile_id in reversed(self.ids()):
+            try:
+                result.append(self.metadata(profile_id))
+            except (OSError, ValueError):
+                continue
+        return result
+
+    def render(self, profile_id, sort="cumulative", limit=30):
+        """輸出耗時最多的函式"""
+        stream = io.StringIO()
+        stats = pstats.Stats(str(self._stats_path(profile_id)), stream=stream)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
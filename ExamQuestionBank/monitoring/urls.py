@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import PrometheusMetricsView, MetricsSummaryView
+
+urlpatterns = [
+    path("metrics/", PrometheusMetricsView.as_view(), name="metrics-prometheus"),
+    path("metrics/summary/", MetricsSummaryView.as_view(), name="metrics-summary"),
+]
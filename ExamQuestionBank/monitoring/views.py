@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.permissions import BasePermission
+from rest_framework import status
+from drf_yasg.utils import swagger_auto_schema
+
+from . import metrics
+
+
+class CanViewMetrics(BasePermission):
+    """
+    管理員，或帶有 X-Metrics-Token 標頭 (Prometheus 抓取用) 的請求
+    """
+    def has_permission(self, request, view):
+        token = getattr(settings, "METRICS_TOKEN", "")
+        if token and constant_time_compare(request.headers.get("X-Metrics-Token", ""), token):
+            return True
+        return bool(request.user and request.user.is_staff)
+
+
+class PrometheusMetricsView(APIView):
+    """
+    以 Prometheus text format 輸出本行程的指標
+    """
+    permission_classes = [CanViewMetrics]
+
+    @swagger_auto_schema(auto_schema=None)
+    def get(self, request):
+        if not metrics.enabled():
+            return Response({"error": "尚未啟用指標收集"}, status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(
+            metrics.registry.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
+class MetricsSummaryView(APIView):
+    """
+    以 JSON 輸出本行程的指標摘要 (含估計的 p50/p95/p99)
+    """
+    permission_classes = [CanViewMetrics]
+
+    @swagger_auto_schema(operation_summary="取得效能指標摘要")
+    def get(self, request):
+        if not metrics.enabled():
+            return Response({"error": "尚未啟用指標收集"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(metrics.registry.summary(), status=status.HTTP_200_OK)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class QuestionBankConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'question_bank'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,39 @@
+import django_filters
+
+from exams.filters import ExamSeriesFilter, SubjectTreeFilter
+from .models import Question, QuestionAttempt, PracticeSession
+
+
+class QuestionFilter(django_filters.FilterSet):
+    subject = SubjectTreeFilter(field_name='subject_id', label="科目 (含下層科目)")
+    exam_series = ExamSeriesFilter(field_name='exam_session_id', label="考試別")
+    # 答對率由資料庫計算 (已建立索引)，例如 ?subject=<刑法>&min_attempts=30&ordering=accuracy_rate 列出最難的題目
+    accuracy_min = django_filters.NumberFilter(field_name='accuracy_rate', lookup_expr='gte', label="最低答對率 (%)")
+    accuracy_max = django_filters.NumberFilter(field_name='accuracy_rate', lookup_expr='lte', label="最高答對率 (%)")
+    min_attempts = django_filters.NumberFilter(field_name='attempt_count', lookup_expr='gte', label="最少作答次數")
+
+    class Meta:
+        model = Question
+        fields = [
+            'exam_session', 'exam_series', 'subject', 'question_type', 'difficulty', 'status',
+            'accuracy_min', 'accuracy_max', 'min_attempts',
+        ]
+
+
+class PracticeSessionFilter(django_filters.FilterSet):
+    subject = SubjectTreeFilter(field_name='subject_id', label="科目 (含下層科目)")
+
+    class Meta:
+        model = PracticeSession
+        fields = ['mode', 'status', 'exam_session', 'subject']
+
+
+class QuestionAttemptFilter(django_filters.FilterSet):
+    subject = SubjectTreeFilter(field_name='question__subject_id', label="科目 (含下層科目)")
+    exam_session = django_filters.NumberFilter(field_name='question__exam_session_id', label="考試場次")
+    since = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte', label="起始時間")
+    until = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt', label="結束時間")
+
+    class Meta:
+        model = QuestionAttempt
+        fields = ['subject', 'exam_session', 'is_correct', 'since', 'until']
@@ -0,0 +1,73 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from question_bank.models import HistoryArchive
+from question_bank.services import archive
+
+
+class Command(BaseCommand):
+    help = "將早於截止日的作答紀錄與快閃卡複習紀錄封存為每位使用者每月的壓縮欄式檔案"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="封存此日期 (YYYY-MM-DD) 之前的紀錄，預設為 HISTORY_ARCHIVE_AFTER_DAYS 天前",
+        )
+        parser.add_argument(
+            "--kind",
+            choices=[*archive.KINDS, "all"],
+            default="all",
+            help="要封存的紀錄類型",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="只列出待封存的分組，不寫入")
+        parser.add_argument("--verify", action="store_true", help="檢查既有封存檔的完整性")
+
+    def handle(self, *args, **options):
+        if options["verify"]:
+            return self.verify()
+
+        if options["before"]:
+            try:
+                before = datetime.date.fromisoformat(options["before"])
+            except ValueError:
+                raise CommandError("--before 格式必須為 YYYY-MM-DD")
+            cutoff = timezone.make_aware(datetime.datetime(before.year, before.month, before.day))
+        else:
+            cutoff = timezone.now() - datetime.timedelta(days=settings.HISTORY_ARCHIVE_AFTER_DAYS)
+
+        kinds = list(archive.KINDS) if options["kind"] == "all" else [options["kind"]]
+        for kind in kinds:
+            groups = archive.pending_groups(kind, cutoff)
+            total_groups = total_rows = 0
+            for group in groups:
+                month = timezone.localtime(group["month"]).date()
+                if options["dry_run"]:
+                    self.stdout.write(f"{kind} user={group['user_id']} {month:%Y-%m}: {group['row_count']} 筆")
+                    rows = group["row_count"]
+                else:
+                    rows = archive.archive_group(kind, group["user_id"], month, cutoff)
+                total_groups += 1
+                total_rows += rows
+
+            action = "待封存" if options["dry_run"] else "已封存"
+            self.stdout.write(self.style.SUCCESS(
+                f"{kind}: {action} {total_rows} 筆 ({total_groups} 組)，截止 {cutoff:%Y-%m-%d %H:%M}"
+            ))
+
+    def verify(self):
+        broken = 0
+        for item in HistoryArchive.objects.iterator():
+            try:
+                ok = archive.verify_archive(item)
+            except (OSError, ValueError):
+                ok = False
+            if not ok:
+                broken += 1
+                self.stderr.write(f"封存檔損毀或遺失: {item.file_path}")
+
+        if broken:
+            raise CommandError(f"{broken} 個封存檔驗證失敗")
+        self.stdout.write(self.style.SUCCESS("所有封存檔驗證通過"))
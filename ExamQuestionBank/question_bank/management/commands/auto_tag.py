@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from question_bank.models import Question
+from question_bank.services import tagger
+
+
+class Command(BaseCommand):
+    help = (
+        "以所有標籤名稱與法條引用建立 Aho-Corasick 自動機，掃描題目、選項與解析並補上自動標籤 "
+        "(保留既有標籤，不存在的法條標籤會自動建立)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=tagger.BATCH_SIZE, help="每批處理的題數")
+        parser.add_argument("--dry-run", action="store_true", help="只計算，不寫入")
+
+    def handle(self, *args, **options):
+        question_ids = list(
+            Question.objects.filter(deleted_at__isnull=True).order_by("id").values_list("id", flat=True)
+        )
+        verbosity = options["verbosity"]
+
+        def progress(stats):
+            if verbosity > 1:
+                self.stdout.write(f"  {stats['questions']}/{len(question_ids)} 題，新增 {stats['relations']} 個關聯")
+
+        stats = tagger.backfill(
+            question_ids, batch_size=options["batch_size"], dry_run=options["dry_run"], progress=progress,
+        )
+        seconds = stats["seconds"]
+        self.stdout.write(self.style.SUCCESS(
+            f"{'(試算) ' if options['dry_run'] else ''}{stats['questions']} 題，"
+            f"新增 {stats['relations']} 個標籤關聯、{stats['tags']} 個法條標籤；"
+            f"建立自動機 {stats['compile_seconds']:.2f} 秒，掃描與寫入 {seconds:.1f} 秒 "
+            f"({stats['questions'] / seconds if seconds else 0:.0f} 題/秒，"
+            f"{stats['characters'] / seconds if seconds else 0:.0f} 字/秒)"
+        ))
@@ -0,0 +1,68 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from exams.models import ExamSession
+from question_bank.models import PaperBundle, Question
+from question_bank.services import bundles
+
+
+PRUNE_AFTER_SECONDS = 300
+
+class Command(BaseCommand):
+    help = (
+        "重建已發布場次各科目的整份試卷包 (內容未變動時不重寫)，"
+        "刪除未發布場次的試卷包與目錄中已不使用的檔案"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--session", type=int, action="append", help="只重建指定場次 (可重複指定)")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        papers = set(
+            Question.objects.filter(exam_session__is_published=True)
+            .order_by().values_list("exam_session_id", "subject_id").distinct()
+        )
+        # 已取消發布或已沒有題目的試卷包
+        previous = {
+            (session_id, subject_id): file_name
+            for session_id, subject_id, file_name in PaperBundle.objects.values_list(
+                "exam_session_id", "subject_id", "file_name",
+            )
+        }
+        papers.update(previous)
+        if options["session"]:
+            papers = {paper for paper in papers if paper[0] in options["session"]}
+
+        built = removed = 0
+        for paper in sorted(papers):
+            bundle = bundles.build(*paper)
+            if bundle is None:
+                removed += paper in previous
+            elif bundle.file_name != previous.get(paper):
+                built += 1
+        pruned = self.prune()
+        total = PaperBundle.objects.count()
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} 份試卷包 ({ExamSession.objects.filter(is_published=True).count()} 個已發布場次)，"
+            f"本次產生 {built} 份、移除 {removed} 份、清除 {pruned} 個未使用的檔案，"
+            f"{time.perf_counter() - started:.1f} 秒"
+        ))
+
+    @staticmethod
+    def prune():
+        """刪除目錄中資料表未引用的試卷包檔案 (略過剛寫入、可能尚未提交的檔案)"""
+        if not os.path.isdir(settings.PAPER_BUNDLE_DIR):
+            return 0
+        used = set(PaperBundle.objects.values_list("file_name", flat=True))
+        cutoff = time.time() - PRUNE_AFTER_SECONDS
+        pruned = 0
+        for file_name in os.listdir(settings.PAPER_BUNDLE_DIR):
+            path = bundles.bundle_path(file_name)
+            if bundles.FILE_NAME.match(file_name) and file_name not in used and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                pruned += 1
+        return pruned
@@ -0,0 +1,126 @@
+import json
+import time
+from itertools import groupby
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from exams.catalog import catalog
+from question_bank.models import Question, QuestionFingerprint, QuestionLSHBucket
+from question_bank.services import duplicates
+
+
+BATCH_SIZE = 1000
+# 同一桶超過此數量時只與桶中第一題比較，避免常見片段造成平方次比較
+MAX_BUCKET_PAIRS = 50
+
+
+class Command(BaseCommand):
+    help = (
+        "將整個題庫的近似重複題分群：補齊 (或以 --rebuild 重建) 題目指紋後，"
+        "依 LSH 分段找出候選配對，以簽章相似度確認並合併為群組"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rebuild", action="store_true", help="重新計算所有題目的指紋")
+        parser.add_argument("--threshold", type=float, help="相似度門檻 (預設 NEAR_DUPLICATE_THRESHOLD)")
+        parser.add_argument("--output", help="將群組以 JSON Lines 寫入檔案")
+        parser.add_argument("--show", type=int, default=10, help="顯示最大的幾個群組")
+
+    def handle(self, *args, **options):
+        threshold = options["threshold"] if options["threshold"] is not None else settings.NEAR_DUPLICATE_THRESHOLD
+        self.index(options["rebuild"])
+
+        started = time.perf_counter()
+        signatures = {
+            question_id: bytes(packed)
+            for question_id, packed in QuestionFingerprint.objects.values_list("question_id", "signature")
+            .iterator(chunk_size=BATCH_SIZE)
+        }
+        parents = {}
+        seen = set()
+        compared = 0
+        rows = QuestionLSHBucket.objects.order_by("bucket", "question_id").values_list("bucket", "question_id")
+        for _, group in groupby(rows.iterator(chunk_size=BATCH_SIZE * 10), key=lambda row: row[0]):
+            ids = [question_id for _, question_id in group]
+            if len(ids) < 2:
+                continue
+            for a, b in self.pairs(ids):
+                if (a, b) in seen or self.find(parents, a) == self.find(parents, b):
+                    continue
+                seen.add((a, b))
+                compared += 1
+                if duplicates.similarity(signatures[a], signatures[b]) >= threshold:
+                    self.union(parents, a, b)
+
+        clusters = {}
+        for question_id in parents:
+            clusters.setdefault(self.find(parents, question_id), []).append(question_id)
+        clusters = sorted(
+            (sorted(ids) for ids in clusters.values() if len(ids) > 1), key=lambda ids: (-len(ids), ids[0]),
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(signatures)} 題，比較 {compared} 組候選，{len(clusters)} 個群組共 "
+            f"{sum(map(len, clusters))} 題 (門檻 {threshold})，分群 {elapsed:.1f} 秒"
+        ))
+        self.show(clusters[:options["show"]])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                for ids in clusters:
+                    f.write(json.dumps({"questions": ids}) + "\n")
+            self.stdout.write(f"已寫入 {options['output']}")
+
+    def index(self, rebuild):
+        """計算缺少指紋 (或全部) 題目的指紋"""
+        queryset = Question.objects.order_by("id")
+        if not rebuild:
+            queryset = queryset.filter(fingerprint__isnull=True)
+        question_ids = list(queryset.values_list("id", flat=True))
+        if not question_ids:
+            return
+        started = time.perf_counter()
+        for start in range(0, len(question_ids), BATCH_SIZE):
+            duplicates.index_questions(question_ids[start:start + BATCH_SIZE], force=rebuild)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"計算 {len(question_ids)} 題指紋，{elapsed:.1f} 秒：{len(question_ids) / elapsed if elapsed else 0:.0f} 題/秒"
+        )
+
+    @staticmethod
+    def pairs(ids):
+        if len(ids) > MAX_BUCKET_PAIRS:
+            return [(ids[0], other) for other in ids[1:]]
+        return [(a, b) for i, a in enumerate(ids) for b in ids[i + 1:]]
+
+    @staticmethod
+    def find(parents, question_id):
+        root = question_id
+        while parents.get(root, root) != root:
+            root = parents[root]
+        # 路徑壓縮
+        while question_id != root:
+            parents[question_id], question_id = root, parents[question_id]
+        return root
+
+    def union(self, parents, a, b):
+        a, b = self.find(parents, a), self.find(parents, b)
+        parents.setdefault(a, a)
+        parents.setdefault(b, b)
+        if a != b:
+            parents[max(a, b)] = min(a, b)
+
+    def show(self, clusters):
+        questions = Question.objects.in_bulk([question_id for ids in clusters for question_id in ids])
+        for ids in clusters:
+            self.stdout.write(f"- {len(ids)} 題")
+            for question_id in ids[:5]:
+                question = questions[question_id]
+                self.stdout.write(
+                    f"    #{question_id} {catalog.session_name(question.exam_session_id)} "
+                    f"{catalog.subject_name(question.subject_id)} 第 {question.question_number} 題："
+                    f"{question.content[:40]}"
+                )
+            if len(ids) > 5:
+                self.stdout.write(f"    ... 另 {len(ids) - 5} 題")
@@ -0,0 +1,303 @@
+import contextlib
+import datetime
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from exams.models import ExamSeries, ExamSession, Subject
+from flashcards.models import Flashcard, FlashcardReview
+from question_bank.models import (
+    Question, QuestionOption, QuestionTag, QuestionTagRelation, QuestionAttempt
+)
+
+
+SERIES = [("司法官", "JUDGE"), ("律師", "LAWYER")]
+SUBJECTS = [
+    ("民法", "CIVIL"), ("刑法", "CRIMINAL"), ("行政法", "ADMIN"), ("憲法", "CONST"),
+    ("民事訴訟法", "CIVPRO"), ("刑事訴訟法", "CRIMPRO"), ("商事法", "COMMERCIAL"), ("國際公法", "INTL"),
+]
+SUBJECT_PARTS = [("總則", "GEN"), ("分則", "SPEC"), ("實務見解", "CASE")]
+TERMS = [
+    "善意第三人", "無權代理", "侵權行為", "不當得利", "債務不履行", "物權行為", "正當防衛", "緊急避難",
+    "共同正犯", "教唆犯", "比例原則", "信賴保護", "行政處分", "訴願", "基本權", "法律保留", "既判力",
+    "證據能力", "羈押", "公司負責人", "票據行為", "條約", "時效", "消滅時效", "撤銷權",
+]
+OPTION_LABELS = ["A", "B", "C", "D"]
+
+
+def sentence(rng, words=12):
+    return "，".join(rng.choice(TERMS) for _ in range(words // 3)) + "。"
+
+
+@contextlib.contextmanager
+def without_auto_now(*models):
+    """暫時停用 auto_now_add，讓產生的紀錄能分散在過去的時間"""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "依指定規模批次產生測試資料 (考試、場次、科目樹、題目、標籤、使用者、作答、快閃卡、複習紀錄)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--series", type=int, default=2, help="考試別數量")
+        parser.add_argument("--sessions-per-series", type=int, default=10, help="每個考試別的年度場次數")
+        parser.add_argument("--questions", type=int, default=5000, help="題目數量")
+        parser.add_argument("--tags", type=int, default=500, help="標籤數量")
+        parser.add_argument("--users", type=int, default=200, help="使用者數量")
+        parser.add_argument("--attempts", type=int, default=50000, help="作答紀錄數量")
+        parser.add_argument("--flashcards", type=int, default=5000, help="快閃卡數量")
+        parser.add_argument("--reviews", type=int, default=20000, help="快閃卡複習紀錄數量")
+        parser.add_argument("--days", type=int, default=730, help="作答與複習紀錄分佈的天數")
+        parser.add_argument("--scale", type=float, default=1.0, help="所有數量的倍率")
+        parser.add_argument("--batch-size", type=int, default=2000, help="bulk_create 批次大小")
+        parser.add_argument("--password", default="loadtest-password", help="產生的使用者密碼")
+        parser.add_argument("--seed", type=int, default=0, help="亂數種子")
+
+    def handle(self, *args, **options):
+        scale = options["scale"]
+        for key in ("questions", "tags", "users", "attempts", "flashcards", "reviews"):
+            options[key] = int(options[key] * scale)
+        if options["users"] < 1 or options["questions"] < 1:
+            raise CommandError("至少需要 1 位使用者與 1 道題目")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.days = options["days"]
+        # 以執行時間區分每次產生的資料，避免與既有唯一欄位衝突
+        self.run_id = f"{int(time.time()) % 1000000:06d}"
+
+        started = time.perf_counter()
+        sessions = self.step("考試別與場次", self.create_exams, options["series"], options["sessions_per_series"])
+        subjects = self.step("科目樹", self.create_subjects)
+        tags = self.step("標籤", self.create_tags, options["tags"])
+        questions = self.step("題目與選項", self.create_questions, options["questions"], sessions, subjects, tags)
+        users = self.step("使用者", self.create_users, options["users"], options["password"])
+        self.step("作答紀錄", self.create_attempts, options["attempts"], users, questions)
+        flashcards = self.step("快閃卡", self.create_flashcards, options["flashcards"], users, questions)
+        self.step("複習紀錄", self.create_reviews, options["reviews"], flashcards)
+
+        self.stdout.write(self.style.SUCCESS(f"完成，共花費 {time.perf_counter() - started:.1f} 秒"))
+
+    def step(self, label, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        count = len(result) if hasattr(result, "__len__") else result
+        self.stdout.write(f"{label}: {count} 筆 ({time.perf_counter() - started:.1f} 秒)")
+        return result
+
+    def bulk_create(self, model, objects):
+        """批次寫入並回傳新增資料的 id (依寫入順序)"""
+        last_id = model.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        with transaction.atomic():
+            for i in range(0, len(objects), self.batch_size):
+                model.objects.bulk_create(objects[i:i + self.batch_size])
+        return list(model.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True))
+
+    def random_time(self):
+        return self.now - datetime.timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    def create_exams(self, series_count, sessions_per_series):
+        series = []
+        for i in range(series_count):
+            name, code = SERIES[i] if i < len(SERIES) else (f"考試{i + 1}", f"EXAM{i + 1}")
+            series.append(ExamSeries(name=f"{name}-{self.run_id}", code=f"{code}-{self.run_id}"))
+        series_ids = self.bulk_create(ExamSeries, series)
+
+        this_year = self.now.year - 1911  # 民國年
+        sessions = [
+            ExamSession(
+                exam_series_id=series_id,
+                year=this_year - offset,
+                session_number=1,
+                is_published=offset > 0,
+            )
+            for series_id in series_ids
+            for offset in range(sessions_per_series)
+        ]
+        return self.bulk_create(ExamSession, sessions)
+
+    def create_subjects(self):
+        subject_ids = []
+        for name, code in SUBJECTS:
+            parent = Subject.objects.create(name=f"{name}-{self.run_id}", code=f"{code}-{self.run_id}")
+            subject_ids.append(parent.id)
+            for part_name, part_code in SUBJECT_PARTS:
+                child = Subject.objects.create(
+                    name=f"{name}{part_name}-{self.run_id}",
+                    code=f"{code}-{part_code}-{self.run_id}",
+                    parent=parent,
+                )
+                subject_ids.append(child.id)
+        return subject_ids
+
+    def create_tags(self, count):
+        tags = []
+        for i in range(count):
+            if i % 2:
+                name, category = f"{self.rng.choice(SUBJECTS)[0]}第{i}條", "法條"
+            else:
+                name, category = f"{self.rng.choice(TERMS)}{i}", "概念"
+            tags.append(QuestionTag(name=f"{name}-{self.run_id}", category=category))
+        return self.bulk_create(QuestionTag, tags)
+
+    def create_questions(self, count, sessions, subjects, tags):
+        rng = self.rng
+        numbers = {}
+        questions = []
+        for _ in range(count):
+            session_id, subject_id = rng.choice(sessions), rng.choice(subjects)
+            number = numbers[session_id, subject_id] = numbers.get((session_id, subject_id), 0) + 1
+            questions.append(Question(
+                exam_session_id=session_id,
+                subject_id=subject_id,
+                question_number=str(number),
+                content=sentence(rng, rng.randint(30, 120)),
+                question_type="multiple" if rng.random() < 0.15 else "single",
+                difficulty=rng.choice(["easy", "medium", "medium", "hard"]),
+                analysis=sentence(rng, 60) if rng.random() < 0.5 else "",
+                status="published" if rng.random() < 0.9 else "draft",
+            ))
+        question_ids = self.bulk_create(Question, questions)
+
+        # 每題四個選項，記錄正確選項供作答紀錄使用
+        options = []
+        answer_key = {}
+        for question_id, question in zip(question_ids, questions):
+            correct_count = 2 if question.question_type == "multiple" else 1
+            correct = set(rng.sample(range(4), correct_count))
+            answer_key[question_id] = correct
+            for index, label in enumerate(OPTION_LABELS):
+                options.append(QuestionOption(
+                    question_id=question_id,
+                    option_label=label,
+                    content=sentence(rng, rng.randint(9, 30)),
+                    is_correct=index in correct,
+                    order=index,
+                ))
+        option_ids = self.bulk_create(QuestionOption, options)
+
+        relations = []
+        if tags:
+            for question_id in question_ids:
+                for tag_id in rng.sample(tags, min(len(tags), rng.randint(0, 3))):
+                    relations.append(QuestionTagRelation(question_id=question_id, tag_id=tag_id))
+            self.bulk_create(QuestionTagRelation, relations)
+
+        # question_id -> (選項 id 列表, 正確選項 id 集合)
+        return {
+            question_id: (
+                option_ids[i * 4:i * 4 + 4],
+                {option_ids[i * 4 + index] for index in answer_key[question_id]},
+            )
+            for i, question_id in enumerate(question_ids)
+        }
+
+    def create_users(self, count, password):
+        User = get_user_model()
+        password = make_password(password)
+        users = [
+            User(
+                username=f"user{self.run_id}{i:07d}",
+                email=f"user{self.run_id}{i:07d}@example.com",
+                password=password,
+                role="admin" if i == 0 else "student",
+            )
+            for i in range(count)
+        ]
+        return self.bulk_create(User, users)
+
+    def create_attempts(self, count, users, questions):
+        rng = self.rng
+        question_ids = list(questions)
+        totals = {}
+        created = 0
+        with without_auto_now(QuestionAttempt):
+            for start in range(0, count, self.batch_size):
+                attempts = []
+                for _ in range(min(self.batch_size, count - start)):
+                    question_id = rng.choice(question_ids)
+                    option_ids, correct = questions[question_id]
+                    is_correct = rng.random() < 0.6
+                    selected = sorted(correct) if is_correct else [rng.choice(option_ids)]
+                    is_correct = set(selected) == correct
+                    attempts.append(QuestionAttempt(
+                        user_id=rng.choice(users),
+                        question_id=question_id,
+                        selected_options=selected,
+                        is_correct=is_correct,
+                        time_spent=rng.randint(10, 180),
+                        created_at=self.random_time(),
+                    ))
+                    attempt_total, correct_total = totals.get(question_id, (0, 0))
+                    totals[question_id] = (attempt_total + 1, correct_total + int(is_correct))
+                QuestionAttempt.objects.bulk_create(attempts)
+                created += len(attempts)
+
+        # 同步題目的作答統計
+        updates = [
+            Question(id=question_id, attempt_count=attempt_total, correct_count=correct_total)
+            for question_id, (attempt_total, correct_total) in totals.items()
+        ]
+        Question.objects.bulk_update(updates, ["attempt_count", "correct_count"], batch_size=self.batch_size)
+        return created
+
+    def create_flashcards(self, count, users, questions):
+        rng = self.rng
+        question_ids = list(questions)
+        count = min(count, len(users) * len(question_ids))
+        pairs = set()
+        while len(pairs) < count:
+            pairs.add((rng.choice(users), rng.choice(question_ids)))
+        flashcards = [
+            Flashcard(
+                user_id=user_id,
+                question_id=question_id,
+                status=rng.choice(["new", "learning", "review", "mastered"]),
+                next_review_date=self.now + datetime.timedelta(days=rng.randint(-10, 30)),
+            )
+            for user_id, question_id in pairs
+        ]
+        flashcard_ids = self.bulk_create(Flashcard, flashcards)
+        return [(flashcard_id, flashcard.user_id) for flashcard_id, flashcard in zip(flashcard_ids, flashcards)]
+
+    def create_reviews(self, count, flashcards):
+        if not flashcards:
+            return 0
+        rng = self.rng
+        created = 0
+        with without_auto_now(FlashcardReview):
+            for start in range(0, count, self.batch_size):
+                reviews = []
+                for _ in range(min(self.batch_size, count - start)):
+                    flashcard_id, user_id = rng.choice(flashcards)
+                    interval = rng.choice([1, 6, 15, 30])
+                    reviews.append(FlashcardReview(
+                        flashcard_id=flashcard_id,
+                        user_id=user_id,
+                        quality=rng.randint(0, 5),
+                        time_spent=rng.randint(3, 60),
+                        ease_factor_before=2.5,
+                        ease_factor_after=round(rng.uniform(1.3, 2.8), 2),
+                        interval_before=interval,
+                        interval_after=interval * 2,
+                        reviewed_at=self.random_time(),
+                    ))
+                FlashcardReview.objects.bulk_create(reviews)
+                created += len(reviews)
+        return created
@@ -0,0 +1,68 @@
+import os
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from question_bank.models import ImportJob
+from question_bank.services import importer
+
+
+class Command(BaseCommand):
+    help = (
+        "由 Excel (.xlsx)、CSV 或 JSON Lines 檔案匯入題目 (欄位與題目匯出相同)，"
+        "逐批寫入並將進度與錯誤記錄在 ImportJob"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="匯入檔案")
+        parser.add_argument(
+            "--type", choices=sorted(set(importer.FILE_TYPES.values())), help="檔案類型 (預設依副檔名判斷)",
+        )
+        parser.add_argument(
+            "--status", choices=["draft", "review", "published"], default="draft", help="未指定狀態的題目使用的狀態",
+        )
+        parser.add_argument("--user", help="記錄為匯入者與題目建立者的使用者名稱")
+        parser.add_argument("--chunk-size", type=int, default=importer.CHUNK_SIZE, help="每批寫入的列數")
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        if not os.path.isfile(path):
+            raise CommandError(f"找不到檔案 {path}")
+        file_type = options["type"] or importer.file_type_for(path)
+        if file_type is None:
+            raise CommandError("無法由副檔名判斷檔案類型，請指定 --type")
+
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"找不到使用者 {options['user']}")
+
+        job = ImportJob.objects.create(
+            user=user,
+            file_name=os.path.basename(path),
+            file_path=path,
+            file_type=file_type,
+            status="pending",
+            started_at=timezone.now(),
+        )
+        self.stdout.write(f"匯入工作 #{job.pk}：{path} ({file_type})")
+
+        started = time.perf_counter()
+        importer.QuestionImporter(job, status=options["status"], user=user, chunk_size=options["chunk_size"]).run()
+        elapsed = time.perf_counter() - started
+
+        if job.error_log:
+            self.stderr.write(job.error_log.rstrip())
+        summary = job.result_summary
+        message = (
+            f"處理 {job.processed_items} 列 (新增 {summary['created']}，更新 {summary['updated']}，"
+            f"失敗 {job.failed_items}，新增題目中疑似重複 {len(summary['duplicates'])} 題)，"
+            f"{elapsed:.1f} 秒：{job.processed_items / elapsed if elapsed else 0:.1f} 列/秒"
+        )
+        if job.status == "completed":
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,146 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from question_bank.models import ImportJob
+from question_bank.services import ingest, tagger
+
+
+class Command(BaseCommand):
+    help = (
+        "以行程池平行解析目錄中的歷屆試題 PDF 並批次寫入題庫，進度記錄在 ImportJob，中斷後可用 --resume 繼續。"
+        "目錄結構：<root>/<考試代碼>/<年度>/<場次>/<科目代碼>/questions.pdf (+ answers.pdf)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("root", nargs="?", help="試卷根目錄 (使用 --resume 時可省略)")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="解析 PDF 的行程數")
+        parser.add_argument("--status", choices=["draft", "review", "published"], default="draft", help="匯入題目的狀態")
+        parser.add_argument("--user", help="記錄為匯入者與題目建立者的使用者名稱")
+        parser.add_argument("--resume", type=int, metavar="JOB_ID", help="繼續未完成的匯入工作")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            user = get_user_model().objects.filter(username=options["user"]).first()
+            if user is None:
+                raise CommandError(f"找不到使用者 {options['user']}")
+
+        job = self.get_job(options, user)
+        root = job.file_path
+        papers = ingest.find_papers(root)
+        completed = set(job.result_summary.get("completed", []))
+        pending = [path for path in papers if path not in completed]
+        job.total_items = len(papers)
+        job.status = "processing"
+        job.save(update_fields=["total_items", "status"])
+        self.stdout.write(
+            f"匯入工作 #{job.pk}：共 {len(papers)} 份試卷，已完成 {len(papers) - len(pending)} 份，"
+            f"本次處理 {len(pending)} 份 (中斷後可用 --resume {job.pk} 繼續)"
+        )
+
+        started = time.perf_counter()
+        files = questions = 0
+        # 自動標籤的自動機只建立一次，各試卷共用
+        self.auto_tagger = tagger.AutoTagger()
+        # fork 前關閉連線，子行程只解析檔案、不使用資料庫
+        connections.close_all()
+        try:
+            with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+                queue = iter(pending)
+                running = {}
+
+                def submit():
+                    path = next(queue, None)
+                    if path is not None:
+                        running[executor.submit(ingest.parse_paper, root, path)] = path
+
+                # 最多同時保留 2 倍行程數的解析結果，避免大量結果堆積在記憶體
+                for _ in range(options["workers"] * 2):
+                    submit()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = running.pop(future)
+                        submit()
+                        count = self.save_paper(job, path, future, options["status"], user)
+                        files += 1
+                        questions += count
+        except KeyboardInterrupt:
+            job.status = "failed"
+            job.save(update_fields=["status"])
+            self.stderr.write(f"已中斷，可用 --resume {job.pk} 繼續")
+            raise
+
+        job.status = "completed" if not job.failed_items else "failed"
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "completed_at"])
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"完成 {files} 份試卷 (成功 {job.success_items}，失敗 {job.failed_items})，{questions} 題，"
+            f"{elapsed:.1f} 秒：{files / elapsed * 60 if elapsed else 0:.1f} 份/分鐘，"
+            f"{questions / elapsed if elapsed else 0:.1f} 題/秒"
+        ))
+
+    def get_job(self, options, user):
+        if options["resume"]:
+            job = ImportJob.objects.filter(pk=options["resume"], file_type="pdf").first()
+            if job is None:
+                raise CommandError(f"找不到匯入工作 #{options['resume']}")
+            if job.status == "completed":
+                raise CommandError(f"匯入工作 #{job.pk} 已完成")
+            return job
+
+        if not options["root"]:
+            raise CommandError("請指定試卷根目錄或 --resume")
+        root = os.path.abspath(options["root"])
+        if not os.path.isdir(root):
+            raise CommandError(f"{root} 不是目錄")
+        return ImportJob.objects.create(
+            user=user,
+            file_name=os.path.basename(root),
+            file_path=root,
+            file_type="pdf",
+            status="pending",
+            started_at=timezone.now(),
+            result_summary={"completed": [], "failed": {}},
+        )
+
+    def save_paper(self, job, path, future, status, user):
+        """寫入一份試卷並在同一交易內記錄進度，回傳新增題數"""
+        try:
+            with transaction.atomic():
+                count = ingest.write_paper(future.result(), status=status, user=user, auto_tagger=self.auto_tagger)
+                self.checkpoint(job, path)
+        except Exception as e:
+            # 交易已復原，以資料庫中的進度為準 (本次建立的法條標籤也已復原，需重建對照表)
+            job.refresh_from_db()
+            self.auto_tagger = tagger.AutoTagger()
+            self.checkpoint(job, path, error=e)
+            self.stderr.write(f"  {path}: {e}")
+            return 0
+        self.stdout.write(f"  {path}: {count} 題")
+        return count
+
+    def checkpoint(self, job, path, error=None):
+        summary = job.result_summary
+        if path in summary["failed"]:
+            # 上次執行失敗、本次重試的試卷不重複計數
+            del summary["failed"][path]
+            job.processed_items -= 1
+            job.failed_items -= 1
+        job.processed_items += 1
+        if error is None:
+            summary["completed"].append(path)
+            job.success_items += 1
+        else:
+            summary["failed"][path] = str(error)
+            job.failed_items += 1
+            job.error_log += f"{path}: {error}\n"
+        job.save(update_fields=["processed_items", "success_items", "failed_items", "error_log", "result_summary"])
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from question_bank.services import leaderboards
+
+
+class Command(BaseCommand):
+    help = (
+        "由作答紀錄重建所有排行榜 (全部期間與保留的各週)，Redis 資料遺失或與作答紀錄不一致時執行；"
+        "重建期間的作答可能被覆蓋，請於低流量時執行"
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = leaderboards.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"重建 {count} 個排行榜，{time.perf_counter() - started:.1f} 秒"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from question_bank.services import related
+
+
+class Command(BaseCommand):
+    help = (
+        "更新相關題目推薦 (TF-IDF)：只重新斷詞內容變動的題目，並重算受影響題目的前 k 名相關題目；"
+        "建議排程執行，並定期以 --full 全部重算"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="重算所有題目的相關題目")
+        parser.add_argument("--top-k", type=int, default=related.TOP_K, help="每題保留的相關題目數")
+
+    def handle(self, *args, **options):
+        stats = related.update_related(full=options["full"], top_k=options["top_k"])
+        seconds = stats["seconds"] - stats["index_seconds"]
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['questions']} 題 (內容變動 {stats['changed']}，移除 {stats['removed']})，"
+            f"{'全部' if stats['full'] else '增量'}重算 {stats['recomputed']} 題；"
+            f"斷詞與索引 {stats['index_seconds']:.1f} 秒，計算相關題目 {seconds:.1f} 秒 "
+            f"({stats['recomputed'] / seconds if seconds else 0:.0f} 題/秒)"
+        ))
@@ -0,0 +1,376 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:19
+
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0001_initial'),
+        ('question_bank', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoryArchive',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('question_attempt', '作答紀錄'), ('flashcard_review', '快閃卡複習紀錄')], max_length=32, verbose_name='紀錄類型')),
+                ('month', models.DateField(verbose_name='月份')),
+                ('row_count', models.IntegerField(default=0, verbose_name='紀錄筆數')),
+                ('correct_count', models.IntegerField(default=0, verbose_name='答對筆數')),
+                ('total_time_spent', models.IntegerField(default=0, verbose_name='總花費時間（秒）')),
+                ('first_at', models.DateTimeField(blank=True, null=True, verbose_name='最早紀錄時間')),
+                ('last_at', models.DateTimeField(blank=True, null=True, verbose_name='最晚紀錄時間')),
+                ('attempt_totals', models.JSONField(blank=True, null=True, verbose_name='科目與場次統計')),
+                ('file_path', models.CharField(max_length=1024, verbose_name='封存檔路徑')),
+                ('file_size', models.IntegerField(default=0, verbose_name='封存檔大小')),
+                ('checksum', models.CharField(max_length=64, verbose_name='封存檔雜湊')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='建立時間')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+            ],
+            options={
+                'verbose_name': '歷史紀錄封存',
+                'verbose_name_plural': '歷史紀錄封存',
+                'db_table': 'history_archives',
+                'ordering': ['user', 'kind', '-month'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaperBundle',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('content_hash', models.CharField(max_length=64, verbose_name='內容雜湊')),
+                ('file_name', models.CharField(max_length=128, unique=True, verbose_name='檔案名稱')),
+                ('size', models.IntegerField(verbose_name='壓縮後大小')),
+                ('question_count', models.IntegerField(verbose_name='題數')),
+                ('built_at', models.DateTimeField(auto_now=True, verbose_name='產生時間')),
+            ],
+            options={
+                'verbose_name': '試卷包',
+                'verbose_name_plural': '試卷包',
+                'db_table': 'paper_bundles',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionFingerprint',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='question_bank.question', verbose_name='題目')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='正規化內容雜湊')),
+                ('signature', models.BinaryField(verbose_name='MinHash 簽章')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+            ],
+            options={
+                'verbose_name': '題目指紋',
+                'verbose_name_plural': '題目指紋',
+                'db_table': 'question_fingerprints',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('bucket', models.BigIntegerField(verbose_name='分段雜湊')),
+            ],
+            options={
+                'verbose_name': '題目 LSH 分段',
+                'verbose_name_plural': '題目 LSH 分段',
+                'db_table': 'question_lsh_buckets',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionPayload',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='payload', serialize=False, to='question_bank.question', verbose_name='題目')),
+                ('version', models.IntegerField(verbose_name='題目版本')),
+                ('source_updated_at', models.DateTimeField(verbose_name='題目更新時間')),
+                ('detail', models.BinaryField(verbose_name='詳細資料 JSON')),
+                ('summary', models.BinaryField(verbose_name='列表 JSON')),
+                ('rendered_at', models.DateTimeField(auto_now=True, verbose_name='產生時間')),
+            ],
+            options={
+                'verbose_name': '題目預先產生 JSON',
+                'verbose_name_plural': '題目預先產生 JSON',
+                'db_table': 'question_payloads',
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionTermVector',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='term_vector', serialize=False, to='question_bank.question', verbose_name='題目')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='內容雜湊')),
+                ('terms', models.BinaryField(verbose_name='詞項與次數')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新時間')),
+            ],
+            options={
+                'verbose_name': '題目詞項向量',
+                'verbose_name_plural': '題目詞項向量',
+                'db_table': 'question_term_vectors',
+            },
+        ),
+        migrations.CreateModel(
+            name='RelatedQuestion',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('rank', models.SmallIntegerField(verbose_name='名次')),
+                ('score', models.FloatField(verbose_name='相似度')),
+            ],
+            options={
+                'verbose_name': '相關題目',
+                'verbose_name_plural': '相關題目',
+                'db_table': 'related_questions',
+                'ordering': ['question', 'rank'],
+            },
+        ),
+        migrations.AddField(
+            model_name='importjob',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='匯入者'),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='exam_session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='exams.examsession', verbose_name='考試場次'),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='subject',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='exams.subject', verbose_name='科目'),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='user',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='practice_sessions', to=settings.AUTH_USER_MODEL, verbose_name='使用者'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_questions', to=settings.AUTH_USER_MODEL, verbose_name='建立者'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='exam_session',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='exams.examsession', verbose_name='考試場次'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='question_set',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='question_bank.questionset', verbose_name='所屬題組'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='subject',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='exams.subject', verbose_name='科目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='updated_questions', to=settings.AUTH_USER_MODEL, verbose_name='更新者'),
+        ),
+        migrations.AddField(
+            model_name='questionattempt',
+            name='practice_session',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attempts', to='question_bank.practicesession', verbose_name='練習場次'),
+        ),
+        migrations.AddField(
+            model_name='questionattempt',
+            name='question',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='question_bank.question', verbose_name='題目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionattempt',
+            name='user',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='question_attempts', to=settings.AUTH_USER_MODEL, verbose_name='使用者'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionbookmark',
+            name='question',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='bookmarks', to='question_bank.question', verbose_name='題目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionbookmark',
+            name='user',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='question_bookmarks', to=settings.AUTH_USER_MODEL, verbose_name='使用者'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionnote',
+            name='question',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='notes', to='question_bank.question', verbose_name='題目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionnote',
+            name='user',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='question_notes', to=settings.AUTH_USER_MODEL, verbose_name='使用者'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionoption',
+            name='question',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='options', to='question_bank.question', verbose_name='題目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionset',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_question_sets', to=settings.AUTH_USER_MODEL, verbose_name='建立者'),
+        ),
+        migrations.AddField(
+            model_name='questionset',
+            name='exam_session',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='question_sets', to='exams.examsession', verbose_name='考試場次'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questionset',
+            name='subject',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='question_sets', to='exams.subject', verbose_name='科目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questiontagrelation',
+            name='created_by',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='建立者'),
+        ),
+        migrations.AddField(
+            model_name='questiontagrelation',
+            name='question',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='tag_relations', to='question_bank.question', verbose_name='題目'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='questiontagrelation',
+            name='tag',
+            field=models.ForeignKey(default=1, on_delete=django.db.models.deletion.CASCADE, related_name='question_relations', to='question_bank.questiontag', verbose_name='標籤'),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='questionattempt',
+            name='is_correct',
+            field=models.BooleanField(default=False, null=True, verbose_name='是否正確'),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='accuracy_rate',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(answered_questions=0, then=models.Value(0.0)), default=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('correct_answers'), '*', models.Value(100.0)), '/', models.F('answered_questions')), 2), output_field=models.FloatField()), output_field=models.FloatField(), verbose_name='答對率'),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='accuracy_rate',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(attempt_count=0, then=models.Value(0.0)), default=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('correct_count'), '*', models.Value(100.0)), '/', models.F('attempt_count')), 2), output_field=models.FloatField()), output_field=models.FloatField(), verbose_name='答對率'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='questionbookmark',
+            unique_together={('user', 'question')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='questionnote',
+            unique_together={('user', 'question')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='questionoption',
+            unique_together={('question', 'option_label')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='questiontagrelation',
+            unique_together={('question', 'tag')},
+        ),
+        migrations.AddIndex(
+            model_name='practicesession',
+            index=models.Index(fields=['user', 'accuracy_rate'], name='practice_se_user_id_4a812e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['exam_session', 'subject'], name='questions_exam_se_530557_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['status', 'is_public'], name='questions_status_1776b5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['difficulty'], name='questions_difficu_8150ad_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['subject', 'accuracy_rate'], name='questions_subject_6ff921_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['accuracy_rate'], name='questions_accurac_822f29_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['attempt_count'], name='questions_attempt_93a5ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionattempt',
+            index=models.Index(fields=['user', 'question'], name='question_at_user_id_012977_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionattempt',
+            index=models.Index(fields=['user', 'created_at'], name='question_at_user_id_5b5b8f_idx'),
+        ),
+        migrations.AddField(
+            model_name='historyarchive',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history_archives', to=settings.AUTH_USER_MODEL, verbose_name='使用者'),
+        ),
+        migrations.AddField(
+            model_name='paperbundle',
+            name='exam_session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paper_bundles', to='exams.examsession', verbose_name='考試場次'),
+        ),
+        migrations.AddField(
+            model_name='paperbundle',
+            name='subject',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='paper_bundles', to='exams.subject', verbose_name='科目'),
+        ),
+        migrations.AddIndex(
+            model_name='questionfingerprint',
+            index=models.Index(fields=['content_hash'], name='question_fi_content_11f561_idx'),
+        ),
+        migrations.AddField(
+            model_name='questionlshbucket',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='question_bank.question', verbose_name='題目'),
+        ),
+        migrations.AddField(
+            model_name='relatedquestion',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='question_bank.question', verbose_name='題目'),
+        ),
+        migrations.AddField(
+            model_name='relatedquestion',
+            name='related',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_from', to='question_bank.question', verbose_name='相關題目'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='historyarchive',
+            unique_together={('user', 'kind', 'month')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='paperbundle',
+            unique_together={('exam_session', 'subject')},
+        ),
+        migrations.AddIndex(
+            model_name='questionlshbucket',
+            index=models.Index(fields=['bucket'], name='question_ls_bucket_8b7a00_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='relatedquestion',
+            unique_together={('question', 'rank')},
+        ),
+    ]
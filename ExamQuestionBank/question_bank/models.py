@@ -1,8 +1,19 @@
 from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Round
 from django.conf import settings
 import reversion
 
 
+def accuracy_expression(correct_field, total_field):
+    """答對率 (百分比，小數兩位) 的資料庫運算式，沒有作答時為 0"""
+    return Case(
+        When(**{total_field: 0}, then=Value(0.0)),
+        default=Round(F(correct_field) * 100.0 / F(total_field), 2),
+        output_field=models.FloatField(),
+    )
+
+
 @reversion.register()
 class QuestionSet(models.Model):
     """
@@ -27,7 +38,10 @@ class QuestionSet(models.Model):
         ordering = ['exam_session', 'order']
 
     def __str__(self):
-        return f"{self.exam_session} - {self.title or f'題組{self.order}'}"
+        from exams.catalog import catalog
+
+        session_name = catalog.session_name(self.exam_session_id) or self.exam_session
+        return f"{session_name} - {self.title or f'題組{self.order}'}"
 
 
 @reversion.register()
@@ -82,6 +96,13 @@ class Question(models.Model):
     view_count = models.IntegerField(default=0, verbose_name="瀏覽次數")
     attempt_count = models.IntegerField(default=0, verbose_name="作答次數")
     correct_count = models.IntegerField(default=0, verbose_name="答對次數")
+    # 由資料庫依作答與答對次數計算並儲存 (F() 累加或 bulk_update 後同步更新)，可建立索引供排序與篩選
+    accuracy_rate = models.GeneratedField(
+        expression=accuracy_expression('correct_count', 'attempt_count'),
+        output_field=models.FloatField(),
+        db_persist=True,
+        verbose_name="答對率",
+    )
 
     # Version control
     version = models.IntegerField(default=1, verbose_name="版本")
@@ -103,19 +124,16 @@ class Question(models.Model):
             models.Index(fields=['exam_session', 'subject']),
             models.Index(fields=['status', 'is_public']),
             models.Index(fields=['difficulty']),
+            # 依科目列出最難 / 最簡單、最熱門的題目
+            models.Index(fields=['subject', 'accuracy_rate']),
+            models.Index(fields=['accuracy_rate']),
+            models.Index(fields=['attempt_count']),
         ]
         ordering = ['exam_session', 'question_number']
 
     def __str__(self):
         return f"{self.question_number} - {self.content[:50]}"
 
-    @property
-    def accuracy_rate(self):
-        """計算答對率"""
-        if self.attempt_count == 0:
-            return 0
-        return round((self.correct_count / self.attempt_count) * 100, 2)
-
 
 class QuestionOption(models.Model):
     """
@@ -192,7 +210,7 @@ class QuestionAttempt(models.Model):
     # Attempt details
     selected_options = models.JSONField(default=list, verbose_name="選擇的選項")  # List of option IDs
     answer_text = models.TextField(blank=True, verbose_name="作答文字")  # For essay questions
-    is_correct = models.BooleanField(default=False, verbose_name="是否正確")
+    is_correct = models.BooleanField(null=True, default=False, verbose_name="是否正確")  # 不評分的題目為 null
     time_spent = models.IntegerField(default=0, verbose_name="作答時間（秒）")
 
     # Context
@@ -211,7 +229,7 @@ class QuestionAttempt(models.Model):
         ordering = ['-created_at']
 
     def __str__(self):
-        return f"{self.user.username} - {self.question.question_number} ({'正確' if self.is_correct else '錯誤'})"
+        return f"{self.user.username} - {self.question.question_number} ({'不評分' if self.is_correct is None else '正確' if self.is_correct else '錯誤'})"
 
 
 class QuestionNote(models.Model):
@@ -296,23 +314,25 @@ class PracticeSession(models.Model):
     started_at = models.DateTimeField(auto_now_add=True, verbose_name="開始時間")
     completed_at = models.DateTimeField(blank=True, null=True, verbose_name="完成時間")
     total_time_spent = models.IntegerField(default=0, verbose_name="總花費時間（秒）")
+    accuracy_rate = models.GeneratedField(
+        expression=accuracy_expression('correct_answers', 'answered_questions'),
+        output_field=models.FloatField(),
+        db_persist=True,
+        verbose_name="答對率",
+    )
 
     class Meta:
         db_table = 'practice_sessions'
         verbose_name = '練習場次'
         verbose_name_plural = '練習場次'
         ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['user', 'accuracy_rate']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.get_mode_display()} ({self.started_at.strftime('%Y-%m-%d')})"
 
-    @property
-    def accuracy_rate(self):
-        """計算答對率"""
-        if self.answered_questions == 0:
-            return 0
-        return round((self.correct_answers / self.answered_questions) * 100, 2)
-
 
 class ImportJob(models.Model):
     """
@@ -353,3 +373,181 @@ class ImportJob(models.Model):
 
     def __str__(self):
         return f"{self.file_name} - {self.get_status_display()}"
+
+
+class HistoryArchive(models.Model):
+    """
+    歷史紀錄封存 (每位使用者每月一份封存檔，並保留摘要)
+    """
+    KIND_CHOICES = [
+        ('question_attempt', '作答紀錄'),
+        ('flashcard_review', '快閃卡複習紀錄'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='history_archives', verbose_name="使用者")
+    kind = models.CharField(max_length=32, choices=KIND_CHOICES, verbose_name="紀錄類型")
+    month = models.DateField(verbose_name="月份")  # 該月第一天
+
+    # Summary of the archived rows
+    row_count = models.IntegerField(default=0, verbose_name="紀錄筆數")
+    correct_count = models.IntegerField(default=0, verbose_name="答對筆數")
+    total_time_spent = models.IntegerField(default=0, verbose_name="總花費時間（秒）")
+    first_at = models.DateTimeField(blank=True, null=True, verbose_name="最早紀錄時間")
+    last_at = models.DateTimeField(blank=True, null=True, verbose_name="最晚紀錄時間")
+    # 作答紀錄依題目的科目與場次彙總：[[科目 id, 場次 id, 筆數, 答對數, 花費時間, 答對題的花費時間]]
+    attempt_totals = models.JSONField(blank=True, null=True, verbose_name="科目與場次統計")
+
+    # Archive file
+    file_path = models.CharField(max_length=1024, verbose_name="封存檔路徑")
+    file_size = models.IntegerField(default=0, verbose_name="封存檔大小")
+    checksum = models.CharField(max_length=64, verbose_name="封存檔雜湊")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="建立時間")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新時間")
+
+    class Meta:
+        db_table = 'history_archives'
+        verbose_name = '歷史紀錄封存'
+        verbose_name_plural = '歷史紀錄封存'
+        unique_together = [['user', 'kind', 'month']]
+        ordering = ['user', 'kind', '-month']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.get_kind_display()} ({self.month.strftime('%Y-%m')})"
+
+    @property
+    def accuracy_rate(self):
+        """計算答對率"""
+        if self.row_count == 0:
+            return 0
+        return round((self.correct_count / self.row_count) * 100, 2)
+
+
+class QuestionFingerprint(models.Model):
+    """
+    題目指紋 (正規化後的題目與選項之 MinHash 簽章，用於近似重複題偵測)
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint', verbose_name="題目")
+    content_hash = models.CharField(max_length=64, verbose_name="正規化內容雜湊")
+    signature = models.BinaryField(verbose_name="MinHash 簽章")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新時間")
+
+    class Meta:
+        db_table = 'question_fingerprints'
+        verbose_name = '題目指紋'
+        verbose_name_plural = '題目指紋'
+        indexes = [
+            models.Index(fields=['content_hash']),
+        ]
+
+    def __str__(self):
+        return f"{self.question_id} - {self.content_hash[:12]}"
+
+
+class QuestionLSHBucket(models.Model):
+    """
+    題目指紋的 LSH 分段雜湊 (每段簽章一筆，同一桶中的題目為近似重複候選)
+    """
+    id = models.BigAutoField(primary_key=True)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='lsh_buckets', verbose_name="題目")
+    bucket = models.BigIntegerField(verbose_name="分段雜湊")
+
+    class Meta:
+        db_table = 'question_lsh_buckets'
+        verbose_name = '題目 LSH 分段'
+        verbose_name_plural = '題目 LSH 分段'
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+
+    def __str__(self):
+        return f"{self.question_id} - {self.bucket}"
+
+
+class QuestionTermVector(models.Model):
+    """
+    題目的詞項計數 (CJK 雙字詞、英數詞與標籤)，相關題目推薦計算 TF-IDF 用
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='term_vector', verbose_name="題目")
+    content_hash = models.CharField(max_length=64, verbose_name="內容雜湊")
+    terms = models.BinaryField(verbose_name="詞項與次數")  # little-endian uint32 (詞項雜湊, 次數) 配對
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="更新時間")
+
+    class Meta:
+        db_table = 'question_term_vectors'
+        verbose_name = '題目詞項向量'
+        verbose_name_plural = '題目詞項向量'
+
+    def __str__(self):
+        return f"{self.question_id} - {self.content_hash[:12]}"
+
+
+class RelatedQuestion(models.Model):
+    """
+    相關題目 (每題依 TF-IDF 餘弦相似度保留前 k 名，排除同一場次)
+    """
+    id = models.BigAutoField(primary_key=True)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='related_links', verbose_name="題目")
+    related = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='related_from', verbose_name="相關題目")
+    rank = models.SmallIntegerField(verbose_name="名次")
+    score = models.FloatField(verbose_name="相似度")
+
+    class Meta:
+        db_table = 'related_questions'
+        verbose_name = '相關題目'
+        verbose_name_plural = '相關題目'
+        unique_together = [['question', 'rank']]
+        ordering = ['question', 'rank']
+
+    def __str__(self):
+        return f"{self.question_id} -> {self.related_id} ({self.score:.2f})"
+
+
+class QuestionPayload(models.Model):
+    """
+    預先產生的題目 JSON 片段 (詳細資料與列表)，題目 version 或更新時間不同時視為過期，
+    由 services.payloads 維護
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='payload', verbose_name="題目")
+    version = models.IntegerField(verbose_name="題目版本")
+    source_updated_at = models.DateTimeField(verbose_name="題目更新時間")
+    detail = models.BinaryField(verbose_name="詳細資料 JSON")  # 不含前後大括號與隨時變動的欄位
+    summary = models.BinaryField(verbose_name="列表 JSON")
+
+    rendered_at = models.DateTimeField(auto_now=True, verbose_name="產生時間")
+
+    class Meta:
+        db_table = 'question_payloads'
+        verbose_name = '題目預先產生 JSON'
+        verbose_name_plural = '題目預先產生 JSON'
+
+    def __str__(self):
+        return f"{self.question_id} v{self.version}"
+
+
+class PaperBundle(models.Model):
+    """
+    已發布場次中一個科目的整份試卷 (題組、題目與選項)，預先輸出為 gzip 壓縮的 JSON 檔，
+    檔名含內容雜湊，由 services.bundles 維護
+    """
+    id = models.AutoField(primary_key=True)
+    exam_session = models.ForeignKey('exams.ExamSession', on_delete=models.CASCADE, related_name='paper_bundles', verbose_name="考試場次")
+    subject = models.ForeignKey('exams.Subject', on_delete=models.CASCADE, related_name='paper_bundles', verbose_name="科目")
+    content_hash = models.CharField(max_length=64, verbose_name="內容雜湊")
+    file_name = models.CharField(max_length=128, unique=True, verbose_name="檔案名稱")
+    size = models.IntegerField(verbose_name="壓縮後大小")
+    question_count = models.IntegerField(verbose_name="題數")
+
+    built_at = models.DateTimeField(auto_now=True, verbose_name="產生時間")
+
+    class Meta:
+        db_table = 'paper_bundles'
+        verbose_name = '試卷包'
+        verbose_name_plural = '試卷包'
+        unique_together = [['exam_session', 'subject']]
+
+    def __str__(self):
+        return self.file_name
@@ -3,7 +3,22 @@ from .models import (
     QuestionSet, Question, QuestionOption, QuestionTag, QuestionTagRelation,
     QuestionAttempt, QuestionNote, QuestionBookmark, PracticeSession, ImportJob
 )
+from exams.catalog import catalog
 from exams.models import ExamSession, Subject
+from users.permissions import CHANGE, object_permissions
+from .services import leaderboards
+from .services.tag_index import MAX_LIMIT
+
+MAX_BATCH_ATTEMPTS = 200
+
+
+class CatalogNamesMixin:
+    """由行程內考試目錄取得場次與科目名稱，不需 select_related"""
+    def get_exam_session_name(self, obj):
+        return catalog.session_name(obj.exam_session_id) if obj.exam_session_id else None
+
+    def get_subject_name(self, obj):
+        return catalog.subject_name(obj.subject_id) if obj.subject_id else None
 
 
 class QuestionOptionSerializer(serializers.ModelSerializer):
@@ -20,10 +35,25 @@ class QuestionTagSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class QuestionListSerializer(serializers.ModelSerializer):
+class TagSuggestionSerializer(serializers.Serializer):
+    """標籤自動完成結果 (依使用次數排序)"""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    category = serializers.CharField()
+    usage_count = serializers.IntegerField()
+
+
+class TagAutocompleteQuerySerializer(serializers.Serializer):
+    """標籤自動完成查詢參數"""
+    q = serializers.CharField(required=False, default='', allow_blank=True, trim_whitespace=False)
+    category = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=MAX_LIMIT)
+
+
+class QuestionListSerializer(CatalogNamesMixin, serializers.ModelSerializer):
     """簡化版Question序列化器，用於列表顯示"""
-    exam_session_name = serializers.CharField(source='exam_session.__str__', read_only=True)
-    subject_name = serializers.CharField(source='subject.name', read_only=True)
+    exam_session_name = serializers.SerializerMethodField()
+    subject_name = serializers.SerializerMethodField()
     accuracy_rate = serializers.ReadOnlyField()
 
     class Meta:
@@ -35,12 +65,35 @@ class QuestionListSerializer(serializers.ModelSerializer):
         ]
 
 
+class SimilarQuestionSerializer(QuestionListSerializer):
+    """近似或相關題目 (附相似度，由 context['scores'] 提供)"""
+    similarity = serializers.SerializerMethodField()
+
+    class Meta(QuestionListSerializer.Meta):
+        fields = QuestionListSerializer.Meta.fields + ['similarity']
+
+    def get_similarity(self, obj):
+        return round(self.context['scores'][obj.id], 3)
+
+
+class DuplicateQuerySerializer(serializers.Serializer):
+    """近似重複題查詢參數 (threshold 預設為 NEAR_DUPLICATE_THRESHOLD)"""
+    threshold = serializers.FloatField(required=False, min_value=0, max_value=1)
+    limit = serializers.IntegerField(required=False, default=10, min_value=1, max_value=50)
+
+
+class DuplicateCheckSerializer(DuplicateQuerySerializer):
+    """檢查尚未儲存的題目是否與題庫中的題目近似"""
+    content = serializers.CharField()
+    options = serializers.ListField(child=serializers.CharField(allow_blank=True), required=False, default=list)
+
+
 class QuestionDetailSerializer(serializers.ModelSerializer):
     """完整Question序列化器，包含選項、標籤等"""
     options = QuestionOptionSerializer(many=True, read_only=True)
-    tags = QuestionTagSerializer(source='tag_relations.tag', many=True, read_only=True)
-    exam_session = serializers.StringRelatedField(read_only=True)
-    subject = serializers.StringRelatedField(read_only=True)
+    tags = serializers.SerializerMethodField()
+    exam_session = serializers.SerializerMethodField()
+    subject = serializers.SerializerMethodField()
     accuracy_rate = serializers.ReadOnlyField()
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
 
@@ -56,6 +109,15 @@ class QuestionDetailSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'view_count', 'attempt_count', 'correct_count', 'version']
 
+    def get_exam_session(self, obj):
+        return catalog.session_name(obj.exam_session_id)
+
+    def get_subject(self, obj):
+        return catalog.subject_name(obj.subject_id)
+
+    def get_tags(self, obj):
+        return QuestionTagSerializer([relation.tag for relation in obj.tag_relations.all()], many=True).data
+
 
 class QuestionCreateUpdateSerializer(serializers.ModelSerializer):
     """用於創建和更新Question"""
@@ -134,6 +196,55 @@ class QuestionAttemptSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at']
 
 
+class AttemptAnswerSerializer(serializers.Serializer):
+    """作答內容 (選項可為選項 id 或標籤)"""
+    selected_options = serializers.ListField(child=serializers.CharField(), allow_empty=True)
+    answer_text = serializers.CharField(required=False, default='', allow_blank=True)
+    time_spent = serializers.IntegerField(required=False, default=0, min_value=0)
+    practice_session = serializers.IntegerField(required=False)
+
+
+class AttemptBatchItemSerializer(AttemptAnswerSerializer):
+    question = serializers.IntegerField()
+    practice_session = None
+
+
+class AttemptBatchSerializer(serializers.Serializer):
+    """批次作答 (例如交卷時一次送出整份試卷)"""
+    attempts = AttemptBatchItemSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_ATTEMPTS)
+    practice_session = serializers.IntegerField(required=False)
+
+
+class AttemptResultSerializer(serializers.Serializer):
+    """評分結果 (is_correct 為 null 表示題目沒有答案，不評分)"""
+    question = serializers.IntegerField()
+    is_correct = serializers.BooleanField(allow_null=True)
+    correct_options = serializers.ListField(child=serializers.CharField())
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """排行榜查詢參數 (accuracy 為正確率，answered 為作答題數；week 為本週)"""
+    metric = serializers.ChoiceField(choices=leaderboards.METRICS, required=False, default=leaderboards.ACCURACY)
+    window = serializers.ChoiceField(choices=leaderboards.WINDOWS, required=False, default=leaderboards.ALL)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    rank = serializers.IntegerField()
+    user = serializers.IntegerField()
+    username = serializers.CharField()
+    score = serializers.FloatField()
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    """排行榜 (正確率為百分比)；me 為目前使用者的名次，未上榜時為 null"""
+    metric = serializers.CharField()
+    window = serializers.CharField()
+    total = serializers.IntegerField()
+    entries = LeaderboardEntrySerializer(many=True)
+    me = LeaderboardEntrySerializer(allow_null=True)
+
+
 class QuestionNoteSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuestionNote
@@ -141,6 +252,20 @@ class QuestionNoteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
 
+class SharedNoteSerializer(QuestionNoteSerializer):
+    """題目的筆記列表 (含他人公開或分享的筆記)；can_edit 由請求內的物件權限快取判斷"""
+    username = serializers.CharField(source='user.username', read_only=True)
+    can_edit = serializers.SerializerMethodField()
+
+    class Meta(QuestionNoteSerializer.Meta):
+        fields = QuestionNoteSerializer.Meta.fields + ['username', 'can_edit']
+        read_only_fields = QuestionNoteSerializer.Meta.read_only_fields + ['question']
+
+    def get_can_edit(self, obj):
+        request = self.context['request']
+        return obj.user_id == request.user.pk or object_permissions(request).has_perm(obj, CHANGE)
+
+
 class QuestionBookmarkSerializer(serializers.ModelSerializer):
     question_detail = QuestionListSerializer(source='question', read_only=True)
 
@@ -150,10 +275,10 @@ class QuestionBookmarkSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'user', 'created_at']
 
 
-class PracticeSessionSerializer(serializers.ModelSerializer):
+class PracticeSessionSerializer(CatalogNamesMixin, serializers.ModelSerializer):
     accuracy_rate = serializers.ReadOnlyField()
-    exam_session_name = serializers.CharField(source='exam_session.__str__', read_only=True)
-    subject_name = serializers.CharField(source='subject.name', read_only=True)
+    exam_session_name = serializers.SerializerMethodField()
+    subject_name = serializers.SerializerMethodField()
 
     class Meta:
         model = PracticeSession
@@ -0,0 +1,205 @@
+import asyncio
+import contextlib
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from monitoring import metrics
+
+
+class AdmissionRejected(Exception):
+    """准入控制拒絕請求，retry_after 為建議的重試秒數"""
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Waiter:
+    """排隊中的請求；admitted 由 release 在交出名額時設定 (持有 lock)"""
+    __slots__ = ("user_id", "wake", "admitted")
+
+    def __init__(self, user_id, wake):
+        self.user_id = user_id
+        self.wake = wake
+        self.admitted = False
+
+
+class AdmissionController:
+    """
+    行程內的准入控制：限制同時執行的數量 (全部與每位使用者)，超過時進入有上限的等待佇列，
+    佇列已滿、等待逾時或使用者已達上限時拋出 AdmissionRejected。
+
+    佇列先進先出：有人排隊時新請求不可插隊；名額空出時直接交給佇列中第一個未達個人上限的請求。
+    個人上限包含執行中與排隊中的請求。
+    同步 (admit) 與非同步 (async_admit) 呼叫共用同一組名額，設定讀取 {prefix}_MAX_CONCURRENT、
+    {prefix}_PER_USER、{prefix}_QUEUE_SIZE、{prefix}_TIMEOUT。
+    """
+    def __init__(self, name, prefix):
+        self.name = name
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.active = 0
+        self.active_by_user = Counter()
+        self.waiters = []
+        self.queued_by_user = Counter()
+        # 平均執行時間 (指數移動平均)，用於估計 Retry-After
+        self.average_duration = 1.0
+
+    def setting(self, key):
+        return getattr(settings, f"{self.prefix}_{key}")
+
+    def _take(self, user_id):
+        if self.active >= self.setting("MAX_CONCURRENT"):
+            return False
+        if self.active_by_user[user_id] >= self.setting("PER_USER"):
+            return False
+        self.active += 1
+        self.active_by_user[user_id] += 1
+        return True
+
+    def _enter(self, user_id, wake):
+        """取得名額時回傳 None，需要排隊時回傳登記的 Waiter"""
+        with self.lock:
+            # 排隊中的請求也計入個人上限，單一使用者無法佔滿佇列
+            if self.active_by_user[user_id] + self.queued_by_user[user_id] >= self.setting("PER_USER"):
+                raise self._reject("user_limit")
+            if not self.waiters and self._take(user_id):
+                self._update_gauges()
+                return None
+            if len(self.waiters) >= self.setting("QUEUE_SIZE"):
+                raise self._reject("queue_full")
+            waiter = Waiter(user_id, wake)
+            self.waiters.append(waiter)
+            self.queued_by_user[user_id] += 1
+            # 排在前面的請求都受個人上限限制時，空出的名額可直接交給此請求
+            woken = [other for other in self._hand_off() if other is not wake]
+            self._update_gauges()
+        for other in woken:
+            other()
+        return None if waiter.admitted else waiter
+
+    def _hand_off(self):
+        """(持有 lock) 依排隊順序把空出的名額交給未達個人上限的請求，回傳需喚醒的 wake"""
+        woken = []
+        for waiter in list(self.waiters):
+            if self.active >= self.setting("MAX_CONCURRENT"):
+                break
+            if self._take(waiter.user_id):
+                self._dequeue(waiter)
+                waiter.admitted = True
+                woken.append(waiter.wake)
+        return woken
+
+    def release(self, user_id, duration=None):
+        """交還名額 (duration 為執行時間，未執行時為 None) 並交給排隊中的請求"""
+        with self.lock:
+            self.active -= 1
+            self.active_by_user[user_id] -= 1
+            if not self.active_by_user[user_id]:
+                del self.active_by_user[user_id]
+            if duration is not None:
+                self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+            woken = self._hand_off()
+            self._update_gauges()
+        for wake in woken:
+            wake()
+
+    def _leave_queue(self, waiter):
+        """離開佇列；名額已交給此請求時回傳 True"""
+        with self.lock:
+            if waiter.admitted:
+                return True
+            self._dequeue(waiter)
+            self._update_gauges()
+            return False
+
+    def _dequeue(self, waiter):
+        self.waiters.remove(waiter)
+        self.queued_by_user[waiter.user_id] -= 1
+        if not self.queued_by_user[waiter.user_id]:
+            del self.queued_by_user[waiter.user_id]
+
+    def _abandon(self, waiter):
+        """等待中被取消 (例如連線中斷)：離開佇列，已取得的名額交還"""
+        if self._leave_queue(waiter):
+            self.release(waiter.user_id)
+
+    def retry_after(self):
+        """依排隊數量與平均執行時間估計多久後可能有空位"""
+        rounds = len(self.waiters) / max(1, self.setting("MAX_CONCURRENT")) + 1
+        return max(1, math.ceil(self.average_duration * rounds))
+
+    def _reject(self, reason):
+        if metrics.enabled():
+            metrics.admission_rejected.labels(self.name, reason).inc()
+        return AdmissionRejected(reason, self.retry_after())
+
+    def _update_gauges(self):
+        if metrics.enabled():
+            metrics.admission_active.labels(self.name).set(self.active)
+            metrics.admission_queue_depth.labels(self.name).set(len(self.waiters))
+
+    def _observe_wait(self, waited, result):
+        if metrics.enabled():
+            metrics.admission_wait.labels(self.name, result).observe(waited)
+
+    def _timeout(self, waited):
+        self._observe_wait(waited, "timeout")
+        return self._reject("timeout")
+
+    @contextlib.contextmanager
+    def admit(self, user_id):
+        start = time.monotonic()
+        event = threading.Event()
+        waiter = self._enter(user_id, event.set)
+        if waiter is not None:
+            try:
+                admitted = event.wait(self.setting("TIMEOUT"))
+            except BaseException:
+                self._abandon(waiter)
+                raise
+            if not admitted and not self._leave_queue(waiter):
+                raise self._timeout(time.monotonic() - start)
+        self._observe_wait(time.monotonic() - start, "admitted")
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user_id, time.monotonic() - started)
+
+    @contextlib.asynccontextmanager
+    async def async_admit(self, user_id):
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake():
+            # release 可能在其他執行緒 (同步 view) 呼叫
+            loop.call_soon_threadsafe(event.set)
+
+        waiter = self._enter(user_id, wake)
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(event.wait(), self.setting("TIMEOUT"))
+            except asyncio.TimeoutError:
+                if not self._leave_queue(waiter):
+                    raise self._timeout(time.monotonic() - start) from None
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        self._observe_wait(time.monotonic() - start, "admitted")
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(user_id, time.monotonic() - started)
+
+
+# PDF 轉換端點 (同步與 ASGI 版本) 共用
+pdf_admission = AdmissionController("pdf_extraction", "PDF_ADMISSION")
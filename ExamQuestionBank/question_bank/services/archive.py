@@ -0,0 +1,433 @@
+import datetime
+import hashlib
+import json
+import lzma
+import os
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from flashcards.models import FlashcardReview
+from question_bank.models import Question, QuestionAttempt, HistoryArchive
+
+
+ARCHIVE_FORMAT = "eqb-columnar"
+ARCHIVE_VERSION = 1
+
+# SQL Server 單一查詢最多 2100 個參數 (刪除與 id__in 查詢皆分批)
+DELETE_BATCH_SIZE = 1000
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# 各類紀錄的欄位與編碼方式 (delta: 差值編碼整數, timestamp: 微秒差值編碼, bool: 0/1 字串 (null 為 -), plain: 原值)
+KINDS = {
+    "question_attempt": {
+        "model": QuestionAttempt,
+        "time_field": "created_at",
+        "columns": [
+            ("id", "delta"),
+            ("question_id", "plain"),
+            ("selected_options", "plain"),
+            ("answer_text", "plain"),
+            ("is_correct", "bool"),
+            ("time_spent", "plain"),
+            ("practice_session_id", "plain"),
+            ("created_at", "timestamp"),
+        ],
+        "is_correct": lambda row: row["is_correct"],
+        "correct_filter": Q(is_correct=True),
+    },
+    "flashcard_review": {
+        "model": FlashcardReview,
+        "time_field": "reviewed_at",
+        "columns": [
+            ("id", "delta"),
+            ("flashcard_id", "plain"),
+            ("quality", "plain"),
+            ("time_spent", "plain"),
+            ("ease_factor_before", "plain"),
+            ("ease_factor_after", "plain"),
+            ("interval_before", "plain"),
+            ("interval_after", "plain"),
+            ("reviewed_at", "timestamp"),
+        ],
+        "is_correct": lambda row: row["quality"] >= 3,
+        "correct_filter": Q(quality__gte=3),
+    },
+}
+
+
+def archive_root():
+    return Path(settings.HISTORY_ARCHIVE_ROOT)
+
+
+def _encode_column(values, encoding):
+    if encoding == "bool":
+        return "".join("-" if value is None else "1" if value else "0" for value in values)
+    if encoding == "timestamp":
+        values = [(value - EPOCH) // datetime.timedelta(microseconds=1) for value in values]
+        encoding = "delta"
+    if encoding == "delta":
+        encoded = []
+        previous = 0
+        for value in values:
+            encoded.append(value - previous)
+            previous = value
+        return encoded
+    return list(values)
+
+
+def _decode_column(values, encoding):
+    if encoding == "bool":
+        return [None if char == "-" else char == "1" for char in values]
+    if encoding in ("delta", "timestamp"):
+        decoded = []
+        current = 0
+        for value in values:
+            current += value
+            decoded.append(current)
+        if encoding == "timestamp":
+            decoded = [EPOCH + datetime.timedelta(microseconds=value) for value in decoded]
+        return decoded
+    return values
+
+
+def encode_archive(kind, rows):
+    """將紀錄轉為壓縮的欄式封存內容"""
+    columns = KINDS[kind]["columns"]
+    payload = {
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "kind": kind,
+        "rows": len(rows),
+        "columns": {
+            name: {
+                "encoding": encoding,
+                "values": _encode_column([row[name] for row in rows], encoding),
+            }
+            for name, encoding in columns
+        },
+    }
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return lzma.compress(raw, preset=6)
+
+
+def decode_archive(data):
+    """解壓縮封存內容並還原為紀錄列表"""
+    payload = json.loads(lzma.decompress(data))
+    if payload.get("format") != ARCHIVE_FORMAT or payload.get("version") != ARCHIVE_VERSION:
+        raise ValueError("不支援的封存檔格式")
+
+    names = list(payload["columns"])
+    values = [
+        _decode_column(column["values"], column["encoding"])
+        for column in payload["columns"].values()
+    ]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def read_archive(archive):
+    with open(archive_root() / archive.file_path, "rb") as f:
+        return decode_archive(f.read())
+
+
+def _write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def archive_file_path(kind, user_id, month, checksum):
+    """封存檔的相對路徑；檔名含內容雜湊，重寫時不覆蓋仍被資料表參照的舊檔"""
+    return f"{kind}/{user_id}/{month:%Y-%m}-{checksum[:16]}.json.xz"
+
+
+def _remove_file(file_path):
+    try:
+        os.remove(archive_root() / file_path)
+    except FileNotFoundError:
+        pass
+
+
+def _month_bounds(month):
+    start = timezone.make_aware(datetime.datetime(month.year, month.month, 1))
+    if month.month == 12:
+        end = timezone.make_aware(datetime.datetime(month.year + 1, 1, 1))
+    else:
+        end = timezone.make_aware(datetime.datetime(month.year, month.month + 1, 1))
+    return start, end
+
+
+def pending_groups(kind, cutoff):
+    """列出早於 cutoff 且尚未封存的 (使用者, 月份) 分組"""
+    spec = KINDS[kind]
+    time_field = spec["time_field"]
+    return (
+        spec["model"].objects
+        .filter(**{f"{time_field}__lt": cutoff})
+        .annotate(month=TruncMonth(time_field))
+        .values("user_id", "month")
+        .annotate(row_count=Count("id"))
+        .order_by("user_id", "month")
+    )
+
+
+def archive_group(kind, user_id, month, cutoff):
+    """
+    將單一使用者單月且早於 cutoff 的紀錄寫入封存檔，更新摘要並自熱資料表刪除。
+    若該月已有封存檔則合併後寫入新檔 (檔名含內容雜湊)，舊檔於交易提交後刪除。回傳封存的筆數。
+    """
+    spec = KINDS[kind]
+    model = spec["model"]
+    time_field = spec["time_field"]
+    fields = [name for name, _ in spec["columns"]]
+    start, end = _month_bounds(month)
+    end = min(end, cutoff)
+
+    written = None
+    try:
+        with transaction.atomic():
+            rows = list(
+                model.objects
+                .filter(**{"user_id": user_id, f"{time_field}__gte": start, f"{time_field}__lt": end})
+                .order_by(time_field, "id")
+                .values(*fields)
+            )
+            if not rows:
+                return 0
+
+            archive = (
+                HistoryArchive.objects
+                .select_for_update()
+                .filter(user_id=user_id, kind=kind, month=month)
+                .first()
+            )
+            if archive is None:
+                archive = HistoryArchive(user_id=user_id, kind=kind, month=month)
+                merged = rows
+            else:
+                archived_ids = {row["id"] for row in rows}
+                merged = [row for row in read_archive(archive) if row["id"] not in archived_ids] + rows
+                merged.sort(key=lambda row: (row[time_field], row["id"]))
+
+            data = encode_archive(kind, merged)
+            checksum = hashlib.sha256(data).hexdigest()
+            previous = archive.file_path
+            archive.file_path = archive_file_path(kind, user_id, month, checksum)
+            if archive.file_path != previous:
+                _write_atomic(archive_root() / archive.file_path, data)
+                written = archive.file_path
+                if previous:
+                    transaction.on_commit(lambda: _remove_file(previous))
+
+            archive.row_count = len(merged)
+            archive.correct_count = sum(1 for row in merged if spec["is_correct"](row))
+            archive.total_time_spent = sum(row["time_spent"] for row in merged)
+            archive.first_at = merged[0][time_field]
+            archive.last_at = merged[-1][time_field]
+            archive.attempt_totals = attempt_totals(merged) if kind == "question_attempt" else None
+            archive.file_size = len(data)
+            archive.checksum = checksum
+            archive.save()
+
+            ids = [row["id"] for row in rows]
+            for i in range(0, len(ids), DELETE_BATCH_SIZE):
+                model.objects.filter(id__in=ids[i:i + DELETE_BATCH_SIZE]).delete()
+    except BaseException:
+        # 交易復原後資料表仍指向舊檔，刪除本次寫入的新檔
+        if written is not None:
+            _remove_file(written)
+        raise
+
+    return len(rows)
+
+
+def verify_archive(archive):
+    """檢查封存檔雜湊與摘要筆數是否一致"""
+    with open(archive_root() / archive.file_path, "rb") as f:
+        data = f.read()
+    if hashlib.sha256(data).hexdigest() != archive.checksum:
+        return False
+    return len(decode_archive(data)) == archive.row_count
+
+
+def history(user, kind, since=None, until=None):
+    """
+    讀取使用者的歷史紀錄，合併封存檔與熱資料表，依時間由新到舊排序。
+    同一 id 同時存在於兩處時 (封存中斷) 以熱資料表為準。
+    """
+    spec = KINDS[kind]
+    time_field = spec["time_field"]
+    fields = [name for name, _ in spec["columns"]]
+
+    hot = spec["model"].objects.filter(user=user)
+    archives = HistoryArchive.objects.filter(user=user, kind=kind)
+    if since is not None:
+        hot = hot.filter(**{f"{time_field}__gte": since})
+        archives = archives.filter(last_at__gte=since)
+    if until is not None:
+        hot = hot.filter(**{f"{time_field}__lt": until})
+        archives = archives.filter(first_at__lt=until)
+
+    rows = {row["id"]: row for archive in archives for row in read_archive(archive)}
+    rows.update((row["id"], row) for row in hot.values(*fields))
+
+    result = [
+        row for row in rows.values()
+        if (since is None or row[time_field] >= since) and (until is None or row[time_field] < until)
+    ]
+    result.sort(key=lambda row: (row[time_field], row["id"]), reverse=True)
+    return result
+
+
+def question_attempt_history(user, since=None, until=None):
+    return history(user, "question_attempt", since=since, until=until)
+
+
+def flashcard_review_history(user, since=None, until=None):
+    return history(user, "flashcard_review", since=since, until=until)
+
+
+def archived_rows(kind, since=None, until=None, user=None):
+    """
+    逐筆產生封存檔中 [since, until) 期間的 (使用者 id, 紀錄)，未指定 user 時為所有使用者；
+    只讀取與期間重疊的封存檔
+    """
+    time_field = KINDS[kind]["time_field"]
+    archives = HistoryArchive.objects.filter(kind=kind).order_by("id")
+    if user is not None:
+        archives = archives.filter(user=user)
+    if since is not None:
+        archives = archives.filter(last_at__gte=since)
+    if until is not None:
+        archives = archives.filter(first_at__lt=until)
+    for archive in archives.iterator():
+        for row in read_archive(archive):
+            if since is not None and row[time_field] < since:
+                continue
+            if until is not None and row[time_field] >= until:
+                continue
+            yield archive.user_id, row
+
+
+def attempt_totals(rows):
+    """作答紀錄依題目目前的科目與場次彙總 (寫入 HistoryArchive.attempt_totals)，不評分的作答不計入"""
+    question_ids = list({row["question_id"] for row in rows})
+    papers = {}
+    for i in range(0, len(question_ids), DELETE_BATCH_SIZE):
+        papers.update(
+            (question_id, (subject_id, session_id))
+            for question_id, subject_id, session_id in Question.objects.filter(
+                id__in=question_ids[i:i + DELETE_BATCH_SIZE],
+            ).values_list("id", "subject_id", "exam_session_id")
+        )
+    totals = defaultdict(lambda: [0, 0, 0, 0])
+    for row in rows:
+        if row["is_correct"] is None or row["question_id"] not in papers:
+            continue
+        total = totals[papers[row["question_id"]]]
+        total[0] += 1
+        total[2] += row["time_spent"]
+        if row["is_correct"]:
+            total[1] += 1
+            total[3] += row["time_spent"]
+    return [[*paper, *total] for paper, total in sorted(totals.items())]
+
+
+def question_attempt_totals(user, subject_ids=None, exam_session_id=None, since=None, until=None, is_correct=None):
+    """
+    封存的作答紀錄依科目彙總 {科目 id: [作答數, 答對數, 花費時間]}，可限定科目 (subject_ids) 與場次。
+    整份落在期間內的封存檔直接使用摘要 (attempt_totals)，只有跨越期間起訖的封存檔需要解壓縮
+    """
+    archives = HistoryArchive.objects.filter(user=user, kind="question_attempt")
+    if since is not None:
+        archives = archives.filter(last_at__gte=since)
+    if until is not None:
+        archives = archives.filter(first_at__lt=until)
+
+    partial = []
+    rows = []
+    for archive in archives.only("id", "first_at", "last_at", "attempt_totals"):
+        covered = (since is None or archive.first_at >= since) and (until is None or archive.last_at < until)
+        if covered and archive.attempt_totals is not None:
+            rows.extend(archive.attempt_totals)
+        else:
+            partial.append(archive.id)
+    if partial:
+        rows.extend(attempt_totals([
+            row
+            for archive in HistoryArchive.objects.filter(id__in=partial)
+            for row in read_archive(archive)
+            if (since is None or row["created_at"] >= since) and (until is None or row["created_at"] < until)
+        ]))
+
+    totals = defaultdict(lambda: [0, 0, 0])
+    for subject_id, session_id, count, correct, time_spent, correct_time in rows:
+        if subject_ids is not None and subject_id not in subject_ids:
+            continue
+        if exam_session_id is not None and session_id != exam_session_id:
+            continue
+        if is_correct is True:
+            count, time_spent = correct, correct_time
+        elif is_correct is False:
+            count, correct, time_spent = count - correct, 0, time_spent - correct_time
+        total = totals[subject_id]
+        total[0] += count
+        total[1] += correct
+        total[2] += time_spent
+    return {subject_id: total for subject_id, total in totals.items() if total[0]}
+
+
+def monthly_summary(user, kind):
+    """
+    每月統計 (筆數、答對數、花費時間)，封存月份直接取摘要，不需讀取封存檔。
+    """
+    spec = KINDS[kind]
+    time_field = spec["time_field"]
+    summary = {}
+
+    for archive in HistoryArchive.objects.filter(user=user, kind=kind):
+        summary[archive.month] = {
+            "month": archive.month,
+            "row_count": archive.row_count,
+            "correct_count": archive.correct_count,
+            "total_time_spent": archive.total_time_spent,
+        }
+
+    hot = (
+        spec["model"].objects
+        .filter(user=user)
+        .annotate(month=TruncMonth(time_field))
+        .values("month")
+        .annotate(
+            row_count=Count("id"),
+            correct_count=Count("id", filter=spec["correct_filter"]),
+            total_time_spent=Sum("time_spent"),
+        )
+        .order_by()
+    )
+    for row in hot:
+        month = timezone.localtime(row["month"]).date()
+        entry = summary.setdefault(month, {
+            "month": month,
+            "row_count": 0,
+            "correct_count": 0,
+            "total_time_spent": 0,
+        })
+        entry["row_count"] += row["row_count"]
+        entry["correct_count"] += row["correct_count"]
+        entry["total_time_spent"] += row["total_time_spent"] or 0
+
+    return sorted(summary.values(), key=lambda entry: entry["month"], reverse=True)
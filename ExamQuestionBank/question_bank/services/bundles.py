@@ -0,0 +1,187 @@
+"""
+整份試卷包 (PaperBundle)：已發布場次中每個科目的題組、題目與選項輸出為一個 gzip 壓縮的 JSON 檔。
+
+檔名含內容雜湊 (<場次>-<科目>-<雜湊>.json.gz)，內容不變時不重寫；
+內容改變時寫入新檔並於交易提交後刪除舊檔，已快取舊檔名的客戶端不會讀到不一致的內容。
+歷屆試題練習載入整份試卷時只需讀取一個檔案，不查詢題目與序列化。
+
+只包含已發布、公開且未刪除的題目；場次取消發布或沒有題目時刪除試卷包。
+題目、選項、題組或場次異動後於交易提交時重建 (schedule_build / schedule_questions)，bulk 寫入需自行呼叫。
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from exams.models import ExamSession, Subject
+from question_bank.models import PaperBundle, Question, QuestionOption, QuestionSet
+
+
+FILE_NAME = re.compile(r"^\d+-\d+-[0-9a-f]{16}\.json\.gz$")
+
+_pending = threading.local()
+
+
+def bundle_path(file_name):
+    return os.path.join(settings.PAPER_BUNDLE_DIR, file_name)
+
+
+def bundle_etag(file_name):
+    """ETag 為檔名中的內容雜湊"""
+    return f'"{file_name.rsplit("-", 1)[1].split(".", 1)[0]}"'
+
+
+def question_order(question):
+    number = question["question_number"]
+    return (int(number), "") if number.isdigit() else (float("inf"), number)
+
+
+def paper_content(session, subject):
+    """試卷內容 (dict)，沒有題目時回傳 None"""
+    questions = list(
+        Question.objects.filter(
+            exam_session_id=session.id, subject_id=subject.id,
+            status="published", is_public=True, deleted_at__isnull=True,
+        ).values(
+            "id", "question_set_id", "question_number", "content", "question_type", "difficulty", "points",
+            "analysis", "answer_explanation",
+        )
+    )
+    if not questions:
+        return None
+    options = defaultdict(list)
+    for row in (
+        QuestionOption.objects.filter(question_id__in=[question["id"] for question in questions])
+        .order_by("question_id", "order")
+        .values("question_id", "option_label", "content", "is_correct")
+    ):
+        options[row.pop("question_id")].append(row)
+    set_ids = {question["question_set_id"] for question in questions} - {None}
+    question_sets = list(
+        QuestionSet.objects.filter(id__in=set_ids).order_by("order", "id")
+        .values("id", "title", "description", "order")
+    )
+    questions.sort(key=question_order)
+    for question in questions:
+        question["question_set"] = question.pop("question_set_id")
+        question["options"] = options[question["id"]]
+    return {
+        "exam_session": {
+            "id": session.id,
+            "name": str(session),
+            "year": session.year,
+            "session_number": session.session_number,
+            "exam_date": session.exam_date.isoformat() if session.exam_date else None,
+        },
+        "subject": {"id": subject.id, "name": subject.name, "code": subject.code},
+        "question_sets": question_sets,
+        "questions": questions,
+    }
+
+
+def build(session_id, subject_id):
+    """重建一份試卷包，回傳 PaperBundle (場次未發布或沒有題目時刪除並回傳 None)"""
+    session = ExamSession.objects.select_related("exam_series").filter(pk=session_id).first()
+    subject = Subject.objects.filter(pk=subject_id).first()
+    current = PaperBundle.objects.filter(exam_session_id=session_id, subject_id=subject_id).first()
+    content = paper_content(session, subject) if session and subject and session.is_published else None
+    if content is None:
+        if current is not None:
+            current.delete()
+            remove_file(current.file_name)
+        return None
+
+    data = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+    content_hash = hashlib.sha256(data).hexdigest()
+    if current is not None and current.content_hash == content_hash and os.path.exists(bundle_path(current.file_name)):
+        return current
+
+    file_name = f"{session_id}-{subject_id}-{content_hash[:16]}.json.gz"
+    path = bundle_path(file_name)
+    os.makedirs(settings.PAPER_BUNDLE_DIR, exist_ok=True)
+    # mtime 固定為 0，相同內容產生相同的壓縮檔
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=9, mtime=0) as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+    bundle, _ = PaperBundle.objects.update_or_create(
+        exam_session_id=session_id, subject_id=subject_id,
+        defaults={
+            "content_hash": content_hash, "file_name": file_name,
+            "size": os.path.getsize(path), "question_count": len(content["questions"]),
+        },
+    )
+    if current is not None and current.file_name != file_name:
+        remove_file(current.file_name)
+    return bundle
+
+
+def remove_file(file_name):
+    """交易提交後刪除舊檔 (交易復原時資料表仍指向舊檔)"""
+    def remove():
+        try:
+            os.remove(bundle_path(file_name))
+        except FileNotFoundError:
+            pass
+
+    transaction.on_commit(remove)
+
+
+def papers_for_session(session_id):
+    """場次中有題目或已有試卷包的科目"""
+    subject_ids = set(Question.objects.filter(exam_session_id=session_id).values_list("subject_id", flat=True))
+    subject_ids.update(PaperBundle.objects.filter(exam_session_id=session_id).values_list("subject_id", flat=True))
+    return [(session_id, subject_id) for subject_id in subject_ids]
+
+
+def schedule_build(session_id, subject_id=None):
+    """交易提交後重建試卷包 (未指定科目時重建場次中所有科目；同一交易中多次異動只重建一次)"""
+    _schedule("papers", (session_id, subject_id))
+
+
+def schedule_questions(question_ids, previous_papers=()):
+    """
+    交易提交後重建題目所屬的試卷包；題目改變場次或科目時，
+    previous_papers 傳入寫入前的 papers_of()，舊試卷包一併重建
+    """
+    _schedule("questions", *question_ids)
+    if previous_papers:
+        _schedule("papers", *previous_papers)
+
+
+def papers_of(question_ids):
+    """題目目前所屬的 (場次, 科目)"""
+    return set(
+        Question.objects.filter(id__in=list(question_ids))
+        .order_by().values_list("exam_session_id", "subject_id").distinct()
+    )
+
+
+def _schedule(kind, *items):
+    if not hasattr(_pending, kind):
+        setattr(_pending, kind, set())
+    getattr(_pending, kind).update(items)
+    # 重建失敗 (例如磁碟空間不足) 不影響已提交的異動，下次異動或 build_paper_bundles 時重建
+    transaction.on_commit(_flush, robust=True)
+
+
+def _flush():
+    papers = getattr(_pending, "papers", set())
+    question_ids = getattr(_pending, "questions", set())
+    _pending.papers = set()
+    _pending.questions = set()
+    if question_ids:
+        papers.update(papers_of(question_ids))
+    sessions = {session_id for session_id, subject_id in papers if subject_id is None}
+    for session_id in sessions:
+        papers.update(papers_for_session(session_id))
+    for session_id, subject_id in papers:
+        if subject_id is not None:
+            build(session_id, subject_id)
@@ -0,0 +1,176 @@
+"""
+近似重複題偵測 (MinHash + LSH)。
+
+題目與選項正規化 (NFKC、小寫、只保留文字與數字，選項依內容排序) 後切成 SHINGLE_SIZE 字元的片段，
+以 NUM_PERM 個雜湊函數各取最小值作為簽章；兩題簽章相同位置的比例即為 Jaccard 相似度的估計。
+
+簽章分成 BANDS 段，每段的雜湊為一個桶 (QuestionLSHBucket)，任一段相同的題目即為候選，
+再以簽章估計的相似度篩選。16 段 x 4 列時，相似度 0.7 的題目約 99% 會成為候選，
+0.3 以下的題目約 12% 以下，查詢只需讀取少量候選的簽章。
+
+題目或選項儲存後於交易提交時更新指紋；bulk 寫入需自行呼叫 index_questions。
+"""
+import hashlib
+import random
+import struct
+import threading
+import unicodedata
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+
+from question_bank.models import Question, QuestionFingerprint, QuestionLSHBucket, QuestionOption
+
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+_PRIME = (1 << 61) - 1
+# 固定種子，簽章需在各行程間一致
+_random = random.Random(8675309)
+PERMUTATIONS = [(_random.randrange(1, _PRIME), _random.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+SIGNATURE = struct.Struct(f"<{NUM_PERM}Q")
+_BAND = struct.Struct(f"<B{ROWS}Q")
+
+_pending = threading.local()
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(char for char in text if unicodedata.category(char)[0] in "LN")
+
+
+def question_text(content, options=()):
+    """題目與選項正規化後的文字 (選項依內容排序，調換選項順序視為相同題目)"""
+    return normalize(content) + "".join(sorted(normalize(option) for option in options))
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {zlib.crc32(text.encode())} if text else set()
+    return {zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """MinHash 簽章 (NUM_PERM 個整數)，沒有文字時回傳 None"""
+    values = shingles(text)
+    if not values:
+        return None
+    return tuple(min([(a * value + b) % _PRIME for value in values]) for a, b in PERMUTATIONS)
+
+
+def buckets(values):
+    """簽章每段的雜湊 (段號一併雜湊，不同段不會落在同一桶)"""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(_BAND.pack(band, *values[band * ROWS:(band + 1) * ROWS]), digest_size=8).digest(),
+            "little", signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def similarity(a, b):
+    """由兩個已打包的簽章估計 Jaccard 相似度"""
+    # 只比較是否相等，位元組順序不影響結果
+    a = memoryview(a).cast("Q")
+    b = memoryview(b).cast("Q")
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def index_questions(question_ids, force=False):
+    """
+    重新計算題目指紋與 LSH 分段，回傳更新題數。
+    正規化內容未變動的題目略過 (force=True 時一律重新計算)。
+    """
+    question_ids = list(question_ids)
+    options = {}
+    for question_id, content in (
+        QuestionOption.objects.filter(question_id__in=question_ids)
+        .order_by("question_id")
+        .values_list("question_id", "content")
+    ):
+        options.setdefault(question_id, []).append(content)
+    current = {} if force else dict(
+        QuestionFingerprint.objects.filter(question_id__in=question_ids).values_list("question_id", "content_hash")
+    )
+
+    changed = []
+    fingerprints = []
+    rows = []
+    for question_id, content in Question.objects.filter(id__in=question_ids).values_list("id", "content"):
+        text = question_text(content, options.get(question_id, ()))
+        content_hash = hashlib.sha256(text.encode()).hexdigest()
+        if current.get(question_id) == content_hash:
+            continue
+        changed.append(question_id)
+        values = signature(text)
+        if values is None:
+            continue
+        fingerprints.append(QuestionFingerprint(
+            question_id=question_id, content_hash=content_hash, signature=SIGNATURE.pack(*values),
+        ))
+        rows.extend(QuestionLSHBucket(question_id=question_id, bucket=bucket) for bucket in buckets(values))
+
+    if changed:
+        with transaction.atomic():
+            QuestionFingerprint.objects.filter(question_id__in=changed).delete()
+            QuestionLSHBucket.objects.filter(question_id__in=changed).delete()
+            QuestionFingerprint.objects.bulk_create(fingerprints)
+            QuestionLSHBucket.objects.bulk_create(rows, batch_size=1000)
+    return len(changed)
+
+
+def schedule_index(question_id):
+    """交易提交後更新題目指紋 (同一交易中多次異動只計算一次)"""
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    _pending.ids.add(question_id)
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    question_ids = _pending.ids
+    _pending.ids = set()
+    if question_ids:
+        index_questions(question_ids)
+
+
+def matches(values, threshold=None, limit=10, exclude=()):
+    """以簽章查詢近似重複題，回傳依相似度排序的 [(題目 id, 相似度)]"""
+    if threshold is None:
+        threshold = settings.NEAR_DUPLICATE_THRESHOLD
+    candidates = set(
+        QuestionLSHBucket.objects.filter(bucket__in=buckets(values)).values_list("question_id", flat=True)
+    )
+    candidates.difference_update(exclude)
+    if not candidates:
+        return []
+    packed = SIGNATURE.pack(*values)
+    scored = [
+        (question_id, similarity(packed, other))
+        for question_id, other in QuestionFingerprint.objects.filter(question_id__in=candidates)
+        .values_list("question_id", "signature")
+    ]
+    scored = [(question_id, score) for question_id, score in scored if score >= threshold]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+
+def find_similar(content, options=(), **kwargs):
+    """查詢與尚未儲存的題目 (例如匯入前) 近似的題目"""
+    values = signature(question_text(content, options))
+    return matches(values, **kwargs) if values is not None else []
+
+
+def similar_to(question_id, **kwargs):
+    """查詢與已建立指紋的題目近似的其他題目"""
+    packed = (
+        QuestionFingerprint.objects.filter(question_id=question_id).values_list("signature", flat=True).first()
+    )
+    if packed is None:
+        return []
+    return matches(SIGNATURE.unpack(bytes(packed)), exclude={question_id}, **kwargs)
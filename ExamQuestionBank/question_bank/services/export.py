@@ -0,0 +1,132 @@
+"""
+題庫匯出：逐批讀取題目 (每批預先載入選項與標籤)，以固定記憶體輸出 JSON Lines / CSV / XLSX。
+"""
+import csv
+import json
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from exams.catalog import catalog
+from question_bank.models import QuestionOption, QuestionTagRelation
+
+
+CHUNK_SIZE = 2000
+# 串流回應每次送出的大小
+BUFFER_SIZE = 64 * 1024
+OPTION_LABELS = ["A", "B", "C", "D"]
+
+COLUMNS = [
+    "id", "exam_session", "subject", "question_number", "question_type", "difficulty", "points",
+    "status", "content", *(f"option_{label}" for label in OPTION_LABELS), "answer",
+    "analysis", "answer_explanation", "tags",
+]
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """逐筆產生題目資料，每 chunk_size 題查詢一次選項與標籤"""
+    queryset = queryset.prefetch_related(
+        Prefetch("options", queryset=QuestionOption.objects.order_by("order")),
+        Prefetch("tag_relations", queryset=QuestionTagRelation.objects.select_related("tag")),
+    )
+    for question in queryset.iterator(chunk_size=chunk_size):
+        options = question.options.all()
+        yield {
+            "id": question.id,
+            "exam_session": catalog.session_name(question.exam_session_id),
+            "subject": catalog.subject_name(question.subject_id),
+            "question_number": question.question_number,
+            "question_type": question.question_type,
+            "difficulty": question.difficulty,
+            "points": question.points,
+            "status": question.status,
+            "content": question.content,
+            "options": [
+                {"label": option.option_label, "content": option.content, "is_correct": option.is_correct}
+                for option in options
+            ],
+            "answer": "".join(option.option_label for option in options if option.is_correct),
+            "analysis": question.analysis,
+            "answer_explanation": question.answer_explanation,
+            "tags": [relation.tag.name for relation in question.tag_relations.all()],
+        }
+
+
+def flat_row(row):
+    """CSV / XLSX 用的一列 (選項展開為固定欄位，標籤以 | 分隔)"""
+    options = {option["label"]: option["content"] for option in row["options"]}
+    return [
+        *(row[column] for column in COLUMNS[:9]),
+        *(options.get(label, "") for label in OPTION_LABELS),
+        row["answer"], row["analysis"], row["answer_explanation"], "|".join(row["tags"]),
+    ]
+
+
+def buffered(pieces, size=BUFFER_SIZE):
+    """將小字串合併成約 size 位元組的區塊再送出"""
+    buffer = []
+    length = 0
+    for piece in pieces:
+        buffer.append(piece)
+        length += len(piece)
+        if length >= size:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+            length = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def jsonl_stream(rows):
+    return buffered(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+
+class _Echo:
+    """csv.writer 寫入時直接回傳內容"""
+    def write(self, value):
+        return value
+
+
+def csv_stream(rows):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        # BOM 讓 Excel 以 UTF-8 開啟
+        yield "\ufeff" + writer.writerow(COLUMNS)
+        for row in rows:
+            yield writer.writerow(flat_row(row))
+
+    return buffered(lines())
+
+
+def xlsx_file(rows):
+    """
+    以 openpyxl write-only 模式寫入暫存檔並回傳已移到開頭的檔案物件。
+    XLSX 為 zip 格式，需寫完才能送出，但寫入過程只保留目前一列在記憶體中。
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("questions")
+    sheet.append(COLUMNS)
+    for row in rows:
+        sheet.append([
+            ILLEGAL_CHARACTERS_RE.sub("", value) if isinstance(value, str) else value
+            for value in flat_row(row)
+        ])
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+async def async_chunks(chunks):
+    """
+    ASGI 下 StreamingHttpResponse 收到同步 iterator 會先整個讀進記憶體，
+    改為逐塊在請求的同步執行緒中取得 (資料庫連線仍在同一執行緒)
+    """
+    done = object()
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
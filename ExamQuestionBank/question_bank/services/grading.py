@@ -0,0 +1,262 @@
+"""
+作答評分：每個 worker 行程內的答案索引 (題目 id -> AnswerKey)。
+
+每題的選項依順序對應到一個位元，作答 (選項 id 或標籤) 轉為位元遮罩後與正確答案比較：
+- 單選題：選一個選項且為正確選項 (答案卷備註「答 A 或 B 均給分」時有多個正確選項，選其一即可)
+- 複選題：選取的選項需與正確選項完全相同
+- 一律給分 (答案卷答案為 #，或備註註明一律給分)：任何作答都正確
+- 沒有正確選項的題目 (申論題、尚未匯入答案) 不評分：is_correct 存為 null，不計入題目與練習場次的答對率
+
+索引在第一次評分時讀取該題的選項，之後命中時不查詢資料庫。
+選項或題目異動後更新題目所屬科目的版本戳記 "answer-keys:<科目 id>" (exams.versioning)，
+本行程於交易提交後立即失效，其他行程最多每 CATALOG_VERSION_CHECK_INTERVAL 秒以一次快取查詢
+檢查索引中各科目的版本，只移除版本改變的科目的答案。
+"""
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from exams.versioning import bump_version, get_versions
+from monitoring.metrics import record_cache
+from question_bank.models import PracticeSession, Question, QuestionAttempt, QuestionOption
+from . import leaderboards
+
+
+ANSWER_KEYS = "answer-keys"
+# 答案卷答案為 # 的題目匯入時寫入的答案說明
+VOIDED_EXPLANATION = "本題一律給分"
+
+EXACT = "exact"
+ANY = "any"
+VOIDED = "voided"
+UNKEYED = "unkeyed"
+
+
+class MissingQuestions(Exception):
+    """作答的題目不存在 (例如在檢查後被刪除)，question_ids 為找不到的題目"""
+    def __init__(self, question_ids):
+        super().__init__(f"找不到題目：{', '.join(map(str, sorted(question_ids)))}")
+        self.question_ids = question_ids
+
+
+class AnswerKey:
+    """
+    一題的答案：bits 為選項 id 與標籤對應的位元，correct 為正確選項的位元遮罩
+    (另記錄題目的科目與場次，更新排行榜時不需查詢)
+    """
+    __slots__ = ("mode", "correct", "bits", "labels", "subject_id", "exam_session_id")
+
+    def __init__(self, mode, correct, bits, labels, subject_id=None, exam_session_id=None):
+        self.mode = mode
+        self.correct = correct
+        self.bits = bits
+        self.labels = labels
+        self.subject_id = subject_id
+        self.exam_session_id = exam_session_id
+
+    def grade(self, selected):
+        """回傳是否正確，不評分的題目回傳 None"""
+        if self.mode == VOIDED:
+            return True
+        if self.mode == UNKEYED:
+            return None
+        mask = 0
+        for value in selected:
+            bit = self.bits.get(value)
+            if bit is None:
+                return False
+            mask |= bit
+        if self.mode == ANY:
+            # 恰好選一個選項，且為正確選項之一
+            return mask != 0 and mask & (mask - 1) == 0 and mask & self.correct != 0
+        return mask != 0 and mask == self.correct
+
+    @property
+    def correct_labels(self):
+        return [label for index, label in enumerate(self.labels) if self.correct >> index & 1]
+
+
+def build_keys(question_ids):
+    """由資料庫讀取題目的答案，回傳 {題目 id: AnswerKey}"""
+    options = defaultdict(list)
+    for question_id, option_id, label, is_correct in (
+        QuestionOption.objects.filter(question_id__in=question_ids)
+        .order_by("question_id", "order", "id")
+        .values_list("question_id", "id", "option_label", "is_correct")
+    ):
+        options[question_id].append((option_id, label, is_correct))
+
+    keys = {}
+    for question_id, question_type, explanation, subject_id, session_id in (
+        Question.objects.filter(id__in=question_ids).values_list(
+            "id", "question_type", "answer_explanation", "subject_id", "exam_session_id",
+        )
+    ):
+        bits = {}
+        labels = []
+        correct = 0
+        for index, (option_id, label, is_correct) in enumerate(options[question_id]):
+            bit = 1 << index
+            # JSON 作答中的選項 id 可能是整數或字串
+            bits[option_id] = bits[str(option_id)] = bits[label] = bit
+            labels.append(label)
+            if is_correct:
+                correct |= bit
+        if explanation.startswith(VOIDED_EXPLANATION):
+            mode = VOIDED
+        elif not correct:
+            mode = UNKEYED
+        elif question_type == "multiple":
+            mode = EXACT
+        else:
+            mode = ANY
+        keys[question_id] = AnswerKey(mode, correct, bits, tuple(labels), subject_id, session_id)
+    return keys
+
+
+def subject_namespace(subject_id):
+    return f"{ANSWER_KEYS}:{subject_id}"
+
+
+class AnswerKeyIndex:
+    """
+    每個 worker 行程內的答案索引，其他行程的異動透過各科目的版本戳記得知
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = {}
+        # {科目 id: 版本}；新載入的科目為 None，下次檢查時重新載入一次 (避免載入期間的異動被略過)
+        self.versions = {}
+        self.checked_at = 0.0
+
+    def check_version(self):
+        now = time.monotonic()
+        if now - self.checked_at < settings.CATALOG_VERSION_CHECK_INTERVAL or not self.versions:
+            return
+        self.checked_at = now
+        subject_ids = list(self.versions)
+        current = get_versions([subject_namespace(subject_id) for subject_id in subject_ids])
+        changed = {
+            subject_id for subject_id in subject_ids
+            if current[subject_namespace(subject_id)] != self.versions[subject_id]
+        }
+        if changed:
+            with self.lock:
+                self.keys = {
+                    question_id: key for question_id, key in self.keys.items() if key.subject_id not in changed
+                }
+                for subject_id in changed:
+                    self.versions[subject_id] = current[subject_namespace(subject_id)]
+
+    def get_many(self, question_ids):
+        """{題目 id: AnswerKey}，不存在的題目不在結果中"""
+        self.check_version()
+        keys = self.keys
+        missing = [question_id for question_id in set(question_ids) if question_id not in keys]
+        record_cache(ANSWER_KEYS, not missing)
+        if missing:
+            loaded = build_keys(missing)
+            with self.lock:
+                keys.update(loaded)
+                for key in loaded.values():
+                    self.versions.setdefault(key.subject_id, None)
+        return {question_id: keys[question_id] for question_id in question_ids if question_id in keys}
+
+    def get(self, question_id):
+        return self.get_many([question_id]).get(question_id)
+
+    def invalidate(self, question_ids):
+        with self.lock:
+            for question_id in question_ids:
+                self.keys.pop(question_id, None)
+
+
+answer_keys = AnswerKeyIndex()
+
+
+def answer_keys_changed(question_ids, subject_ids=()):
+    """
+    題目或選項異動後呼叫 (交易提交後生效)。更新題目目前科目的版本；
+    題目被刪除或改變科目時，subject_ids 需傳入原本的科目
+    """
+    question_ids = list(question_ids)
+    subject_ids = set(subject_ids)
+    subject_ids.update(Question.objects.filter(id__in=question_ids).values_list("subject_id", flat=True))
+    subject_ids.update(key.subject_id for key in map(answer_keys.keys.get, question_ids) if key is not None)
+    for subject_id in subject_ids:
+        bump_version(subject_namespace(subject_id))
+    transaction.on_commit(lambda: answer_keys.invalidate(question_ids))
+
+
+def grade(question_id, selected):
+    """評分一題，回傳 (是否正確, 正確選項標籤)；題目不存在時回傳 (None, [])"""
+    key = answer_keys.get(question_id)
+    if key is None:
+        return None, []
+    return key.grade(selected), key.correct_labels
+
+
+def record_attempts(user, answers, practice_session=None):
+    """
+    評分並寫入作答紀錄，同時更新題目與練習場次的作答統計，交易提交後更新排行榜。
+    answers 為 [{"question": 題目 id, "selected_options": [...], "answer_text": "", "time_spent": 秒}]，
+    回傳 [(QuestionAttempt, 是否正確 (不評分為 None), 正確選項標籤)]；題目不存在時拋出 MissingQuestions
+    """
+    keys = answer_keys.get_many([answer["question"] for answer in answers])
+    missing = {answer["question"] for answer in answers} - set(keys)
+    if missing:
+        raise MissingQuestions(missing)
+    results = []
+    for answer in answers:
+        key = keys[answer["question"]]
+        correct = key.grade(answer["selected_options"])
+        attempt = QuestionAttempt(
+            user=user,
+            question_id=answer["question"],
+            selected_options=answer["selected_options"],
+            answer_text=answer.get("answer_text", ""),
+            is_correct=correct,
+            time_spent=answer.get("time_spent", 0),
+            practice_session=practice_session,
+        )
+        results.append((attempt, correct, key.correct_labels))
+
+    # 不評分的作答不計入答對率的分母
+    attempts = Counter(attempt.question_id for attempt, correct, _ in results if correct is not None)
+    corrects = Counter(attempt.question_id for attempt, correct, _ in results if correct)
+    with transaction.atomic():
+        QuestionAttempt.objects.bulk_create([attempt for attempt, _, _ in results])
+        # 以 update 累加，不觸發 signal，也不改變題目的更新時間
+        if attempts:
+            Question.objects.filter(id__in=list(attempts)).update(
+                attempt_count=F("attempt_count") + increments(attempts, attempts),
+                correct_count=F("correct_count") + increments(corrects, attempts),
+            )
+        if practice_session is not None:
+            PracticeSession.objects.filter(pk=practice_session.pk).update(
+                answered_questions=F("answered_questions") + sum(attempts.values()),
+                correct_answers=F("correct_answers") + sum(corrects.values()),
+                total_time_spent=F("total_time_spent") + sum(answer.get("time_spent", 0) for answer in answers),
+            )
+    scored = [
+        (keys[attempt.question_id].subject_id, keys[attempt.question_id].exam_session_id, correct)
+        for attempt, correct, _ in results if correct is not None
+    ]
+    # 排行榜更新失敗 (例如 Redis 無法連線) 不影響作答紀錄，之後以 rebuild_leaderboards 重建
+    transaction.on_commit(lambda: leaderboards.record(user.id, scored), robust=True)
+    return results
+
+
+def increments(counts, question_ids):
+    """各題累加的數量，所有題目相同時為常數，否則為 CASE WHEN"""
+    values = {counts.get(question_id, 0) for question_id in question_ids}
+    if len(values) == 1:
+        return Value(values.pop())
+    return Case(
+        *[When(id=question_id, then=Value(count)) for question_id, count in counts.items()],
+        default=Value(0), output_field=IntegerField(),
+    )
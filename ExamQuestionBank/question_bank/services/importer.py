@@ -0,0 +1,403 @@
+"""
+題庫匯入 (Excel / CSV / JSON Lines)。
+
+欄位與匯出 (services.export) 相同，匯出的檔案可直接匯回。
+檔案逐列讀取，每 CHUNK_SIZE 列驗證一次並以 bulk_create / bulk_update 寫入；
+考試場次、科目與標籤透過記憶體中的對照表解析，不逐列查詢。
+
+已有相同 id，或相同場次、科目與題號的題目會被更新，其餘新增。
+選項與標籤欄位存在時整組取代，欄位不存在時保留原有資料。
+新增的題目若與題庫中的題目近似，記錄在 result_summary["duplicates"] ({題目 id: [[近似題 id, 相似度]]})。
+寫入後以 services.tagger 自動加上題目中出現的標籤與法條標籤，記錄在 result_summary["auto_tags"]。
+"""
+import csv
+import json
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+from openpyxl import load_workbook
+
+from exams.catalog import catalog
+from question_bank.models import Question, QuestionOption, QuestionTag, QuestionTagRelation
+from . import bundles, duplicates, grading, tagger
+from .export import OPTION_LABELS
+from .tag_index import tags_changed
+
+
+# 副檔名對應 ImportJob.file_type
+FILE_TYPES = {".xlsx": "excel", ".csv": "csv", ".jsonl": "json", ".json": "json"}
+CHUNK_SIZE = 500
+# error_log 最多記錄的錯誤列數
+MAX_LOGGED_ERRORS = 1000
+# 每題在 result_summary 記錄的近似重複題數
+MAX_DUPLICATES = 5
+
+UPDATE_FIELDS = [
+    "exam_session_id", "subject_id", "question_number", "content", "question_type", "difficulty",
+    "points", "status", "analysis", "answer_explanation", "updated_by", "updated_at",
+]
+
+
+class RowError(Exception):
+    pass
+
+
+def file_type_for(path):
+    return FILE_TYPES.get(Path(path).suffix.lower())
+
+
+def read_rows(path, file_type):
+    """逐列產生 (列號, 資料)；無法解析的列以 RowError 取代資料"""
+    if file_type == "excel":
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+            for number, values in enumerate(rows, start=2):
+                if any(value not in (None, "") for value in values):
+                    yield number, dict(zip(header, values))
+        finally:
+            workbook.close()
+    elif file_type == "csv":
+        # utf-8-sig 去除匯出時加上的 BOM
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+    elif file_type == "json":
+        with open(path, encoding="utf-8-sig") as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, RowError(f"JSON 格式錯誤：{e.msg}")
+                    continue
+                yield number, row if isinstance(row, dict) else RowError("每列需為 JSON 物件")
+    else:
+        raise ValueError(f"不支援的檔案類型：{file_type}")
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        # Excel 的數字題號讀出為 float
+        value = int(value)
+    return str(value).strip()
+
+
+class Lookups:
+    """
+    匯入期間使用的對照表：場次可用名稱或 id，科目可用名稱、代碼或 id，標籤用名稱
+    """
+    def __init__(self):
+        snapshot = catalog.get()
+        self.sessions = {}
+        for session_id, row in snapshot.sessions.items():
+            self.sessions[str(session_id)] = session_id
+            if row.get("name"):
+                self.sessions[row["name"]] = session_id
+        self.subjects = {}
+        for subject_id, row in snapshot.subjects.items():
+            self.subjects[str(subject_id)] = subject_id
+            self.subjects[row["code"]] = subject_id
+            self.subjects[row["name"]] = subject_id
+        self.tags = dict(QuestionTag.objects.values_list("name", "id"))
+
+    def session_id(self, value):
+        session_id = self.sessions.get(text(value))
+        if session_id is None:
+            raise RowError(f"找不到考試場次：{text(value)}")
+        return session_id
+
+    def subject_id(self, value):
+        subject_id = self.subjects.get(text(value))
+        if subject_id is None:
+            raise RowError(f"找不到科目：{text(value)}")
+        return subject_id
+
+    def tag_ids(self, names):
+        """取得標籤 id，不存在的標籤一次建立"""
+        missing = [name for name in names if name not in self.tags]
+        if missing:
+            QuestionTag.objects.bulk_create([QuestionTag(name=name) for name in missing], ignore_conflicts=True)
+            self.tags.update(QuestionTag.objects.filter(name__in=missing).values_list("name", "id"))
+        return [self.tags[name] for name in names]
+
+
+def choice(row, field, choices, default):
+    value = text(row.get(field)) or default
+    if value not in dict(choices):
+        raise RowError(f"{field} 不正確：{value}")
+    return value
+
+
+def clean_row(row, lookups, status):
+    """驗證一列並轉換為寫入用的資料，錯誤時拋出 RowError"""
+    if isinstance(row, RowError):
+        raise row
+
+    content = text(row.get("content"))
+    if not content:
+        raise RowError("缺少題目內容")
+    question_number = text(row.get("question_number"))
+    if not question_number:
+        raise RowError("缺少題號")
+    question_id = text(row.get("id"))
+    if question_id and not question_id.isdigit():
+        raise RowError(f"id 不正確：{question_id}")
+    points = text(row.get("points")) or "1"
+    if not points.lstrip("-").isdigit():
+        raise RowError(f"配分不正確：{points}")
+
+    # JSON Lines 的選項為清單，CSV / Excel 為 option_A ~ option_D 欄位
+    options = None
+    if row.get("options") not in (None, ""):
+        if not isinstance(row["options"], list) or not all(isinstance(option, dict) for option in row["options"]):
+            raise RowError("options 需為選項物件的清單")
+        options = [(text(option.get("label")), text(option.get("content"))) for option in row["options"]]
+    elif any(f"option_{label}" in row for label in OPTION_LABELS):
+        options = [
+            (label, text(row.get(f"option_{label}")))
+            for label in OPTION_LABELS if text(row.get(f"option_{label}"))
+        ]
+    answer = text(row.get("answer")).upper()
+    if options is not None:
+        labels = {label for label, _ in options}
+        if any(not label for label in labels) or len(labels) != len(options):
+            raise RowError("選項標籤不可空白或重複")
+        if any(label not in labels for label in answer):
+            raise RowError(f"答案 {answer} 不在選項中")
+
+    tags = row.get("tags")
+    if tags is not None and not isinstance(tags, list):
+        tags = text(tags).split("|")
+    if tags is not None:
+        tags = list(dict.fromkeys(tag.strip() for tag in map(text, tags) if tag.strip()))
+
+    return {
+        "id": int(question_id) if question_id else None,
+        "exam_session_id": lookups.session_id(row.get("exam_session")),
+        "subject_id": lookups.subject_id(row.get("subject")),
+        "question_number": question_number,
+        "content": content,
+        "question_type": choice(
+            row, "question_type", Question.TYPE_CHOICES, "multiple" if len(answer) > 1 else "single",
+        ),
+        "difficulty": choice(row, "difficulty", Question.DIFFICULTY_CHOICES, "medium"),
+        "points": int(points),
+        "status": choice(row, "status", Question.STATUS_CHOICES, status),
+        "analysis": text(row.get("analysis")),
+        "answer_explanation": text(row.get("answer_explanation")),
+        "options": options,
+        "answer": answer,
+        "tags": tags,
+    }
+
+
+class QuestionImporter:
+    """
+    執行一個 ImportJob：逐批驗證與寫入，每批寫入後更新 processed_items 與 error_log
+    """
+    def __init__(self, job, status="draft", user=None, chunk_size=CHUNK_SIZE):
+        self.job = job
+        self.status = status
+        self.user = user
+        self.chunk_size = chunk_size
+        self.lookups = Lookups()
+        self.tagger = None
+        self.logged_errors = 0
+
+    def run(self):
+        job = self.job
+        job.status = "processing"
+        job.started_at = job.started_at or timezone.now()
+        job.result_summary = {"created": 0, "updated": 0, "duplicates": {}, "auto_tags": 0}
+        job.save(update_fields=["status", "started_at", "result_summary"])
+        try:
+            rows = read_rows(job.file_path, job.file_type)
+            for chunk in chunked(rows, self.chunk_size):
+                self.import_chunk(chunk)
+        except Exception as e:
+            job.status = "failed"
+            job.error_log += f"匯入中止：{e}\n"
+        else:
+            job.status = "completed" if not job.failed_items else "failed"
+        job.total_items = job.processed_items
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "total_items", "error_log", "completed_at"])
+        return job
+
+    def import_chunk(self, chunk):
+        errors = []
+        cleaned = []
+        keys = {}
+        for number, row in chunk:
+            try:
+                item = clean_row(row, self.lookups, self.status)
+                key = self.key(item)
+                if key in keys:
+                    raise RowError(f"與第 {keys[key]} 列為同一題")
+                keys[key] = number
+                cleaned.append(item)
+            except RowError as e:
+                errors.append((number, e))
+
+        # 指定 id 的列需對應到已存在的題目
+        found = set(
+            Question.objects.filter(id__in=[item["id"] for item in cleaned if item["id"]])
+            .values_list("id", flat=True)
+        )
+        for item in [item for item in cleaned if item["id"] and item["id"] not in found]:
+            errors.append((keys[item["id"]], RowError(f"找不到題目 id {item['id']}")))
+            cleaned.remove(item)
+
+        created, updated, similar, tagged = [], 0, {}, 0
+        if cleaned:
+            try:
+                with transaction.atomic():
+                    created, updated, similar, tagged = self.upsert(cleaned)
+            except Exception as e:
+                # 整批復原，本批通過驗證的列一併記為失敗，並捨棄本批新建立的標籤 (自動機一併重建)
+                errors.extend((keys[self.key(item)], e) for item in cleaned)
+                cleaned = []
+                self.lookups.tags = dict(QuestionTag.objects.values_list("name", "id"))
+                self.tagger = None
+        self.checkpoint(
+            len(chunk), len(cleaned), sorted(errors, key=lambda error: error[0]), created, updated, similar, tagged,
+        )
+
+    @staticmethod
+    def key(item):
+        return item["id"] or (item["exam_session_id"], item["subject_id"], item["question_number"])
+
+    def upsert(self, items):
+        """寫入一批題目，回傳 (新增的題目 id, 更新數, 新增題目的近似重複題, 自動標籤數)"""
+        now = timezone.now()
+        existing = self.natural_ids(items)
+
+        to_create = []
+        to_update = []
+        for item in items:
+            question_id = item["id"] or existing.get(self.natural_key(item))
+            question = Question(
+                id=question_id,
+                **{field: item[field] for field in UPDATE_FIELDS if field in item},
+                updated_by=self.user,
+                updated_at=now,
+            )
+            if question_id:
+                to_update.append(question)
+            else:
+                question.created_by = self.user
+                question.published_at = now if item["status"] == "published" else None
+                to_create.append(question)
+
+        # 更新可能改變場次或科目，先記下原本所屬的試卷包
+        previous_papers = bundles.papers_of([question.id for question in to_update])
+        Question.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=self.chunk_size)
+        Question.objects.bulk_create(to_create, batch_size=self.chunk_size)
+        # SQL Server 不一定回傳 bulk_create 的 id，改以場次、科目與題號查回
+        created = []
+        if to_create:
+            new_ids = self.natural_ids(items)
+            created = [new_ids[key] for key in new_ids if key not in existing]
+            existing = new_ids
+        ids = [item["id"] or existing[self.natural_key(item)] for item in items]
+
+        with_options = [(question_id, item) for question_id, item in zip(ids, items) if item["options"] is not None]
+        if with_options:
+            QuestionOption.objects.filter(question_id__in=[question_id for question_id, _ in with_options]).delete()
+            QuestionOption.objects.bulk_create(
+                [
+                    QuestionOption(
+                        question_id=question_id, option_label=label, content=content,
+                        is_correct=label in item["answer"], order=order,
+                    )
+                    for question_id, item in with_options
+                    for order, (label, content) in enumerate(item["options"])
+                ],
+                batch_size=self.chunk_size,
+            )
+
+        with_tags = [(question_id, item) for question_id, item in zip(ids, items) if item["tags"] is not None]
+        if with_tags:
+            names = list(dict.fromkeys(tag for _, item in with_tags for tag in item["tags"]))
+            tag_ids = dict(zip(names, self.lookups.tag_ids(names)))
+            QuestionTagRelation.objects.filter(question_id__in=[question_id for question_id, _ in with_tags]).delete()
+            QuestionTagRelation.objects.bulk_create(
+                [
+                    QuestionTagRelation(question_id=question_id, tag_id=tag_ids[tag], created_by=self.user)
+                    for question_id, item in with_tags
+                    for tag in item["tags"]
+                ],
+                batch_size=self.chunk_size,
+            )
+            tags_changed()
+
+        # 自動機於第一批建立，之後各批共用
+        self.tagger = self.tagger or tagger.AutoTagger()
+        tagged = tagger.tag_questions(ids, self.tagger)[0]
+
+        # bulk 寫入不會觸發 signal，於此更新指紋、答案索引、排程重建試卷包，並記錄新題目的近似重複題
+        bundles.schedule_questions(ids, previous_papers)
+        grading.answer_keys_changed(ids, {subject_id for _, subject_id in previous_papers})
+        duplicates.index_questions(ids)
+        similar = {}
+        for question_id in created:
+            matches = duplicates.similar_to(question_id, limit=MAX_DUPLICATES)
+            if matches:
+                similar[str(question_id)] = [[other_id, round(score, 2)] for other_id, score in matches]
+        return created, len(to_update), similar, tagged
+
+    @staticmethod
+    def natural_key(item):
+        return item["exam_session_id"], item["subject_id"], item["question_number"]
+
+    def natural_ids(self, items):
+        """以 (場次, 科目, 題號) 查詢已存在的題目 id"""
+        items = [item for item in items if not item["id"]]
+        if not items:
+            return {}
+        queryset = Question.objects.filter(
+            exam_session_id__in={item["exam_session_id"] for item in items},
+            subject_id__in={item["subject_id"] for item in items},
+            question_number__in={item["question_number"] for item in items},
+        )
+        return {
+            (session_id, subject_id, number): question_id
+            for question_id, session_id, subject_id, number in queryset.values_list(
+                "id", "exam_session_id", "subject_id", "question_number",
+            )
+        }
+
+    def checkpoint(self, processed, succeeded, errors, created, updated, similar, tagged):
+        job = self.job
+        job.processed_items += processed
+        job.success_items += succeeded
+        job.failed_items += len(errors)
+        for number, error in errors:
+            if self.logged_errors < MAX_LOGGED_ERRORS:
+                job.error_log += f"第 {number} 列：{error}\n"
+            elif self.logged_errors == MAX_LOGGED_ERRORS:
+                job.error_log += "錯誤過多，其餘略過\n"
+            self.logged_errors += 1
+        job.result_summary["created"] += len(created)
+        job.result_summary["updated"] += updated
+        job.result_summary["duplicates"].update(similar)
+        job.result_summary["auto_tags"] += tagged
+        job.save(update_fields=["processed_items", "success_items", "failed_items", "error_log", "result_summary"])
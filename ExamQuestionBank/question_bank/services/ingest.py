@@ -0,0 +1,167 @@
+"""
+歷屆試題 PDF 批次匯入。
+
+目錄結構 (每個葉目錄為一份試卷)：
+    <root>/<考試代碼>/<年度>/<場次>/<科目代碼>/questions.pdf
+    <root>/<考試代碼>/<年度>/<場次>/<科目代碼>/answers.pdf   (可省略)
+
+解析 (parse_paper) 只處理檔案、不存取資料庫，可在行程池中執行；
+寫入 (write_paper) 在主行程以 bulk_create 於單一交易內完成。
+"""
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from exams.catalog import catalog
+from exams.models import ExamSession
+from question_bank.models import Question, QuestionOption
+from . import bundles, duplicates, grading, tagger
+from .pdf_parser import PDFParser
+
+
+QUESTION_FILE = "questions.pdf"
+ANSWER_FILE = "answers.pdf"
+OPTION_LABELS = ["A", "B", "C", "D"]
+# 答案卷中一律給分的題目
+VOIDED_ANSWER = "#"
+# 備註「答 A 或 B 均給分」的單選題，答案存為 "A|B" (選其一即正確)
+ANY_OF = "|"
+NOTE_CLAUSE = re.compile(r"第(\d+)題([^第。;；]*)")
+NOTE_ALTERNATIVES = re.compile(r"答([A-D](?:或[A-D])+)")
+
+BATCH_SIZE = 500
+
+
+class IngestError(Exception):
+    pass
+
+
+def find_papers(root):
+    """依路徑排序回傳所有試卷目錄 (相對於 root 的 posix 路徑)"""
+    root = Path(root)
+    papers = []
+    for directory, _, files in os.walk(root):
+        if QUESTION_FILE in files:
+            papers.append(Path(directory).relative_to(root).as_posix())
+    return sorted(papers)
+
+
+def paper_key(relative_path):
+    """由相對路徑取得 (考試代碼, 年度, 場次, 科目代碼)"""
+    parts = relative_path.split("/")
+    if len(parts) != 4:
+        raise IngestError(f"{relative_path}：目錄需為 <考試代碼>/<年度>/<場次>/<科目代碼>")
+    series_code, year, session_number, subject_code = parts
+    if not (year.isdigit() and session_number.isdigit()):
+        raise IngestError(f"{relative_path}：年度與場次需為數字")
+    return series_code, int(year), int(session_number), subject_code
+
+
+def parse_paper(root, relative_path):
+    """在行程池中執行：解析一份試卷與答案"""
+    directory = Path(root) / relative_path
+    questions = PDFParser.parse_questions(directory / QUESTION_FILE)
+    answers = {"answers": [], "notes": ""}
+    if (directory / ANSWER_FILE).exists():
+        answers = PDFParser.parse_answers(directory / ANSWER_FILE)
+    return {"path": relative_path, "questions": questions, **answers}
+
+
+def resolve_session(relative_path):
+    """取得 (或建立) 試卷對應的考試場次與科目 id"""
+    series_code, year, session_number, subject_code = paper_key(relative_path)
+    series_id = catalog.series_id_for_code(series_code)
+    if series_id is None:
+        raise IngestError(f"{relative_path}：找不到考試代碼 {series_code}")
+    subject_id = catalog.subject_id_for_code(subject_code)
+    if subject_id is None:
+        raise IngestError(f"{relative_path}：找不到科目代碼 {subject_code}")
+    session, _ = ExamSession.objects.get_or_create(
+        exam_series_id=series_id, year=year, session_number=session_number,
+    )
+    return session.pk, subject_id
+
+
+def apply_notes(answers, notes):
+    """
+    依答案卷備註更正答案，例如「第17題一律給分」、「第30題答A或B者均給分」，回傳新的答案列表
+    """
+    answers = list(answers)
+    for number, clause in NOTE_CLAUSE.findall(unicodedata.normalize("NFKC", notes or "").replace(" ", "")):
+        index = int(number) - 1
+        if not 0 <= index < len(answers) or "給分" not in clause:
+            continue
+        if "一律給分" in clause:
+            answers[index] = VOIDED_ANSWER
+            continue
+        alternatives = NOTE_ALTERNATIVES.search(clause)
+        if alternatives:
+            answers[index] = ANY_OF.join(alternatives.group(1).split("或"))
+    return answers
+
+
+def build_question(paper, index, item, answer, session_id, subject_id, status, user, now):
+    return Question(
+        exam_session_id=session_id,
+        subject_id=subject_id,
+        question_number=str(index + 1),
+        content=item["question"],
+        question_type=(
+            "multiple" if len(answer) > 1 and answer != VOIDED_ANSWER and ANY_OF not in answer else "single"
+        ),
+        answer_explanation=grading.VOIDED_EXPLANATION if answer == VOIDED_ANSWER else "",
+        source_file=f"{paper['path']}/{QUESTION_FILE}",
+        status=status,
+        published_at=now if status == "published" else None,
+        created_by=user,
+    )
+
+
+def write_paper(paper, status="draft", user=None, auto_tagger=None):
+    """
+    寫入一份試卷的題目與選項並自動加上標籤 (auto_tagger 可由呼叫端共用)，回傳新增題數。
+    同一場次與科目已有題目時視為已匯入並拋出 IngestError，避免重複匯入。
+    """
+    session_id, subject_id = resolve_session(paper["path"])
+    answers = apply_notes(paper["answers"], paper.get("notes"))
+    now = timezone.now()
+    with transaction.atomic():
+        if Question.objects.filter(exam_session_id=session_id, subject_id=subject_id).exists():
+            raise IngestError(f"{paper['path']}：此場次與科目已有題目")
+
+        Question.objects.bulk_create(
+            [
+                build_question(
+                    paper, index, item, answers[index] if index < len(answers) else "",
+                    session_id, subject_id, status, user, now,
+                )
+                for index, item in enumerate(paper["questions"])
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        # SQL Server 不一定回傳 bulk_create 的 id，改以題號查回
+        ids = dict(
+            Question.objects
+            .filter(exam_session_id=session_id, subject_id=subject_id)
+            .values_list("question_number", "id")
+        )
+        options = []
+        for index, item in enumerate(paper["questions"]):
+            answer = answers[index] if index < len(answers) else ""
+            for order, (label, content) in enumerate(zip(OPTION_LABELS, item["options"])):
+                options.append(QuestionOption(
+                    question_id=ids[str(index + 1)],
+                    option_label=label,
+                    content=content,
+                    is_correct=label in answer,
+                    order=order,
+                ))
+        QuestionOption.objects.bulk_create(options, batch_size=BATCH_SIZE)
+        tagger.tag_questions(ids.values(), auto_tagger)
+        duplicates.index_questions(ids.values())
+        bundles.schedule_build(session_id, subject_id)
+    return len(paper["questions"])
@@ -0,0 +1,361 @@
+"""
+排行榜：以 Redis sorted set 保存每位使用者在各科目、考試別的作答題數、答對題數與正確率。
+
+鍵為 leaderboard:<指標>:<範圍>:<範圍 id>:<期間>：
+- 指標：answered (作答題數)、correct (答對題數)、accuracy (正確率，作答題數達 LEADERBOARD_MIN_ATTEMPTS 才列入)
+- 範圍：subject (題目的科目)、series (題目場次的考試別)
+- 期間：all (全部) 或 ISO 週 (例如 2026-W42)；每週的鍵於該週結束 LEADERBOARD_WEEKS_KEPT 週後自動過期
+
+作答後 (grading.record_attempts 於交易提交時) 遞增更新，不彙總 QuestionAttempt；
+排名以 ZREVRANK 查詢 (O(log n))。Redis 資料遺失或與作答紀錄不一致時以 rebuild_leaderboards 重建
+(包含已封存的作答紀錄)。
+
+未設定 REDIS_URL 時使用行程內的 MemorySortedSets (僅供開發與測試，各 worker 不共用)。
+"""
+import bisect
+import fnmatch
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from exams.catalog import catalog
+from question_bank.models import Question, QuestionAttempt
+from . import archive
+
+
+PREFIX = "leaderboard"
+ANSWERED = "answered"
+CORRECT = "correct"
+ACCURACY = "accuracy"
+METRICS = [ACCURACY, ANSWERED]
+SUBJECT = "subject"
+SERIES = "series"
+SCOPES = [SUBJECT, SERIES]
+ALL = "all"
+WEEK = "week"
+WINDOWS = [ALL, WEEK]
+
+WRITE_BATCH = 1000
+
+
+class MemorySortedSets:
+    """
+    Redis sorted set 指令的行程內替代 (只實作排行榜用到的指令，回傳值與 redis-py 相同)
+    """
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.scores = {}
+        # 依 (分數, 成員) 遞增排序，與 Redis 相同
+        self.ordered = {}
+        self.expires = {}
+
+    @staticmethod
+    def member(value):
+        return value if isinstance(value, bytes) else str(value).encode()
+
+    def expired(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.delete(key)
+
+    def zadd(self, key, mapping):
+        with self.lock:
+            self.expired(key)
+            scores = self.scores.setdefault(key, {})
+            ordered = self.ordered.setdefault(key, [])
+            added = 0
+            for member, score in mapping.items():
+                member = self.member(member)
+                current = scores.get(member)
+                if current is None:
+                    added += 1
+                else:
+                    del ordered[bisect.bisect_left(ordered, (current, member))]
+                scores[member] = float(score)
+                bisect.insort(ordered, (float(score), member))
+            return added
+
+    def zincrby(self, key, amount, member):
+        with self.lock:
+            score = (self.zscore(key, member) or 0.0) + amount
+            self.zadd(key, {member: score})
+            return score
+
+    def zscore(self, key, member):
+        with self.lock:
+            self.expired(key)
+            return self.scores.get(key, {}).get(self.member(member))
+
+    def zrevrank(self, key, member):
+        with self.lock:
+            score = self.zscore(key, member)
+            if score is None:
+                return None
+            ordered = self.ordered[key]
+            return len(ordered) - 1 - bisect.bisect_left(ordered, (score, self.member(member)))
+
+    def zrevrange(self, key, start, end, withscores=False):
+        with self.lock:
+            self.expired(key)
+            ordered = self.ordered.get(key, [])
+            stop = len(ordered) if end == -1 else end + 1
+            rows = [(member, score) for score, member in reversed(ordered)][start:stop]
+            return rows if withscores else [member for member, _ in rows]
+
+    def zcard(self, key):
+        with self.lock:
+            self.expired(key)
+            return len(self.scores.get(key, {}))
+
+    def expireat(self, key, when):
+        with self.lock:
+            if key not in self.scores:
+                return False
+            self.expires[key] = when.timestamp() if isinstance(when, datetime) else when
+            return True
+
+    def rename(self, source, destination):
+        with self.lock:
+            self.delete(destination)
+            self.scores[destination] = self.scores.pop(source)
+            self.ordered[destination] = self.ordered.pop(source)
+            if source in self.expires:
+                self.expires[destination] = self.expires.pop(source)
+            return True
+
+    def delete(self, *keys):
+        with self.lock:
+            deleted = 0
+            for key in keys:
+                deleted += self.scores.pop(key, None) is not None
+                self.ordered.pop(key, None)
+                self.expires.pop(key, None)
+            return deleted
+
+    def scan_iter(self, match="*"):
+        with self.lock:
+            keys = list(self.scores)
+        return [key.encode() for key in keys if fnmatch.fnmatchcase(key, match)]
+
+    def flushall(self):
+        with self.lock:
+            self.scores.clear()
+            self.ordered.clear()
+            self.expires.clear()
+
+    def pipeline(self, transaction=True):
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, store):
+        self.store = store
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.store, name), args, kwargs))
+            return self
+        return queue
+
+    def execute(self):
+        commands, self.commands = self.commands, []
+        with self.store.lock:
+            return [command(*args, **kwargs) for command, args, kwargs in commands]
+
+
+_memory = MemorySortedSets()
+
+
+def client():
+    """共用快取為 Redis 時使用同一個連線，否則使用行程內的替代"""
+    if settings.CACHES["default"]["BACKEND"].startswith("django_redis."):
+        from django_redis import get_redis_connection
+
+        return get_redis_connection("default")
+    return _memory
+
+
+def board_key(metric, scope, scope_id, window):
+    return f"{PREFIX}:{metric}:{scope}:{scope_id}:{window}"
+
+
+def week_label(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def week_windows(now=None):
+    """[(期間, 開始時間, 結束時間, 過期時間)]：本週與保留的過去各週"""
+    today = timezone.localdate(now)
+    monday = today - timedelta(days=today.weekday())
+    windows = []
+    for weeks_ago in range(settings.LEADERBOARD_WEEKS_KEPT + 1):
+        start = monday - timedelta(weeks=weeks_ago)
+        started_at = timezone.make_aware(datetime.combine(start, datetime.min.time()))
+        ended_at = timezone.make_aware(datetime.combine(start + timedelta(weeks=1), datetime.min.time()))
+        expires_at = ended_at + timedelta(weeks=settings.LEADERBOARD_WEEKS_KEPT)
+        windows.append((week_label(start), started_at, ended_at, expires_at))
+    return windows
+
+
+def scopes_for(subject_id, session_id):
+    scopes = [(SUBJECT, subject_id)]
+    session = catalog.session(session_id)
+    if session is not None:
+        scopes.append((SERIES, session["exam_series_id"]))
+    return scopes
+
+
+def accuracy(answered, correct):
+    return correct / answered if answered >= settings.LEADERBOARD_MIN_ATTEMPTS else None
+
+
+def record(user_id, attempts, now=None):
+    """
+    遞增更新排行榜。attempts 為 [(科目 id, 場次 id, 是否正確)]；
+    兩次往返：先遞增作答與答對題數，再以新的累計值更新正確率
+    """
+    counts = defaultdict(lambda: [0, 0])
+    for subject_id, session_id, correct in attempts:
+        for scope in scopes_for(subject_id, session_id):
+            counts[scope][0] += 1
+            counts[scope][1] += bool(correct)
+    if not counts:
+        return
+
+    week, _, _, expires_at = week_windows(now)[0]
+    windows = [(ALL, None), (week, expires_at)]
+    redis = client()
+    pipe = redis.pipeline(transaction=False)
+    boards = []
+    for (scope, scope_id), (answered, correct) in counts.items():
+        for window, expires in windows:
+            pipe.zincrby(board_key(ANSWERED, scope, scope_id, window), answered, user_id)
+            pipe.zincrby(board_key(CORRECT, scope, scope_id, window), correct, user_id)
+            if expires is not None:
+                pipe.expireat(board_key(ANSWERED, scope, scope_id, window), expires)
+                pipe.expireat(board_key(CORRECT, scope, scope_id, window), expires)
+            boards.append((scope, scope_id, window, expires))
+    results = iter(pipe.execute())
+
+    pipe = redis.pipeline(transaction=False)
+    for scope, scope_id, window, expires in boards:
+        rate = accuracy(next(results), next(results))
+        if expires is not None:
+            next(results), next(results)
+        if rate is None:
+            continue
+        key = board_key(ACCURACY, scope, scope_id, window)
+        pipe.zadd(key, {user_id: rate})
+        if expires is not None:
+            pipe.expireat(key, expires)
+    pipe.execute()
+
+
+def board(metric, scope, scope_id, window, user_id=None, limit=20):
+    """
+    回傳 (前 limit 名 [(使用者 id, 分數)], 總人數, 使用者的 (名次, 分數) 或 None)；名次從 1 開始
+    """
+    key = board_key(metric, scope, scope_id, week_windows()[0][0] if window == WEEK else ALL)
+    pipe = client().pipeline(transaction=False)
+    pipe.zrevrange(key, 0, limit - 1, withscores=True)
+    pipe.zcard(key)
+    if user_id is not None:
+        pipe.zrevrank(key, user_id)
+        pipe.zscore(key, user_id)
+    results = pipe.execute()
+    top = [(int(member), score) for member, score in results[0]]
+    mine = None
+    if user_id is not None and results[2] is not None:
+        mine = (results[2] + 1, results[3])
+    return top, results[1], mine
+
+
+def history(since=None, until=None):
+    """
+    由作答紀錄彙總 {(範圍, 範圍 id): {使用者 id: [作答題數, 答對題數]}}，
+    包含已封存 (archive_history) 的作答紀錄
+    """
+    # 不評分的作答 (is_correct 為 null) 不列入排行榜
+    attempts = QuestionAttempt.objects.filter(is_correct__isnull=False)
+    if since is not None:
+        attempts = attempts.filter(created_at__gte=since, created_at__lt=until)
+    totals = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+
+    def add(user_id, subject_id, session_id, answered, correct):
+        for scope in scopes_for(subject_id, session_id):
+            total = totals[scope][user_id]
+            total[0] += answered
+            total[1] += correct
+
+    for row in (
+        attempts.order_by()
+        .values("user_id", "question__subject_id", "question__exam_session_id")
+        .annotate(answered=Count("id"), correct=Count("id", filter=Q(is_correct=True)))
+    ):
+        add(row["user_id"], row["question__subject_id"], row["question__exam_session_id"], row["answered"], row["correct"])
+
+    # 封存檔只有題目 id，彙總後再分批查詢題目的科目與場次
+    archived = defaultdict(lambda: [0, 0])
+    for user_id, row in archive.archived_rows("question_attempt", since, until):
+        if row["is_correct"] is None:
+            continue
+        total = archived[row["question_id"], user_id]
+        total[0] += 1
+        total[1] += row["is_correct"]
+    question_ids = list({question_id for question_id, _ in archived})
+    questions = {}
+    for start in range(0, len(question_ids), archive.DELETE_BATCH_SIZE):
+        questions.update(
+            (question_id, (subject_id, session_id))
+            for question_id, subject_id, session_id in Question.objects.filter(
+                id__in=question_ids[start:start + archive.DELETE_BATCH_SIZE],
+            ).values_list("id", "subject_id", "exam_session_id")
+        )
+    for (question_id, user_id), (answered, correct) in archived.items():
+        if question_id in questions:
+            add(user_id, *questions[question_id], answered, correct)
+    return totals
+
+
+def rebuild(now=None):
+    """
+    由作答紀錄重建所有排行榜 (全部期間與保留的各週)，逐一寫入暫存鍵後 RENAME 取代，
+    並刪除不再有資料的排行榜。重建期間的作答可能被覆蓋，請於低流量時執行。回傳寫入的排行榜數
+    """
+    redis = client()
+    windows = [(ALL, None, None, None)]
+    windows.extend(week_windows(now))
+    written = set()
+    for window, since, until, expires_at in windows:
+        for (scope, scope_id), users in history(since, until).items():
+            rates = {user_id: accuracy(*total) for user_id, total in users.items()}
+            for metric, scores in (
+                (ANSWERED, {user_id: total[0] for user_id, total in users.items()}),
+                (CORRECT, {user_id: total[1] for user_id, total in users.items()}),
+                (ACCURACY, {user_id: rate for user_id, rate in rates.items() if rate is not None}),
+            ):
+                if not scores:
+                    continue
+                key = board_key(metric, scope, scope_id, window)
+                temporary = f"{key}:rebuild"
+                redis.delete(temporary)
+                items = list(scores.items())
+                for start in range(0, len(items), WRITE_BATCH):
+                    redis.zadd(temporary, dict(items[start:start + WRITE_BATCH]))
+                redis.rename(temporary, key)
+                if expires_at is not None:
+                    redis.expireat(key, expires_at)
+                written.add(key)
+
+    keys = (key.decode() if isinstance(key, bytes) else key for key in redis.scan_iter(match=f"{PREFIX}:*"))
+    stale = [key for key in keys if key not in written]
+    if stale:
+        redis.delete(*stale)
+    return len(written)
@@ -0,0 +1,137 @@
+"""
+預先產生的題目 JSON (QuestionPayload)。
+
+題目的詳細資料與列表 JSON 以序列化器產生一次後存成位元組片段 (不含前後大括號)，
+回應時直接串接，不再經過 DRF 序列化；片段依 (題目 id, version, 更新時間) 判斷是否過期，
+過期或不存在時重新產生並寫回。
+
+作答次數等隨時變動的欄位，以及由考試目錄取得的場次與科目名稱，不存入片段，回應時另外補上。
+選項、標籤或建立者名稱異動不會改變題目的更新時間，由 signal 於交易提交時 (或 bulk 寫入端呼叫 invalidate) 刪除片段。
+"""
+import json
+import threading
+
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from exams.catalog import catalog
+from question_bank.models import Question, QuestionPayload
+from question_bank.serializers import QuestionDetailSerializer, QuestionListSerializer
+
+
+DETAIL = "detail"
+SUMMARY = "summary"
+# 回應時才補上的欄位
+DYNAMIC_FIELDS = {
+    DETAIL: ["exam_session", "subject", "view_count", "attempt_count", "correct_count", "accuracy_rate"],
+    SUMMARY: ["exam_session_name", "subject_name", "view_count", "attempt_count", "accuracy_rate"],
+}
+_renderer = JSONRenderer()
+_pending = threading.local()
+
+
+def render(data, exclude=()):
+    """以 DRF 的 JSONRenderer 輸出 (與一般回應相同格式)，去掉前後大括號"""
+    return _renderer.render({key: value for key, value in data.items() if key not in exclude})[1:-1]
+
+
+def render_payloads(question_ids):
+    """以序列化器產生題目的片段並寫回，回傳 {題目 id: QuestionPayload}"""
+    questions = list(
+        Question.objects.filter(id__in=question_ids)
+        .select_related("created_by")
+        .prefetch_related("options", "tag_relations__tag")
+    )
+    payloads = {
+        question.id: QuestionPayload(
+            question_id=question.id,
+            version=question.version,
+            source_updated_at=question.updated_at,
+            detail=render(QuestionDetailSerializer(question).data, DYNAMIC_FIELDS[DETAIL]),
+            summary=render(QuestionListSerializer(question).data, DYNAMIC_FIELDS[SUMMARY]),
+        )
+        for question in questions
+    }
+    with transaction.atomic():
+        QuestionPayload.objects.filter(question_id__in=list(payloads)).delete()
+        # 同時有其他請求產生同一題時，以先寫入的為準
+        QuestionPayload.objects.bulk_create(payloads.values(), ignore_conflicts=True)
+    return payloads
+
+
+def dynamic_fields(question, kind):
+    session = catalog.session_name(question.exam_session_id)
+    subject = catalog.subject_name(question.subject_id)
+    values = {
+        "exam_session": session,
+        "subject": subject,
+        "exam_session_name": session,
+        "subject_name": subject,
+        "view_count": question.view_count,
+        "attempt_count": question.attempt_count,
+        "correct_count": question.correct_count,
+        "accuracy_rate": question.accuracy_rate,
+    }
+    return json.dumps(
+        {field: values[field] for field in DYNAMIC_FIELDS[kind]}, ensure_ascii=False, separators=(",", ":"),
+    )[1:-1].encode()
+
+
+def fragments(questions, kind):
+    """題目 (依傳入順序) 的完整 JSON 物件位元組"""
+    stored = {
+        question_id: (version, updated_at, bytes(data))
+        for question_id, version, updated_at, data in QuestionPayload.objects.filter(
+            question_id__in=[question.id for question in questions],
+        ).values_list("question_id", "version", "source_updated_at", kind)
+    }
+    static = {}
+    stale = []
+    for question in questions:
+        payload = stored.get(question.id)
+        if payload is not None and payload[0] == question.version and payload[1] == question.updated_at:
+            static[question.id] = payload[2]
+        else:
+            stale.append(question.id)
+    if stale:
+        for question_id, payload in render_payloads(stale).items():
+            static[question_id] = bytes(getattr(payload, kind))
+    return [b"{" + static[question.id] + b"," + dynamic_fields(question, kind) + b"}" for question in questions]
+
+
+def render_list(questions, kind=SUMMARY):
+    return b"[" + b",".join(fragments(questions, kind)) + b"]"
+
+
+def invalidate(question_ids):
+    """刪除題目的片段 (選項、標籤等不影響題目更新時間的異動後呼叫)"""
+    QuestionPayload.objects.filter(question_id__in=list(question_ids)).delete()
+
+
+def invalidate_tag(tag_id):
+    """標籤名稱變更或刪除時，刪除有此標籤的題目的片段"""
+    QuestionPayload.objects.filter(question__tag_relations__tag_id=tag_id).delete()
+
+
+def invalidate_created_by(user_id):
+    """使用者名稱可能變更時，刪除其建立的題目的片段"""
+    QuestionPayload.objects.filter(question__created_by_id=user_id).delete()
+
+
+def schedule_invalidate_created_by(user_id):
+    transaction.on_commit(lambda: invalidate_created_by(user_id))
+
+
+def schedule_invalidate(question_id):
+    """交易提交後刪除題目的片段 (同一交易中多次異動只刪除一次)"""
+    if not hasattr(_pending, "ids"):
+        _pending.ids = set()
+    _pending.ids.add(question_id)
+    transaction.on_commit(_flush)
+
+
+def _flush():
+    question_ids = _pending.ids
+    _pending.ids = set()
+    if question_ids:
+        invalidate(question_ids)
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .pdf_parser import PDFParser
+
+
+PARSERS = {
+    "questions": PDFParser.parse_questions,
+    "answers": PDFParser.parse_answers,
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    PDF 解析專用的執行緒 / 行程池，大小固定為 PDF_EXECUTOR_WORKERS，不佔用事件迴圈與一般請求的執行緒。
+
+    PDF_EXECUTOR 為 "process" 時可讓多份 PDF 同時使用多個 CPU 核心，
+    但解析階段的 observe_phase 指標會記錄在子行程中，不會出現在 /metrics。
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                workers = settings.PDF_EXECUTOR_WORKERS
+                if settings.PDF_EXECUTOR == "process":
+                    _executor = ProcessPoolExecutor(max_workers=workers)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-parser")
+    return _executor
+
+
+def parse_file(kind, path):
+    """在 executor 中執行：直接由暫存檔路徑解析 (只傳遞路徑，行程池不需複製檔案內容)"""
+    return PARSERS[kind](path)
+
+
+async def run_parser(kind, path):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), parse_file, kind, path)
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
@@ -1,9 +1,14 @@
+import contextlib
 import enum
-import re
 import io
+import mmap
+import os
+import re
 
 import pdfplumber
 
+from monitoring.metrics import observe_phase
+
 
 class Flag(enum.Enum):
     BEGIN = -2
@@ -14,12 +19,41 @@ class Flag(enum.Enum):
     OPTION_4 = 3
 
 
+@contextlib.contextmanager
+def pdf_source(file):
+    """
+    取得可交給 pdfplumber.open 的來源而不複製檔案內容：
+    路徑直接使用；TemporaryUploadedFile 使用暫存檔路徑；
+    其他有 fileno 的檔案以 mmap 讀取；記憶體中的上傳檔 (BytesIO) 直接使用。
+    """
+    if isinstance(file, (str, os.PathLike)):
+        yield file
+        return
+    if hasattr(file, "temporary_file_path"):
+        yield file.temporary_file_path()
+        return
+    try:
+        fileno = file.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fileno = None
+    if fileno is not None and os.fstat(fileno).st_size:
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as data:
+            yield data
+        return
+    file.seek(0)
+    yield file
+
+
 class PDFParser:
 
     @staticmethod
     def parse_questions(file):
         questions = []
-        with pdfplumber.open(io.BytesIO(file.read())) as pdf:
+        # 讀取 (開檔與取出文字座標) 與切分題目分開計時
+        with pdf_source(file) as source, pdfplumber.open(source) as pdf, observe_phase("pdf_questions.read"):
+            pages = [page.extract_words() for page in pdf.pages]
+
+        with observe_phase("pdf_questions.extract"):
             temp = {
                 "question": "",
                 "options": [
@@ -32,8 +66,8 @@ class PDFParser:
             
             flag = Flag.BEGIN
 
-            for index, page in enumerate(pdf.pages):
-                for word in page.extract_words():
+            for index, words in enumerate(pages):
+                for word in words:
                     if index == 0:
                         if word["bottom"] < 205: # \ue12b禁止使用電子計算器。 此行以下 (只有在第一頁)
                             continue
@@ -75,15 +109,100 @@ class PDFParser:
             questions.append(temp)
         return questions
     
-    def parse_answers(file):
-        answers = []
-        with pdfplumber.open(io.BytesIO(file.read())) as pdf:
-            for page in pdf.pages:
-                for table in page.extract_tables():
-                    answers.extend(list(filter(lambda a: a, table[1][1:])))
-            notes = "".join(re.findall(r"備 註： .*", page.extract_text()))
-        
+    @staticmethod
+    def parse_answers(file, engine="words"):
+        """
+        解析答案 PDF。engine 為 "words" 時以文字座標找出「題號 / 答案」列 (比表格偵測快得多)，
+        找不到答案列時改用 "tables" (pdfplumber 表格偵測)。
+        """
+        with pdf_source(file) as source, pdfplumber.open(source) as pdf:
+            if engine == "words":
+                with observe_phase("pdf_answers.words"):
+                    answers, notes = AnswerSheet.from_words(pdf.pages)
+                if answers:
+                    return {"notes": notes, "answers": answers}
+            with observe_phase("pdf_answers.tables"):
+                answers, notes = AnswerSheet.from_tables(pdf.pages)
+
         return {
             "notes": notes,
             "answers": answers
-        }
\ No newline at end of file
+        }
+
+
+class AnswerSheet:
+    """
+    答案 PDF 的兩種解析方式，回傳 (答案清單, 備註)
+    """
+    NUMBER_LABEL = "題號"
+    ANSWER_LABEL = "答案"
+    NOTES_PATTERN = re.compile(r"備 註： .*")
+    # 同一列文字 top 座標的容許誤差 (pt)
+    ROW_TOLERANCE = 3
+
+    @classmethod
+    def from_words(cls, pages):
+        answers = []
+        notes = []
+        for page in pages:
+            columns = None
+            for row in cls.rows(page.extract_words()):
+                notes.extend(cls.NOTES_PATTERN.findall(" ".join(word["text"] for word in row)))
+
+                cells = cls.split_label(row, cls.NUMBER_LABEL)
+                if cells is not None:
+                    columns = [(word["x0"] + word["x1"]) / 2 for word in cells]
+                    continue
+                cells = cls.split_label(row, cls.ANSWER_LABEL)
+                if cells is not None:
+                    answers.extend(cls.bucket(cells, columns))
+                    columns = None
+        return answers, "".join(notes)
+
+    @classmethod
+    def from_tables(cls, pages):
+        answers = []
+        notes = []
+        for page in pages:
+            for table in page.extract_tables():
+                answers.extend(list(filter(lambda a: a, table[1][1:])))
+            notes.extend(cls.NOTES_PATTERN.findall(page.extract_text()))
+        return answers, "".join(notes)
+
+    @classmethod
+    def rows(cls, words):
+        """依 top 座標將文字分列，每列由左到右排序"""
+        rows = []
+        for word in sorted(words, key=lambda word: (word["top"], word["x0"])):
+            if rows and word["top"] - rows[-1][0]["top"] <= cls.ROW_TOLERANCE:
+                rows[-1].append(word)
+            else:
+                rows.append([word])
+        return [sorted(row, key=lambda word: word["x0"]) for row in rows]
+
+    @staticmethod
+    def split_label(row, label):
+        """列開頭為 label (可能被空白拆成多個字) 時回傳其後的儲存格文字，否則回傳 None"""
+        text = ""
+        for index, word in enumerate(row):
+            text += word["text"]
+            if text == label:
+                return row[index + 1:]
+            if not label.startswith(text):
+                return None
+        return None
+
+    @staticmethod
+    def bucket(cells, columns):
+        """
+        將答案文字歸入最接近的題號欄 (同一格被拆開的文字會合併)。
+        沒有題號列，或題號欄數比答案文字少 (題號文字相連被合成一個字) 時，每個字各為一格。
+        """
+        if not columns or len(columns) < len(cells):
+            return [word["text"] for word in cells]
+        values = [""] * len(columns)
+        for word in cells:
+            center = (word["x0"] + word["x1"]) / 2
+            index = min(range(len(columns)), key=lambda i: abs(columns[i] - center))
+            values[index] += word["text"]
+        return [value for value in values if value]
@@ -0,0 +1,247 @@
+"""
+相關題目推薦 (TF-IDF 餘弦相似度)。
+
+每題的特徵為題目與選項中的 CJK 雙字詞與英數詞，以及題目的標籤 (權重 TAG_WEIGHT 倍)。
+詞項計數存於 QuestionTermVector，每次執行只重新斷詞內容 (含選項與標籤) 雜湊有變動的題目；
+IDF 由所有題目的計數重新計算，以倒排索引計算稀疏向量內積，每題保留前 k 名 (排除同一場次) 於 RelatedQuestion。
+
+增量更新時重算的題目：內容變動的題目、列表中含有變動或移除題目的題目，
+以及變動題目的相近題目中，相似度高於其目前第 k 名的題目。其餘題目的列表沿用上次的 IDF，
+需定期以 full=True 全部重算。
+
+只計算已發布、公開且未刪除的題目。
+"""
+import hashlib
+import heapq
+import math
+import re
+import struct
+import time
+import unicodedata
+import zlib
+from array import array
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from question_bank.models import Question, QuestionOption, QuestionTagRelation, QuestionTermVector, RelatedQuestion
+
+
+TOP_K = 10
+# 出現在超過此比例題目中的詞項 (例如「下列」「何者」) 對相似度幫助不大，不列入倒排索引；
+# 題庫較小時至少保留出現在 MIN_MAX_DF 題以內的詞項
+MAX_DF_RATIO = 0.05
+MIN_MAX_DF = 100
+# 查詢時用於找候選的詞項數，以及重新計算相似度的候選數 (k 的倍數)
+QUERY_TERMS = 20
+RESCORE_FACTOR = 5
+# 增量更新時，檢查變動題目的前幾名相近題目是否需要重算
+AFFECTED_CANDIDATES = 100
+TAG_WEIGHT = 2.0
+BATCH_SIZE = 2000
+# 詞項雜湊只用 31 位元，最高位元表示標籤 (其餘位元為標籤 id)
+TAG_BIT = 1 << 31
+
+_TOKEN = re.compile(r"[\u3400-\u9fff\uf900-\ufaff]+|[a-z0-9]+")
+
+
+def tokens(text):
+    """CJK 連續字元切成雙字詞，英數字為一個詞"""
+    terms = []
+    for run in _TOKEN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if run.isascii() or len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def term_counts(text, tag_ids):
+    counts = Counter(zlib.crc32(term.encode()) & (TAG_BIT - 1) for term in tokens(text))
+    counts.update(TAG_BIT | tag_id for tag_id in tag_ids)
+    return counts
+
+
+def pack(counts):
+    items = sorted(counts.items())
+    return struct.pack(f"<{len(items) * 2}I", *(value for item in items for value in item))
+
+
+def unpack(data):
+    values = struct.unpack(f"<{len(data) // 4}I", data)
+    return values[0::2], values[1::2]
+
+
+def candidates():
+    return Question.objects.filter(status="published", is_public=True, deleted_at__isnull=True)
+
+
+def scan():
+    """
+    重新斷詞內容有變動的題目並更新 QuestionTermVector，移除已不在範圍內的題目。
+    回傳 (變動的題目 id, 移除的題目 id)
+    """
+    stored = dict(QuestionTermVector.objects.values_list("question_id", "content_hash"))
+    question_ids = list(candidates().order_by("id").values_list("id", flat=True))
+    changed = []
+    for start in range(0, len(question_ids), BATCH_SIZE):
+        batch = question_ids[start:start + BATCH_SIZE]
+        options = defaultdict(list)
+        for question_id, content in (
+            QuestionOption.objects.filter(question_id__in=batch).order_by("question_id", "order")
+            .values_list("question_id", "content")
+        ):
+            options[question_id].append(content)
+        tags = defaultdict(list)
+        for question_id, tag_id in QuestionTagRelation.objects.filter(question_id__in=batch).values_list(
+            "question_id", "tag_id",
+        ):
+            tags[question_id].append(tag_id)
+
+        vectors = []
+        for question_id, content, session_id in Question.objects.filter(id__in=batch).values_list(
+            "id", "content", "exam_session_id",
+        ):
+            text = "\n".join([content, *options[question_id]])
+            tag_ids = sorted(tags[question_id])
+            # 場次變動也需重算 (相關題目排除同一場次)
+            content_hash = hashlib.sha256(f"{session_id}\x1f{text}\x1f{tag_ids}".encode()).hexdigest()
+            if stored.get(question_id) == content_hash:
+                continue
+            vectors.append(QuestionTermVector(
+                question_id=question_id, content_hash=content_hash, terms=pack(term_counts(text, tag_ids)),
+            ))
+        if vectors:
+            with transaction.atomic():
+                QuestionTermVector.objects.filter(question_id__in=[vector.question_id for vector in vectors]).delete()
+                QuestionTermVector.objects.bulk_create(vectors)
+            changed.extend(vector.question_id for vector in vectors)
+
+    removed = list(set(stored).difference(question_ids))
+    for start in range(0, len(removed), BATCH_SIZE):
+        batch = removed[start:start + BATCH_SIZE]
+        with transaction.atomic():
+            QuestionTermVector.objects.filter(question_id__in=batch).delete()
+            RelatedQuestion.objects.filter(question_id__in=batch).delete()
+    return changed, removed
+
+
+class TfidfIndex:
+    """
+    L2 正規化的 TF-IDF 向量 (1 + log tf) 與倒排索引 (每個詞項一組 id / 權重陣列)。
+
+    查詢時只以權重最高的 QUERY_TERMS 個詞項 (通常是較少見的詞，倒排列表較短) 找出候選，
+    再以完整向量的內積重新計算前幾名候選的相似度。
+    """
+    def __init__(self, vectors, sessions):
+        self.sessions = sessions
+        count = len(vectors)
+        df = Counter()
+        for terms, _ in vectors.values():
+            df.update(terms)
+        idf = {term: math.log((1 + count) / (1 + frequency)) + 1 for term, frequency in df.items()}
+        max_df = max(MIN_MAX_DF, int(count * MAX_DF_RATIO))
+
+        self.vectors = {}
+        self.postings = {}
+        for question_id, (terms, counts) in vectors.items():
+            weights = [
+                (1 + math.log(tf)) * idf[term] * (TAG_WEIGHT if term & TAG_BIT else 1)
+                for term, tf in zip(terms, counts)
+            ]
+            norm = math.sqrt(sum(weight * weight for weight in weights)) or 1
+            kept = [(term, weight / norm) for term, weight in zip(terms, weights) if 1 < df[term] <= max_df]
+            self.vectors[question_id] = (array("I", [term for term, _ in kept]), array("f", [weight for _, weight in kept]))
+            for term, weight in kept:
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = (array("I"), array("f"))
+                posting[0].append(question_id)
+                posting[1].append(weight)
+
+    def neighbors(self, question_id, k):
+        """其他場次中最相近的 k 題 [(相似度, 題目 id)]"""
+        terms, weights = self.vectors.get(question_id, ((), ()))
+        query = dict(zip(terms, weights))
+        partial = defaultdict(float)
+        for term, weight in heapq.nlargest(QUERY_TERMS, query.items(), key=lambda item: item[1]):
+            ids, other_weights = self.postings[term]
+            for other, other_weight in zip(ids, other_weights):
+                partial[other] += weight * other_weight
+
+        session_id = self.sessions[question_id]
+        shortlist = heapq.nlargest(
+            k * RESCORE_FACTOR,
+            (other for other in partial if self.sessions[other] != session_id),
+            key=partial.__getitem__,
+        )
+        scored = []
+        for other in shortlist:
+            other_terms, other_weights = self.vectors[other]
+            scored.append((sum(weight * query.get(term, 0.0) for term, weight in zip(other_terms, other_weights)), other))
+        return heapq.nlargest(k, scored)
+
+
+def update_related(full=False, top_k=TOP_K):
+    """更新相關題目，回傳統計資料"""
+    started = time.perf_counter()
+    changed, removed = scan()
+    if not (full or changed or removed):
+        seconds = time.perf_counter() - started
+        return {
+            "questions": QuestionTermVector.objects.count(), "changed": 0, "removed": 0, "recomputed": 0,
+            "full": False, "index_seconds": seconds, "seconds": seconds,
+        }
+    sessions = dict(candidates().values_list("id", "exam_session_id"))
+    vectors = {
+        question_id: unpack(bytes(terms))
+        for question_id, terms in QuestionTermVector.objects.values_list("question_id", "terms").iterator(
+            chunk_size=BATCH_SIZE,
+        )
+        if question_id in sessions
+    }
+    index = TfidfIndex(vectors, sessions)
+    scanned = time.perf_counter()
+
+    # 變動題目過多時直接全部重算
+    full = full or len(changed) * 2 > len(vectors)
+    if full:
+        targets = set(vectors)
+    else:
+        targets = set(changed)
+        touched = list(set(changed).union(removed))
+        for start in range(0, len(touched), BATCH_SIZE):
+            targets.update(
+                RelatedQuestion.objects.filter(related_id__in=touched[start:start + BATCH_SIZE])
+                .values_list("question_id", flat=True)
+            )
+        # 列表未滿 k 名的題目門檻為 0
+        kth_scores = dict(RelatedQuestion.objects.filter(rank=top_k - 1).values_list("question_id", "score"))
+        for question_id in changed:
+            targets.update(
+                other for score, other in index.neighbors(question_id, AFFECTED_CANDIDATES)
+                if score > kth_scores.get(other, 0)
+            )
+        targets.intersection_update(vectors)
+
+    targets = sorted(targets)
+    for start in range(0, len(targets), BATCH_SIZE):
+        batch = targets[start:start + BATCH_SIZE]
+        rows = [
+            RelatedQuestion(question_id=question_id, related_id=other, rank=rank, score=round(min(score, 1.0), 4))
+            for question_id in batch
+            for rank, (score, other) in enumerate(index.neighbors(question_id, top_k))
+        ]
+        with transaction.atomic():
+            RelatedQuestion.objects.filter(question_id__in=batch).delete()
+            RelatedQuestion.objects.bulk_create(rows, batch_size=1000)
+
+    return {
+        "questions": len(vectors),
+        "changed": len(changed),
+        "removed": len(removed),
+        "recomputed": len(targets),
+        "full": full,
+        "index_seconds": scanned - started,
+        "seconds": time.perf_counter() - started,
+    }
@@ -0,0 +1,125 @@
+"""
+標籤自動完成：每個 worker 行程內的標籤前綴索引。
+
+標籤依使用次數 (QuestionTagRelation 數) 排名，名稱 (NFKC、小寫) 排序後存成陣列，
+以 bisect 找出前綴範圍，再取範圍內排名最前的幾個；長度不超過 PRECOMPUTED_PREFIX 的前綴
+(範圍可能涵蓋大部分標籤) 於載入時預先算好前 MAX_LIMIT 名。
+
+標籤或標籤關聯異動後更新版本戳記 "tags" (exams.versioning)，
+與考試目錄相同，最多每 CATALOG_VERSION_CHECK_INTERVAL 秒檢查一次，版本不同時重新載入。
+signal 不涵蓋的 bulk 寫入需自行呼叫 tags_changed()。
+"""
+import heapq
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from exams.versioning import bump_version, get_version
+from monitoring.metrics import record_cache
+from question_bank.models import QuestionTag
+
+
+TAGS = "tags"
+MAX_LIMIT = 50
+PRECOMPUTED_PREFIX = 2
+_END = chr(0x10FFFF)
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text).lower().strip()
+
+
+class TagSnapshot:
+    """
+    某一版本的標籤索引 (載入後不再修改，可在執行緒間共用)。
+    tags 依使用次數由多到少排列，以索引位置作為排名。
+    """
+    def __init__(self, version, tags):
+        self.version = version
+        self.tags = sorted(tags, key=lambda row: (-row["usage_count"], row["name"]))
+        entries = sorted((normalize(row["name"]), rank) for rank, row in enumerate(self.tags))
+        self.keys = [key for key, _ in entries]
+        self.ranks = [rank for _, rank in entries]
+
+        top = defaultdict(list)
+        for rank, row in enumerate(self.tags):
+            name = normalize(row["name"])
+            for length in range(min(len(name), PRECOMPUTED_PREFIX) + 1):
+                ranks = top[name[:length]]
+                # 依排名依序加入，已滿的前綴不需再加
+                if len(ranks) < MAX_LIMIT:
+                    ranks.append(rank)
+        self.top = dict(top)
+
+    def search(self, prefix, category=None, limit=10):
+        prefix = normalize(prefix)
+        limit = min(limit, MAX_LIMIT)
+        if category is None and len(prefix) <= PRECOMPUTED_PREFIX:
+            ranks = self.top.get(prefix, [])[:limit]
+        else:
+            start = bisect_left(self.keys, prefix)
+            end = bisect_left(self.keys, prefix + _END, start)
+            ranks = self.ranks[start:end]
+            if category is not None:
+                ranks = [rank for rank in ranks if self.tags[rank]["category"] == category]
+            ranks = heapq.nsmallest(limit, ranks)
+        return [self.tags[rank] for rank in ranks]
+
+
+class TagIndex:
+    """
+    每個 worker 行程內的標籤索引，其他行程的異動透過版本戳記得知
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot = None
+        self.checked_at = 0.0
+
+    def invalidate(self):
+        self.snapshot = None
+
+    def get(self):
+        snapshot = self.snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self.checked_at < settings.CATALOG_VERSION_CHECK_INTERVAL:
+            return snapshot
+
+        version = get_version(TAGS)
+        self.checked_at = now
+        if snapshot is not None and snapshot.version == version:
+            record_cache(TAGS, True)
+            return snapshot
+
+        record_cache(TAGS, False)
+        with self.lock:
+            if self.snapshot is None or self.snapshot.version != version:
+                self.snapshot = self.load(version)
+            return self.snapshot
+
+    def load(self, version):
+        return TagSnapshot(
+            version,
+            list(
+                QuestionTag.objects.annotate(usage_count=Count("question_relations"))
+                .values("id", "name", "category", "usage_count")
+            ),
+        )
+
+    def search(self, prefix, category=None, limit=10):
+        """以名稱前綴搜尋標籤，依使用次數排序"""
+        return self.get().search(prefix, category, limit)
+
+
+tag_index = TagIndex()
+
+
+def tags_changed():
+    """標籤或標籤關聯異動後呼叫 (交易提交後生效)"""
+    bump_version(TAGS)
+    transaction.on_commit(tag_index.invalidate)
@@ -0,0 +1,241 @@
+"""
+自動標籤：以 Aho-Corasick 自動機一次掃描題目、選項與解析，找出所有標籤名稱與法條引用。
+
+- 標籤名稱：所有 QuestionTag 名稱 (NFKC、小寫)，被較長標籤完整包含的較短標籤不重複標記。
+- 法條引用：法規名稱 (LAW_NAMES 與現有「法條」標籤的法規) 之後緊接「第…條(之…)」，
+  條號可為阿拉伯或中文數字；「同法」沿用前一個法規。
+  標準化為「民法第184條」「民法第184條之1」，標籤不存在時建立 (分類「法條」)。
+
+掃描時間與文字長度成正比，與標籤數量無關；自動機於每次匯入或回填時建立一次。
+"""
+import re
+import time
+import unicodedata
+from collections import defaultdict, deque
+
+from django.db import transaction
+
+from question_bank.models import Question, QuestionOption, QuestionTag, QuestionTagRelation
+from . import payloads
+from .tag_index import tags_changed
+
+
+ARTICLE_CATEGORY = "法條"
+# 單字標籤太容易誤判，不自動標記
+MIN_TAG_LENGTH = 2
+BATCH_SIZE = 500
+
+LAW_NAMES = [
+    "憲法", "憲法增修條文", "憲法訴訟法", "民法", "刑法", "刑法施行法", "民事訴訟法", "刑事訴訟法",
+    "行政程序法", "行政訴訟法", "行政罰法", "行政執行法", "訴願法", "國家賠償法", "地方制度法",
+    "公務員懲戒法", "公司法", "票據法", "保險法", "海商法", "證券交易法", "強制執行法", "破產法",
+    "家事事件法", "非訟事件法", "土地法", "勞動基準法", "消費者保護法", "著作權法", "專利法", "商標法",
+    "公平交易法", "涉外民事法律適用法", "少年事件處理法", "國民法官法", "政府資訊公開法",
+]
+SAME_LAW = "同法"
+
+_DIGITS = {"零": 0, "〇": 0, "一": 1, "二": 2, "兩": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9}
+_UNITS = {"十": 10, "百": 100, "千": 1000}
+_NUMBER = r"[0-9零〇一二兩三四五六七八九十百千]+"
+ARTICLE = re.compile(rf"\s*第\s*({_NUMBER})\s*條(?:\s*之\s*({_NUMBER}))?")
+ARTICLE_NAME = re.compile(r"^(.+?)第(\d+)條(?:之(\d+))?$")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def parse_number(text):
+    """阿拉伯或中文數字 (一百八十四、一八四、十二) 轉為整數"""
+    if text.isdigit():
+        return int(text)
+    if not any(char in _UNITS for char in text):
+        return int("".join(str(_DIGITS[char]) for char in text))
+    total = digit = 0
+    for char in text:
+        if char in _DIGITS:
+            digit = _DIGITS[char]
+        else:
+            total += (digit or 1) * _UNITS[char]
+            digit = 0
+    return total + digit
+
+
+def article_name(law, number, sub_number=None):
+    name = f"{law}第{number}條"
+    return f"{name}之{sub_number}" if sub_number else name
+
+
+class Automaton:
+    """
+    Aho-Corasick 自動機：find() 一次掃描文字，回傳所有出現的 (起點, 終點, 值)
+    """
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern, value in patterns.items():
+            node = 0
+            for char in pattern:
+                child = self.goto[node].get(char)
+                if child is None:
+                    child = len(self.goto)
+                    self.goto[node][char] = child
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                node = child
+            self.output[node].append((len(pattern), value))
+
+        # 以廣度優先建立失敗連結，並合併失敗節點的輸出
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value in output[node]:
+                yield end - length, end, value
+
+
+class AutoTagger:
+    """
+    由目前的標籤建立自動機；tag() 回傳文字中出現的標籤 id 與尚未建立的法條標籤名稱
+    """
+    def __init__(self, tags=None):
+        if tags is None:
+            tags = QuestionTag.objects.values_list("id", "name", "category")
+        self.tag_ids = {}
+        laws = set(LAW_NAMES)
+        patterns = {}
+        for tag_id, name, category in tags:
+            name = normalize(name).strip()
+            self.tag_ids[name] = tag_id
+            if len(name) >= MIN_TAG_LENGTH:
+                patterns[name] = ("tag", tag_id)
+            if category == ARTICLE_CATEGORY:
+                match = ARTICLE_NAME.match(name)
+                if match:
+                    laws.add(match.group(1))
+        # 法規名稱若同時是標籤名稱 (例如「民法」)，兩者都要保留
+        self.automaton = Automaton(patterns)
+        self.laws = Automaton({normalize(law): law for law in laws | {SAME_LAW}})
+
+    def tag(self, text):
+        """回傳 (標籤 id 集合, 需建立的法條標籤名稱集合)"""
+        text = normalize(text)
+        spans = sorted(self.automaton.find(text), key=lambda span: (span[0], -span[1]))
+        tag_ids = set()
+        covered = 0
+        for start, end, (_, tag_id) in spans:
+            # 略過被較長標籤完整包含的標籤
+            if end <= covered:
+                continue
+            covered = end
+            tag_ids.add(tag_id)
+
+        missing = set()
+        previous_law = None
+        covered = 0
+        for start, end, law in sorted(self.laws.find(text), key=lambda span: (span[0], -span[1])):
+            match = ARTICLE.match(text, end)
+            if match is None or end <= covered:
+                continue
+            if law == SAME_LAW:
+                if previous_law is None:
+                    continue
+                law = previous_law
+            previous_law = law
+            covered = match.end()
+            name = article_name(law, parse_number(match.group(1)), match.group(2) and parse_number(match.group(2)))
+            tag_id = self.tag_ids.get(normalize(name))
+            if tag_id is None:
+                missing.add(name)
+            else:
+                tag_ids.add(tag_id)
+        return tag_ids, missing
+
+    def create_tags(self, names):
+        """建立法條標籤並加入對照表 (自動機不需重建，法條以法規名稱比對)"""
+        QuestionTag.objects.bulk_create(
+            [QuestionTag(name=name, category=ARTICLE_CATEGORY) for name in names], ignore_conflicts=True,
+        )
+        for tag_id, name in QuestionTag.objects.filter(name__in=names).values_list("id", "name"):
+            self.tag_ids[normalize(name)] = tag_id
+
+
+def question_texts(question_ids):
+    """{題目 id: 題目、選項與解析合併的文字}"""
+    options = defaultdict(list)
+    for question_id, content in QuestionOption.objects.filter(question_id__in=question_ids).values_list(
+        "question_id", "content",
+    ):
+        options[question_id].append(content)
+    return {
+        question_id: "\n".join([content, *options[question_id], analysis, explanation])
+        for question_id, content, analysis, explanation in Question.objects.filter(id__in=question_ids)
+        .values_list("id", "content", "analysis", "answer_explanation")
+    }
+
+
+def tag_questions(question_ids, tagger=None, dry_run=False):
+    """
+    為題目加上自動標籤 (保留既有標籤)，回傳 (新增的關聯數, 新建立的法條標籤數, 掃描字數)
+    """
+    tagger = tagger or AutoTagger()
+    texts = question_texts(list(question_ids))
+    found = {question_id: tagger.tag(text) for question_id, text in texts.items()}
+    characters = sum(map(len, texts.values()))
+    new_tags = {name for _, names in found.values() for name in names if normalize(name) not in tagger.tag_ids}
+    if dry_run:
+        return sum(len(tag_ids) + len(names) for tag_ids, names in found.values()), len(new_tags), characters
+
+    with transaction.atomic():
+        if new_tags:
+            tagger.create_tags(new_tags)
+        existing = set(
+            QuestionTagRelation.objects.filter(question_id__in=list(found)).values_list("question_id", "tag_id")
+        )
+        relations = [
+            QuestionTagRelation(question_id=question_id, tag_id=tag_id)
+            for question_id, (tag_ids, names) in found.items()
+            for tag_id in tag_ids | {tagger.tag_ids[normalize(name)] for name in names}
+            if (question_id, tag_id) not in existing
+        ]
+        QuestionTagRelation.objects.bulk_create(relations, batch_size=1000, ignore_conflicts=True)
+        if relations or new_tags:
+            tags_changed()
+        payloads.invalidate({relation.question_id for relation in relations})
+    return len(relations), len(new_tags), characters
+
+
+def backfill(question_ids, batch_size=BATCH_SIZE, dry_run=False, progress=None):
+    """分批為所有指定題目加上自動標籤，回傳統計資料"""
+    started = time.perf_counter()
+    tagger = AutoTagger()
+    compiled = time.perf_counter()
+    stats = {"questions": 0, "relations": 0, "tags": 0, "characters": 0}
+    for start in range(0, len(question_ids), batch_size):
+        batch = question_ids[start:start + batch_size]
+        relations, tags, characters = tag_questions(batch, tagger, dry_run=dry_run)
+        stats["questions"] += len(batch)
+        stats["relations"] += relations
+        stats["tags"] += tags
+        stats["characters"] += characters
+        if progress:
+            progress(stats)
+    stats["compile_seconds"] = compiled - started
+    stats["seconds"] = time.perf_counter() - compiled
+    return stats
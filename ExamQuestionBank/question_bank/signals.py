@@ -0,0 +1,109 @@
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+
+from exams.models import ExamSession
+from .models import Question, QuestionOption, QuestionSet, QuestionTag, QuestionTagRelation
+from .services import bundles, duplicates, grading, payloads
+from .services.tag_index import tags_changed
+
+
+@receiver(post_save, sender=Question)
+def index_question_fingerprint(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    duplicates.schedule_index(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def index_option_fingerprint(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    duplicates.schedule_index(instance.question_id)
+
+
+@receiver([post_save, post_delete], sender=QuestionTag)
+@receiver([post_save, post_delete], sender=QuestionTagRelation)
+def bump_tag_version(sender, raw=False, **kwargs):
+    if raw:
+        return
+    tags_changed()
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+@receiver([post_save, post_delete], sender=QuestionTagRelation)
+def invalidate_question_payload(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    payloads.schedule_invalidate(instance.question_id)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_created_by_payloads(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    # 片段含建立者名稱 (created_by_username)；登入只更新 last_login，不需處理
+    if raw or created or (update_fields is not None and 'username' not in update_fields):
+        return
+    payloads.schedule_invalidate_created_by(instance.pk)
+
+
+@receiver(post_save, sender=QuestionTag)
+@receiver(pre_delete, sender=QuestionTag)
+def invalidate_tagged_payloads(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    payloads.invalidate_tag(instance.pk)
+
+
+@receiver(pre_save, sender=Question)
+@receiver(pre_save, sender=QuestionSet)
+def remember_paper(sender, instance, raw=False, **kwargs):
+    instance._previous_paper = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_paper = (
+        sender.objects.filter(pk=instance.pk).values_list('exam_session_id', 'subject_id').first()
+    )
+
+
+@receiver([post_save, post_delete], sender=Question)
+@receiver([post_save, post_delete], sender=QuestionSet)
+def rebuild_paper_bundle(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bundles.schedule_build(instance.exam_session_id, instance.subject_id)
+    # 移到其他場次或科目時，原本的試卷包也需重建
+    previous = getattr(instance, '_previous_paper', None)
+    if previous is not None and previous != (instance.exam_session_id, instance.subject_id):
+        bundles.schedule_build(*previous)
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def rebuild_option_paper_bundle(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bundles.schedule_questions([instance.question_id])
+
+
+@receiver(post_save, sender=ExamSession)
+def rebuild_session_paper_bundles(sender, instance, raw=False, **kwargs):
+    # 發布狀態改變時建立或刪除整個場次的試卷包
+    if raw:
+        return
+    bundles.schedule_build(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=QuestionOption)
+def invalidate_option_answer_key(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    grading.answer_keys_changed([instance.question_id])
+
+
+@receiver([post_save, post_delete], sender=Question)
+def invalidate_question_answer_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    # 題型與答案說明 (一律給分) 影響評分，科目與場次影響排行榜
+    fields = {'question_type', 'answer_explanation', 'subject', 'subject_id', 'exam_session', 'exam_session_id'}
+    if raw or (update_fields is not None and not fields & set(update_fields)):
+        return
+    previous = getattr(instance, '_previous_paper', None)
+    grading.answer_keys_changed([instance.pk], [instance.subject_id] + ([previous[1]] if previous else []))
@@ -1,3 +1,214 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from exams.models import ExamSeries, ExamSession, Subject
+from users.models import User
+from .models import PaperBundle, PracticeSession, Question, QuestionTag, QuestionTagRelation
+from .services.admission import AdmissionController, AdmissionRejected
+from .services.bundles import bundle_path
+
+
+def ordered_by_accuracy(queries, table, descending=False):
+    """擷取的查詢中是否有依 table 的 accuracy_rate 排序者"""
+    column = f"{connection.ops.quote_name(table)}.{connection.ops.quote_name('accuracy_rate')}"
+    order = f"ORDER BY {column} {'DESC' if descending else 'ASC'}"
+    return any(order in query['sql'] for query in queries)
+
+
+class AccuracyOrderingTests(TestCase):
+    """答對率由資料庫欄位排序 (?ordering=accuracy_rate)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='pw')
+        series = ExamSeries.objects.create(name='律師', code='LAW')
+        session = ExamSession.objects.create(exam_series=series, year=2024)
+        subject = Subject.objects.create(name='民法', code='CIV')
+        # 答對率：1 號 90%、2 號 10%、3 號 0% (無作答)、4 號 50%
+        for number, attempts, correct in [('1', 10, 9), ('2', 10, 1), ('3', 0, 0), ('4', 50, 25)]:
+            Question.objects.create(
+                exam_session=session, subject=subject, question_number=number, content=f'題目 {number}',
+                status='published', is_public=True, attempt_count=attempts, correct_count=correct,
+            )
+        # 答對率：simulation 75%、historical 20%、mixed 0% (未作答)
+        for mode, answered, correct in [('simulation', 4, 3), ('historical', 5, 1), ('mixed', 0, 0)]:
+            PracticeSession.objects.create(
+                user=cls.user, mode=mode, total_questions=5, answered_questions=answered, correct_answers=correct,
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, name, ordering):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(name), {'ordering': ordering})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'], queries.captured_queries
+
+    def test_question_list_ascending(self):
+        results, queries = self.get('question-list', 'accuracy_rate')
+        self.assertEqual([row['question_number'] for row in results], ['3', '2', '4', '1'])
+        self.assertEqual([row['accuracy_rate'] for row in results], [0.0, 10.0, 50.0, 90.0])
+        self.assertTrue(ordered_by_accuracy(queries, 'questions'))
+
+    def test_question_list_descending(self):
+        results, queries = self.get('question-list', '-accuracy_rate')
+        self.assertEqual([row['question_number'] for row in results], ['1', '4', '2', '3'])
+        self.assertTrue(ordered_by_accuracy(queries, 'questions', descending=True))
+
+    def test_practice_session_list_ascending(self):
+        results, queries = self.get('practice-session-list', 'accuracy_rate')
+        self.assertEqual([row['mode'] for row in results], ['mixed', 'historical', 'simulation'])
+        self.assertEqual([row['accuracy_rate'] for row in results], [0.0, 20.0, 75.0])
+        self.assertTrue(ordered_by_accuracy(queries, 'practice_sessions'))
+
+    def test_practice_session_list_descending(self):
+        results, queries = self.get('practice-session-list', '-accuracy_rate')
+        self.assertEqual([row['mode'] for row in results], ['simulation', 'historical', 'mixed'])
+        self.assertTrue(ordered_by_accuracy(queries, 'practice_sessions', descending=True))
+
+
+class TagRelationInvalidationTests(TestCase):
+    """刪除題目標籤關聯後，預先產生的題目 JSON 不再包含該標籤"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='student', email='student@example.com', password='pw')
+        series = ExamSeries.objects.create(name='律師', code='LAW')
+        session = ExamSession.objects.create(exam_series=series, year=2024)
+        subject = Subject.objects.create(name='民法', code='CIV')
+        cls.question = Question.objects.create(
+            exam_session=session, subject=subject, question_number='1', content='題目 1',
+            status='published', is_public=True,
+        )
+        cls.tag = QuestionTag.objects.create(name='民法第184條')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def tags(self):
+        response = self.client.get(reverse('question-detail', args=[self.question.pk]))
+        self.assertEqual(response.status_code, 200)
+        return [tag['name'] for tag in response.json()['tags']]
+
+    def test_delete_relation(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            relation = QuestionTagRelation.objects.create(question=self.question, tag=self.tag)
+        self.assertEqual(self.tags(), ['民法第184條'])
+        with self.captureOnCommitCallbacks(execute=True):
+            relation.delete()
+        self.assertEqual(self.tags(), [])
+
+
+class PaperBundleMoveTests(TestCase):
+    """題目移到其他科目後，原科目的試卷包一併重建"""
+
+    @classmethod
+    def setUpTestData(cls):
+        series = ExamSeries.objects.create(name='律師', code='LAW')
+        cls.session = ExamSession.objects.create(exam_series=series, year=2024, is_published=True)
+        cls.civil = Subject.objects.create(name='民法', code='CIV')
+        cls.criminal = Subject.objects.create(name='刑法', code='CRIM')
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings_override = override_settings(PAPER_BUNDLE_DIR=directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_question(self, number, subject):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Question.objects.create(
+                exam_session=self.session, subject=subject, question_number=number, content=f'題目 {number}',
+                status='published', is_public=True,
+            )
+
+    def bundle(self, subject):
+        return PaperBundle.objects.filter(exam_session=self.session, subject=subject).first()
+
+    def test_move_rebuilds_old_bundle(self):
+        question = self.create_question('1', self.civil)
+        self.create_question('2', self.civil)
+        old = self.bundle(self.civil)
+        self.assertEqual(old.question_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question.subject = self.criminal
+            question.save()
+
+        self.assertEqual(self.bundle(self.civil).question_count, 1)
+        self.assertEqual(self.bundle(self.criminal).question_count, 1)
+        self.assertFalse(os.path.exists(bundle_path(old.file_name)))
+
+    def test_move_last_question_deletes_old_bundle(self):
+        question = self.create_question('1', self.civil)
+        old = self.bundle(self.civil)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            question.subject = self.criminal
+            question.save()
+
+        self.assertIsNone(self.bundle(self.civil))
+        self.assertFalse(os.path.exists(bundle_path(old.file_name)))
+        self.assertEqual(self.bundle(self.criminal).question_count, 1)
+
+
+class AdmissionQueueTests(SimpleTestCase):
+    """准入控制的佇列：先進先出、排隊中的請求計入個人上限、空出的名額交給新進的請求"""
+
+    def setUp(self):
+        self.controller = AdmissionController('test', 'PDF_ADMISSION')
+        self.woken = []
+
+    def enter(self, user_id):
+        return self.controller._enter(user_id, lambda: self.woken.append(user_id))
+
+    @override_settings(PDF_ADMISSION_MAX_CONCURRENT=1, PDF_ADMISSION_PER_USER=2, PDF_ADMISSION_QUEUE_SIZE=10)
+    def test_first_in_first_out(self):
+        self.assertIsNone(self.enter(1))
+        second, third = self.enter(2), self.enter(3)
+        self.assertEqual([waiter.user_id for waiter in self.controller.waiters], [2, 3])
+
+        self.controller.release(1)
+        self.assertTrue(second.admitted)
+        self.assertFalse(third.admitted)
+        self.assertEqual(self.woken, [2])
+
+        self.controller.release(2)
+        self.assertTrue(third.admitted)
+        self.assertEqual(self.woken, [2, 3])
+
+    @override_settings(PDF_ADMISSION_MAX_CONCURRENT=1, PDF_ADMISSION_PER_USER=2, PDF_ADMISSION_QUEUE_SIZE=10)
+    def test_queued_requests_count_toward_user_limit(self):
+        self.assertIsNone(self.enter(1))
+        waiter = self.enter(1)
+        with self.assertRaises(AdmissionRejected) as rejected:
+            self.enter(1)
+        self.assertEqual(rejected.exception.reason, 'user_limit')
+
+        # 離開佇列後不再計入
+        self.assertFalse(self.controller._leave_queue(waiter))
+        self.assertIsNotNone(self.enter(1))
+
+    @override_settings(PDF_ADMISSION_MAX_CONCURRENT=2, PDF_ADMISSION_PER_USER=2, PDF_ADMISSION_QUEUE_SIZE=10)
+    def test_free_slot_goes_to_new_waiter(self):
+        self.assertIsNone(self.enter(1))
+        self.assertIsNone(self.enter(2))
+        blocked = self.enter(1)
+        # 個人上限調降後，排在最前面的請求無法取得名額
+        with override_settings(PDF_ADMISSION_PER_USER=1):
+            self.controller.release(2)
+            self.assertFalse(blocked.admitted)
+            self.assertIsNone(self.enter(3))
+        self.assertEqual(self.controller.active, 2)
+        self.assertEqual([waiter.user_id for waiter in self.controller.waiters], [1])
@@ -1,7 +1,32 @@
 from django.urls import path
-from .views import ExtractExamPDFView, ExtractAnswerPDFView
+from .views import (
+    ExtractExamPDFView, ExtractAnswerPDFView, QuestionListView, QuestionDetailView, QuestionExportView,
+    QuestionDuplicatesView, DuplicateCheckView, RelatedQuestionsView, TagAutocompleteView,
+    PaperBundleView, PaperBundleFileView,
+    QuestionAttemptView, AttemptBatchView, LeaderboardView, QuestionNoteListView, QuestionNoteDetailView,
+    PracticeSessionListView, AttemptStatsView, AsyncExtractExamPDFView, AsyncExtractAnswerPDFView
+)
 
 urlpatterns = [
+    path("questions/", QuestionListView.as_view(), name="question-list"),
+    path("questions/<int:pk>/", QuestionDetailView.as_view(), name="question-detail"),
+    path("questions/export/", QuestionExportView.as_view(), name="question-export"),
+    path("questions/<int:pk>/duplicates/", QuestionDuplicatesView.as_view(), name="question-duplicates"),
+    path("questions/<int:pk>/related/", RelatedQuestionsView.as_view(), name="question-related"),
+    path("questions/duplicates/check/", DuplicateCheckView.as_view(), name="question-duplicate-check"),
+    path("questions/<int:pk>/attempts/", QuestionAttemptView.as_view(), name="question-attempt"),
+    path("questions/<int:pk>/notes/", QuestionNoteListView.as_view(), name="question-notes"),
+    path("notes/<int:pk>/", QuestionNoteDetailView.as_view(), name="note-detail"),
+    path("tags/autocomplete/", TagAutocompleteView.as_view(), name="tag-autocomplete"),
+    path("papers/<int:session_id>/<int:subject_id>/", PaperBundleView.as_view(), name="paper-bundle"),
+    path("papers/bundles/<str:file_name>", PaperBundleFileView.as_view(), name="paper-bundle-file"),
+    path("practice-sessions/", PracticeSessionListView.as_view(), name="practice-session-list"),
+    path("attempts/batch/", AttemptBatchView.as_view(), name="attempt-batch"),
+    path("leaderboards/<str:scope>/<int:scope_id>/", LeaderboardView.as_view(), name="leaderboard"),
+    path("attempts/stats/", AttemptStatsView.as_view(), name="attempt-stats"),
     path("extract-questions-pdf/", ExtractExamPDFView.as_view(), name="extract-questions_pdf"),
     path("extract-answers-pdf/", ExtractAnswerPDFView.as_view(), name="extract-answers_pdf"),
+    # ASGI 部署時使用，解析期間不佔用 worker
+    path("async/extract-questions-pdf/", AsyncExtractExamPDFView.as_view(), name="extract-questions_pdf_async"),
+    path("async/extract-answers-pdf/", AsyncExtractAnswerPDFView.as_view(), name="extract-answers_pdf_async"),
 ]
\ No newline at end of file
@@ -1,14 +1,554 @@
+import gzip
+import os
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db.models import Count, F, Q, Sum
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified, HttpResponseRedirect, JsonResponse, StreamingHttpResponse,
+)
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import parse_etags
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, NotFound, Throttled, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics, status
 from rest_framework.parsers import MultiPartParser, FormParser
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from exams.catalog import catalog
+from exams.subject_tree import descendants
+from users.permissions import (
+    HasObjectPermission, ObjectPermissionFilter, ObjectPermissionPrefetchMixin, is_unrestricted, visible_filter,
+)
+from .filters import QuestionFilter, PracticeSessionFilter, QuestionAttemptFilter
+from .models import PaperBundle, PracticeSession, Question, QuestionAttempt, QuestionNote
+from .serializers import (
+    QuestionListSerializer, QuestionDetailSerializer, PracticeSessionSerializer,
+    SimilarQuestionSerializer, DuplicateQuerySerializer, DuplicateCheckSerializer,
+    TagSuggestionSerializer, TagAutocompleteQuerySerializer,
+    AttemptAnswerSerializer, AttemptBatchSerializer, AttemptResultSerializer,
+    LeaderboardQuerySerializer, LeaderboardSerializer, SharedNoteSerializer,
+)
+from .services import archive, bundles, duplicates, export, grading, leaderboards, payloads, related
+from .services.tag_index import tag_index
+from .services.admission import AdmissionRejected, pdf_admission
+from .services.pdf_executor import run_parser
 from .services.pdf_parser import PDFParser
 
 
+def visible_questions(user):
+    """
+    管理員可看到所有未刪除的題目，其他使用者看到已發布的公開題目，
+    以及以 guardian 授權 view_question 的題目 (例如審題中的草稿，以子查詢過濾，不逐題檢查)
+    """
+    questions = Question.objects.filter(deleted_at__isnull=True)
+    if is_unrestricted(user):
+        return questions
+    return questions.filter(visible_filter(user, Question, public=Q(status='published', is_public=True)))
+
+
+def json_bytes_response(content):
+    """已輸出的 JSON 位元組 (略過 DRF 的序列化與 renderer)"""
+    return HttpResponse(content, content_type='application/json')
+
+
+class QuestionListView(generics.ListAPIView):
+    """
+    題目列表 (subject 參數包含下層科目)
+    """
+    serializer_class = QuestionListSerializer
+    filterset_class = QuestionFilter
+    search_fields = ['content', 'question_number']
+    ordering_fields = ['question_number', 'difficulty', 'attempt_count', 'accuracy_rate', 'view_count', 'created_at']
+
+    def get_queryset(self):
+        return visible_questions(self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # JSON 回應直接串接預先產生的片段，瀏覽器介面仍使用序列化器
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return json_bytes_response(payloads.render_list(list(queryset)))
+        envelope = self.get_paginated_response(None).data
+        envelope.pop('results')
+        return json_bytes_response(
+            JSONRenderer().render(envelope)[:-1] + b',"results":' + payloads.render_list(page) + b'}'
+        )
+
+
+class QuestionDetailView(generics.RetrieveAPIView):
+    """
+    題目詳細資料 (含選項與標籤)
+    """
+    serializer_class = QuestionDetailSerializer
+
+    def get_queryset(self):
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format == 'json':
+            # 選項與標籤已在預先產生的片段中
+            return visible_questions(self.request.user)
+        return (
+            visible_questions(self.request.user)
+            .select_related('created_by')
+            .prefetch_related('options', 'tag_relations__tag')
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().retrieve(request, *args, **kwargs)
+        [fragment] = payloads.fragments([self.get_object()], payloads.DETAIL)
+        return json_bytes_response(fragment)
+
+
+class QuestionExportView(generics.GenericAPIView):
+    """
+    匯出題目 (可使用與題目列表相同的篩選條件)，以串流回應輸出，記憶體用量不隨題數增加
+    """
+    filterset_class = QuestionFilter
+    search_fields = ['content', 'question_number']
+    ordering_fields = ['question_number', 'difficulty', 'attempt_count', 'accuracy_rate', 'view_count', 'created_at']
+    formats = {
+        'jsonl': 'application/x-ndjson; charset=utf-8',
+        'csv': 'text/csv; charset=utf-8',
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    }
+
+    def get_queryset(self):
+        return visible_questions(self.request.user)
+
+    @swagger_auto_schema(
+        operation_summary="匯出題目",
+        manual_parameters=[
+            openapi.Parameter(
+                name='file_format', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                enum=['jsonl', 'csv', 'xlsx'], default='jsonl', description='匯出格式',
+            ),
+        ],
+        responses={200: "匯出檔案"},
+    )
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'jsonl')
+        if file_format not in self.formats:
+            return Response({"error": "不支援的匯出格式"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = export.export_rows(self.filter_queryset(self.get_queryset()))
+        filename = f"questions-{timezone.localtime():%Y%m%d-%H%M%S}.{file_format}"
+        if file_format == 'xlsx':
+            response = FileResponse(
+                export.xlsx_file(rows), as_attachment=True, filename=filename,
+                content_type=self.formats[file_format],
+            )
+        else:
+            stream = export.jsonl_stream(rows) if file_format == 'jsonl' else export.csv_stream(rows)
+            response = StreamingHttpResponse(stream, content_type=self.formats[file_format])
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+        if isinstance(request._request, ASGIRequest):
+            response.streaming_content = export.async_chunks(iter(response.streaming_content))
+        return response
+
+
+def similar_questions_response(request, matches):
+    """依相似度排序回傳使用者可見的近似題目"""
+    scores = dict(matches)
+    questions = visible_questions(request.user).in_bulk(list(scores))
+    return Response(SimilarQuestionSerializer(
+        [questions[question_id] for question_id, _ in matches if question_id in questions],
+        many=True, context={'scores': scores},
+    ).data)
+
+
+class QuestionDuplicatesView(APIView):
+    """
+    與指定題目近似的題目 (近似重複題)
+    """
+    @swagger_auto_schema(
+        operation_summary="近似重複題",
+        query_serializer=DuplicateQuerySerializer,
+        responses={200: SimilarQuestionSerializer(many=True)},
+    )
+    def get(self, request, pk):
+        if not visible_questions(request.user).filter(pk=pk).exists():
+            return Response({"error": "找不到題目"}, status=status.HTTP_404_NOT_FOUND)
+        params = DuplicateQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        matches = duplicates.similar_to(pk, threshold=data.get('threshold'), limit=data['limit'])
+        return similar_questions_response(request, matches)
+
+
+class RelatedQuestionsView(APIView):
+    """
+    相關題目 (其他場次中內容相近的題目，由 update_related_questions 預先計算)
+    """
+    @swagger_auto_schema(
+        operation_summary="相關題目",
+        manual_parameters=[
+            openapi.Parameter(name='limit', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='最多回傳題數'),
+        ],
+        responses={200: SimilarQuestionSerializer(many=True)},
+    )
+    def get(self, request, pk):
+        if not visible_questions(request.user).filter(pk=pk).exists():
+            return Response({"error": "找不到題目"}, status=status.HTTP_404_NOT_FOUND)
+        limit = request.query_params.get('limit', '')
+        limit = min(int(limit), related.TOP_K) if limit.isdigit() else related.TOP_K
+        questions = list(
+            visible_questions(request.user)
+            .filter(related_from__question_id=pk)
+            .annotate(score=F('related_from__score'), rank=F('related_from__rank'))
+            .order_by('rank')[:limit]
+        )
+        return Response(SimilarQuestionSerializer(
+            questions, many=True, context={'scores': {question.id: question.score for question in questions}},
+        ).data)
+
+
+class DuplicateCheckView(APIView):
+    """
+    匯入或編輯前檢查題目 (尚未儲存) 是否與題庫中的題目近似
+    """
+    @swagger_auto_schema(
+        operation_summary="檢查近似重複題",
+        request_body=DuplicateCheckSerializer,
+        responses={200: SimilarQuestionSerializer(many=True)},
+    )
+    def post(self, request):
+        serializer = DuplicateCheckSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        matches = duplicates.find_similar(
+            data['content'], data['options'], threshold=data.get('threshold'), limit=data['limit'],
+        )
+        return similar_questions_response(request, matches)
+
+
+class TagAutocompleteView(APIView):
+    """
+    標籤自動完成：以名稱前綴搜尋，依使用次數排序 (由行程內的標籤索引回應，不查詢資料庫)
+    """
+    @swagger_auto_schema(
+        operation_summary="標籤自動完成",
+        query_serializer=TagAutocompleteQuerySerializer,
+        responses={200: TagSuggestionSerializer(many=True)},
+    )
+    def get(self, request):
+        params = TagAutocompleteQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        return Response(tag_index.search(data['q'], data.get('category'), data['limit']))
+
+
+def etag_matches(request, etag):
+    """If-None-Match 以弱比較判斷 (可為清單、W/ 開頭的弱驗證碼或 *)"""
+    etags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in etags or any(value.removeprefix('W/') == etag for value in etags)
+
+
+def bundle_response(request, file_name, immutable):
+    """試卷包檔案：用戶端接受 gzip 時直接回傳壓縮檔"""
+    etag = bundles.bundle_etag(file_name)
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        path = bundles.bundle_path(file_name)
+        if 'gzip' in request.headers.get('Accept-Encoding', ''):
+            response = FileResponse(open(path, 'rb'), content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            with gzip.open(path, 'rb') as f:
+                response = HttpResponse(f.read(), content_type='application/json')
+    response['ETag'] = etag
+    response['Vary'] = 'Accept-Encoding'
+    if immutable:
+        # 檔名含內容雜湊，內容永遠不變
+        response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    else:
+        response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class PaperBundleView(APIView):
+    """
+    整份試卷 (已發布場次的一個科目，含題組、題目與選項)：回傳預先產生的試卷包，以內容雜湊作為 ETag。
+    Content-Location 為含內容雜湊、可長期快取的網址。
+    """
+    @swagger_auto_schema(
+        operation_summary="整份試卷",
+        responses={200: "試卷 JSON (exam_session, subject, question_sets, questions)", 304: "未變更", 404: "找不到試卷"},
+    )
+    def get(self, request, session_id, subject_id):
+        bundle = PaperBundle.objects.filter(exam_session_id=session_id, subject_id=subject_id).first()
+        if bundle is None:
+            # 尚未產生 (例如 bulk 匯入後尚未執行 build_paper_bundles)
+            bundle = bundles.build(session_id, subject_id)
+        if bundle is None:
+            return Response({"error": "找不到試卷"}, status=status.HTTP_404_NOT_FOUND)
+        if settings.PAPER_BUNDLE_URL:
+            response = HttpResponseRedirect(settings.PAPER_BUNDLE_URL + bundle.file_name)
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        response = bundle_response(request, bundle.file_name, immutable=False)
+        response['Content-Location'] = reverse('paper-bundle-file', args=[bundle.file_name])
+        return response
+
+
+class PaperBundleFileView(APIView):
+    """
+    試卷包檔案 (檔名含內容雜湊，可長期快取)
+    """
+    @swagger_auto_schema(operation_summary="試卷包檔案", responses={200: "試卷 JSON", 304: "未變更", 404: "找不到試卷"})
+    def get(self, request, file_name):
+        if not bundles.FILE_NAME.match(file_name) or not os.path.exists(bundles.bundle_path(file_name)):
+            return Response({"error": "找不到試卷"}, status=status.HTTP_404_NOT_FOUND)
+        return bundle_response(request, file_name, immutable=True)
+
+
+class NotePermissionsMixin:
+    """筆記的擁有者與公開條件 (非私人筆記所有人可讀取，私人筆記可用 guardian 分享)"""
+    permission_owner_field = 'user'
+    permission_public_filter = Q(is_private=False)
+
+    def is_public_object(self, obj):
+        return not obj.is_private
+
+
+class QuestionNoteListView(NotePermissionsMixin, ObjectPermissionPrefetchMixin, generics.ListCreateAPIView):
+    """
+    題目的筆記：自己的筆記、他人的公開筆記與分享給自己的筆記；新增時建立自己的筆記
+    """
+    serializer_class = SharedNoteSerializer
+    filter_backends = [ObjectPermissionFilter]
+
+    def get_question(self):
+        question = visible_questions(self.request.user).filter(pk=self.kwargs['pk']).first()
+        if question is None:
+            raise NotFound("找不到題目")
+        return question
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return QuestionNote.objects.none()
+        return (
+            QuestionNote.objects.filter(question=self.get_question())
+            .select_related('user').order_by('-updated_at')
+        )
+
+    def perform_create(self, serializer):
+        question = self.get_question()
+        if QuestionNote.objects.filter(user=self.request.user, question=question).exists():
+            raise ValidationError({"question": "此題已有筆記"})
+        serializer.save(user=self.request.user, question=question)
+
+
+class QuestionNoteDetailView(NotePermissionsMixin, generics.RetrieveUpdateDestroyAPIView):
+    """
+    筆記：擁有者可修改與刪除，他人需 guardian 授權
+    """
+    serializer_class = SharedNoteSerializer
+    permission_classes = [IsAuthenticated, HasObjectPermission]
+    filter_backends = [ObjectPermissionFilter]
+
+    def get_queryset(self):
+        return QuestionNote.objects.select_related('user')
+
+
+class PracticeSessionListView(generics.ListAPIView):
+    """
+    目前使用者的練習場次 (subject 參數包含下層科目)
+    """
+    serializer_class = PracticeSessionSerializer
+    filterset_class = PracticeSessionFilter
+    ordering_fields = ['started_at', 'completed_at', 'accuracy_rate']
+
+    def get_queryset(self):
+        return self.request.user.practice_sessions.all()
+
+
+def practice_session_for(user, session_id):
+    """目前使用者的練習場次 (未指定時為 None)"""
+    if session_id is None:
+        return None
+    session = PracticeSession.objects.filter(pk=session_id, user=user).first()
+    if session is None:
+        raise ValidationError({"practice_session": "找不到練習場次"})
+    return session
+
+
+def attempt_results(results):
+    return [
+        {"question": attempt.question_id, "is_correct": correct, "correct_options": labels}
+        for attempt, correct, labels in results
+    ]
+
+
+class QuestionAttemptView(APIView):
+    """
+    作答一題並回傳評分結果 (由行程內的答案索引評分)
+    """
+    @swagger_auto_schema(
+        operation_summary="作答",
+        request_body=AttemptAnswerSerializer,
+        responses={201: AttemptResultSerializer, 404: "找不到題目"},
+    )
+    def post(self, request, pk):
+        serializer = AttemptAnswerSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if not visible_questions(request.user).filter(pk=pk).exists():
+            return Response({"error": "找不到題目"}, status=status.HTTP_404_NOT_FOUND)
+        practice_session = practice_session_for(request.user, data.pop('practice_session', None))
+        try:
+            results = grading.record_attempts(request.user, [{**data, 'question': pk}], practice_session)
+        except grading.MissingQuestions as e:
+            raise ValidationError({"question": str(e)})
+        return Response(attempt_results(results)[0], status=status.HTTP_201_CREATED)
+
+
+class AttemptBatchView(APIView):
+    """
+    批次作答 (例如交卷)，所有題目以同一個答案索引查詢評分，作答紀錄一次寫入
+    """
+    @swagger_auto_schema(
+        operation_summary="批次作答",
+        request_body=AttemptBatchSerializer,
+        responses={201: AttemptResultSerializer(many=True)},
+    )
+    def post(self, request):
+        serializer = AttemptBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        question_ids = {answer['question'] for answer in data['attempts']}
+        missing = question_ids - set(
+            visible_questions(request.user).filter(id__in=question_ids).values_list('id', flat=True)
+        )
+        if missing:
+            raise ValidationError({"attempts": f"找不到題目：{', '.join(map(str, sorted(missing)))}"})
+        practice_session = practice_session_for(request.user, data.get('practice_session'))
+        try:
+            results = grading.record_attempts(request.user, data['attempts'], practice_session)
+        except grading.MissingQuestions as e:
+            raise ValidationError({"attempts": str(e)})
+        return Response(attempt_results(results), status=status.HTTP_201_CREATED)
+
+
+class LeaderboardView(APIView):
+    """
+    科目 (subject) 或考試別 (series) 的排行榜與目前使用者的名次 (由 Redis sorted set 回應，不彙總作答紀錄)
+    """
+    @swagger_auto_schema(
+        operation_summary="排行榜",
+        query_serializer=LeaderboardQuerySerializer,
+        responses={200: LeaderboardSerializer, 404: "找不到科目或考試別"},
+    )
+    def get(self, request, scope, scope_id):
+        params = LeaderboardQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        lookup = catalog.subject if scope == leaderboards.SUBJECT else catalog.series
+        if scope not in leaderboards.SCOPES or lookup(scope_id) is None:
+            return Response({"error": "找不到科目或考試別"}, status=status.HTTP_404_NOT_FOUND)
+
+        metric, window = params.validated_data['metric'], params.validated_data['window']
+        top, total, mine = leaderboards.board(
+            metric, scope, scope_id, window, user_id=request.user.id, limit=params.validated_data['limit'],
+        )
+        usernames = dict(get_user_model().objects.filter(id__in=[user_id for user_id, _ in top]).values_list('id', 'username'))
+
+        def score(value):
+            return round(value * 100, 2) if metric == leaderboards.ACCURACY else int(value)
+
+        return Response({
+            "metric": metric,
+            "window": window,
+            "total": total,
+            "entries": [
+                {"rank": rank, "user": user_id, "username": usernames.get(user_id, ''), "score": score(value)}
+                for rank, (user_id, value) in enumerate(top, start=1)
+            ],
+            "me": {
+                "rank": mine[0], "user": request.user.id, "username": request.user.username, "score": score(mine[1]),
+            } if mine else None,
+        }, status=status.HTTP_200_OK)
+
+
+class AttemptStatsView(APIView):
+    """
+    目前使用者的作答統計，依科目分組 (subject 參數包含下層科目；包含已封存的作答紀錄)
+    """
+    @swagger_auto_schema(
+        operation_summary="作答統計",
+        manual_parameters=[
+            openapi.Parameter(name='subject', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='科目 (含下層科目)'),
+            openapi.Parameter(name='exam_session', in_=openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='考試場次'),
+            openapi.Parameter(name='since', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='起始時間 (ISO 8601)'),
+            openapi.Parameter(name='until', in_=openapi.IN_QUERY, type=openapi.TYPE_STRING, description='結束時間 (ISO 8601)'),
+        ],
+    )
+    def get(self, request):
+        # 不評分的作答不列入統計
+        attempts = QuestionAttemptFilter(request.GET, queryset=request.user.question_attempts.filter(is_correct__isnull=False))
+        if not attempts.is_valid():
+            return Response({"error": attempts.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        totals = defaultdict(lambda: [0, 0, 0])
+        for row in (
+            attempts.qs
+            .values('question__subject_id')
+            .annotate(total=Count('id'), correct=Count('id', filter=Q(is_correct=True)), time_spent=Sum('time_spent'))
+            .order_by()
+        ):
+            totals[row['question__subject_id']] = [row['total'], row['correct'], row['time_spent'] or 0]
+
+        # 已封存 (archive_history) 的作答紀錄不在熱資料表，由封存檔補上
+        filters = attempts.form.cleaned_data
+        subject_ids = None
+        if filters.get('subject') is not None:
+            subject_ids = set(descendants(filters['subject']).values_list('descendant_id', flat=True))
+        archived = archive.question_attempt_totals(
+            request.user, subject_ids, filters.get('exam_session'),
+            since=filters.get('since'), until=filters.get('until'), is_correct=filters.get('is_correct'),
+        )
+        for subject_id, values in archived.items():
+            totals[subject_id] = [current + value for current, value in zip(totals[subject_id], values)]
+
+        total = sum(row[0] for row in totals.values())
+        correct = sum(row[1] for row in totals.values())
+        return Response({
+            "total": total,
+            "correct": correct,
+            "accuracy_rate": round(correct / total * 100, 2) if total else 0,
+            "subjects": [
+                {
+                    "subject": subject_id,
+                    "subject_name": catalog.subject_name(subject_id),
+                    "total": subject_total,
+                    "correct": subject_correct,
+                    "accuracy_rate": round(subject_correct / subject_total * 100, 2),
+                    "time_spent": time_spent,
+                }
+                for subject_id, (subject_total, subject_correct, time_spent) in sorted(totals.items())
+            ],
+        }, status=status.HTTP_200_OK)
+
+
 class ExtractExamPDFView(APIView):
     """
     將試卷 PDF 匯出為 json 並回傳
@@ -33,12 +573,15 @@ class ExtractExamPDFView(APIView):
             return Response({"error": "請上傳 PDF 檔案"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            questions = PDFParser.parse_questions(pdf_file)
+            with pdf_admission.admit(request.user.pk):
+                questions = PDFParser.parse_questions(pdf_file)
             return Response({
                 "count": len(questions),
                 "questions": questions,
             }, status=status.HTTP_200_OK)
 
+        except AdmissionRejected as e:
+            raise Throttled(wait=e.retry_after, detail="PDF 轉換忙碌中，請稍後再試")
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -67,12 +610,95 @@ class ExtractAnswerPDFView(APIView):
             return Response({"error": "請上傳 PDF 檔案"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            answers = PDFParser.parse_answers(pdf_file)
+            with pdf_admission.admit(request.user.pk):
+                answers = PDFParser.parse_answers(pdf_file)
             return Response({
                 "count": len(answers["answers"]),
                 "notes": answers["notes"],
                 "answers": answers["answers"],
             }, status=status.HTTP_200_OK)
 
+        except AdmissionRejected as e:
+            raise Throttled(wait=e.retry_after, detail="PDF 轉換忙碌中，請稍後再試")
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def authenticate(request):
+    """以 DRF 的驗證類別 (JWT / Session，含 Session 的 CSRF 檢查) 驗證非 DRF view 的請求"""
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    # CSRF 檢查會讀取 POST，需有解析器 (multipart 以 request.upload_handlers 寫入檔案)
+    parsers = [parser() for parser in api_settings.DEFAULT_PARSER_CLASSES]
+    try:
+        user = Request(request, parsers=parsers, authenticators=authenticators).user
+    except APIException:
+        return None
+    return user if user.is_authenticated else None
+
+
+def read_upload(request):
+    """解析 multipart 內容 (Session 驗證的 CSRF 檢查可能已先解析)"""
+    return request.FILES.get('file')
+
+
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncExtractPDFView(View):
+    """
+    ASGI 下的 PDF 轉換端點：上傳檔案寫入暫存檔，解析交給固定大小的 executor，
+    等待期間事件迴圈可繼續處理其他請求。
+    """
+    http_method_names = ['post']
+    kind = None
+
+    async def post(self, request):
+        # 上傳檔案一律寫入暫存檔；須在第一次解析 (驗證時的 CSRF 檢查讀取 POST) 前設定
+        request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        user = await sync_to_async(authenticate)(request)
+        if user is None:
+            return json_response({"error": "身分驗證失敗"}, status=401)
+
+        pdf_file = await sync_to_async(read_upload, thread_sensitive=False)(request)
+        if not pdf_file:
+            return json_response({"error": "請上傳 PDF 檔案"}, status=400)
+
+        try:
+            async with pdf_admission.async_admit(user.pk):
+                result = await run_parser(self.kind, pdf_file.temporary_file_path())
+        except AdmissionRejected as e:
+            response = json_response({"error": "PDF 轉換忙碌中，請稍後再試"}, status=429)
+            response["Retry-After"] = str(e.retry_after)
+            return response
         except Exception as e:
-            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+            return json_response({"error": str(e)}, status=500)
+        return json_response(self.render(result))
+
+
+class AsyncExtractExamPDFView(AsyncExtractPDFView):
+    """
+    將試卷 PDF 匯出為 json 並回傳 (ASGI)
+    """
+    kind = "questions"
+
+    def render(self, questions):
+        return {
+            "count": len(questions),
+            "questions": questions,
+        }
+
+
+class AsyncExtractAnswerPDFView(AsyncExtractPDFView):
+    """
+    將試卷答案 PDF 匯出答案並回傳 (ASGI)
+    """
+    kind = "answers"
+
+    def render(self, answers):
+        return {
+            "count": len(answers["answers"]),
+            "notes": answers["notes"],
+            "answers": answers["answers"],
+        }
@@ -0,0 +1,63 @@
+"""
+JWT 驗證：使用者資料快取於共用快取，每個請求不再查詢 users 資料表。
+
+- 使用者資料 (含 role) 快取 ACCESS_TOKEN_LIFETIME，使用者異動或停用時於交易提交後刪除 (users.signals)
+- 登出或撤銷的 access token 以 jti 記錄於快取至 token 過期，與使用者資料以同一次 get_many 檢查
+- refresh token 由 simplejwt 的 token_blacklist (以 jti 建立唯一索引) 於更新 token 時檢查
+
+多個 worker 需設定 REDIS_URL 共用快取，否則撤銷只在同一行程生效。
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from monitoring.metrics import record_cache
+
+
+AUTH_USERS = "auth-users"
+USER_KEY = "auth-user:{}"
+REVOKED_KEY = "revoked-token:{}"
+
+
+def invalidate_user(user_id):
+    """刪除快取的使用者資料 (交易提交後生效)"""
+    transaction.on_commit(lambda: cache.delete(USER_KEY.format(user_id)))
+
+
+def revoke_token(token):
+    """撤銷 access token 至其過期時間"""
+    remaining = int(token["exp"] - timezone.now().timestamp())
+    if remaining > 0:
+        cache.set(REVOKED_KEY.format(token[api_settings.JTI_CLAIM]), True, timeout=remaining)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    與 JWTAuthentication 相同，但使用者資料由快取取得，並檢查 access token 是否已撤銷
+    """
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken("Token 中沒有使用者識別")
+
+        user_key = USER_KEY.format(user_id)
+        revoked_key = REVOKED_KEY.format(validated_token.get(api_settings.JTI_CLAIM))
+        cached = cache.get_many([user_key, revoked_key])
+        if revoked_key in cached:
+            raise AuthenticationFailed("Token 已撤銷", code="token_revoked")
+
+        user = cached.get(user_key)
+        record_cache(AUTH_USERS, user is not None)
+        if user is None:
+            # 查詢並檢查使用者是否存在、是否啟用 (停用的使用者不會寫入快取)
+            user = super().get_user(validated_token)
+            cache.set(user_key, user, timeout=int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()))
+        elif api_settings.CHECK_REVOKE_TOKEN and (
+            validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password)
+        ):
+            raise AuthenticationFailed("密碼已變更", code="password_changed")
+        return user
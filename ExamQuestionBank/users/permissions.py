@@ -0,0 +1,162 @@
+"""
+物件權限 (django-guardian) 的批次檢查。
+
+列表端點若逐筆呼叫 user.has_perm(perm, obj)，每一列都會查詢一次權限資料表。此處改為：
+- ObjectPermissionFilter：以子查詢過濾查詢集 (擁有者、公開條件或 guardian 授權)，列表本身只有一次查詢
+- ObjectPermissions.prefetch：一次查詢 (使用者與群組權限 UNION) 取得整頁物件的權限，結果快取於本次請求
+- HasObjectPermission：DRF 權限類別，has_object_permission 使用同一個請求快取
+
+view 可設定：
+- permission_owner_field：擁有者欄位 (例如 "user")，擁有者有所有權限
+- permission_public_filter：所有人可讀取的條件 (Q)，例如非私人筆記
+- is_public_object(obj)：與 permission_public_filter 相同條件的物件判斷 (單筆檢查用)
+
+管理員 (is_staff 或 role 為 admin) 不受限制。
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Q
+from guardian.shortcuts import get_objects_for_user
+from guardian.utils import get_group_obj_perms_model, get_user_obj_perms_model
+from rest_framework import permissions
+from rest_framework.filters import BaseFilterBackend
+
+
+VIEW = "view"
+CHANGE = "change"
+DELETE = "delete"
+METHOD_ACTIONS = {"PUT": CHANGE, "PATCH": CHANGE, "DELETE": DELETE}
+
+
+def is_unrestricted(user):
+    return user.is_staff or user.is_superuser or getattr(user, "role", None) == "admin"
+
+
+def permission_name(model, action):
+    return f"{model._meta.app_label}.{action}_{model._meta.model_name}"
+
+
+def permitted(user, model, action=VIEW):
+    """使用者 (含所屬群組) 以 guardian 取得 action 權限的物件 id 子查詢"""
+    return get_objects_for_user(
+        user, permission_name(model, action), klass=model, accept_global_perms=False, with_superuser=False,
+    ).values("pk")
+
+
+def visible_filter(user, model, action=VIEW, owner_field=None, public=None):
+    """擁有者、公開條件或 guardian 授權之一成立的 Q"""
+    condition = Q(pk__in=permitted(user, model, action))
+    if owner_field:
+        condition |= Q(**{owner_field: user})
+    if public is not None:
+        condition |= public
+    return condition
+
+
+class ObjectPermissions:
+    """
+    一個請求內的物件權限快取：{(模型, action): 已檢查的 id}，以及其中有權限的 id
+    """
+    def __init__(self, user):
+        self.user = user
+        self.checked = {}
+        self.granted = {}
+
+    def filter(self, queryset, action=VIEW, owner_field=None, public=None):
+        if is_unrestricted(self.user):
+            return queryset
+        return queryset.filter(visible_filter(self.user, queryset.model, action, owner_field, public))
+
+    def prefetch(self, objects, action=VIEW):
+        """一次查詢取得 objects (同一模型) 尚未檢查的權限"""
+        objects = list(objects)
+        if not objects or is_unrestricted(self.user):
+            return
+        model = type(objects[0])
+        key = (model, action)
+        checked = self.checked.setdefault(key, set())
+        granted = self.granted.setdefault(key, set())
+        missing = {obj.pk for obj in objects} - checked
+        if not missing:
+            return
+
+        codename = f"{action}_{model._meta.model_name}"
+        content_type = ContentType.objects.get_for_model(model)
+        queries = []
+        for perms_model, owner in (
+            (get_user_obj_perms_model(model), {"user": self.user}),
+            (get_group_obj_perms_model(model), {"group__user": self.user}),
+        ):
+            # 一般的 guardian 權限表以字串 object_pk 對應，直接外鍵的權限表以 content_object_id 對應
+            generic = hasattr(perms_model, "object_pk")
+            field = "object_pk" if generic else "content_object_id"
+            queries.append(
+                perms_model.objects.filter(
+                    permission__content_type=content_type, permission__codename=codename,
+                    **{f"{field}__in": [str(pk) for pk in missing] if generic else list(missing)}, **owner,
+                ).values_list(field, flat=True)
+            )
+        values = {str(value) for value in queries[0].union(queries[1])}
+        checked.update(missing)
+        granted.update(pk for pk in missing if str(pk) in values)
+
+    def has_perm(self, obj, action=VIEW):
+        if is_unrestricted(self.user):
+            return True
+        key = (type(obj), action)
+        if obj.pk not in self.checked.get(key, ()):
+            self.prefetch([obj], action)
+        return obj.pk in self.granted[key]
+
+
+def object_permissions(request):
+    """本次請求的 ObjectPermissions (第一次呼叫時建立)"""
+    cached = getattr(request, "_object_permissions", None)
+    if cached is None or cached.user is not request.user:
+        cached = ObjectPermissions(request.user)
+        request._object_permissions = cached
+    return cached
+
+
+def is_owner(view, request, obj):
+    owner_field = getattr(view, "permission_owner_field", None)
+    return bool(owner_field) and getattr(obj, f"{owner_field}_id", None) == request.user.pk
+
+
+class ObjectPermissionFilter(BaseFilterBackend):
+    """
+    只列出使用者可讀取的物件 (擁有者、view 的 permission_public_filter 或 guardian 的 view 權限)
+    """
+    def filter_queryset(self, request, queryset, view):
+        return object_permissions(request).filter(
+            queryset, VIEW,
+            owner_field=getattr(view, "permission_owner_field", None),
+            public=getattr(view, "permission_public_filter", None),
+        )
+
+
+class HasObjectPermission(permissions.BasePermission):
+    """
+    擁有者或管理員有所有權限；讀取另可由公開條件或 guardian 的 view 權限取得，
+    修改與刪除需 guardian 的 change / delete 權限
+    """
+    def has_object_permission(self, request, view, obj):
+        if is_unrestricted(request.user) or is_owner(view, request, obj):
+            return True
+        action = METHOD_ACTIONS.get(request.method, VIEW)
+        if action == VIEW and getattr(view, "is_public_object", lambda obj: False)(obj):
+            return True
+        return object_permissions(request).has_perm(obj, action)
+
+
+class ObjectPermissionPrefetchMixin:
+    """
+    分頁後一次取得整頁物件的權限 (prefetch_permission_actions)，序列化時逐筆檢查不再查詢
+    """
+    prefetch_permission_actions = [CHANGE]
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        objects = page if page is not None else queryset
+        for action in self.prefetch_permission_actions:
+            object_permissions(self.request).prefetch(objects, action)
+        return page
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .authentication import invalidate_user
+from .models import User
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def blacklist_inactive_user_tokens(sender, instance, raw=False, **kwargs):
+    # 停用時撤銷所有 refresh token；access token 於使用者快取刪除後驗證失敗
+    if raw or instance.is_active:
+        return
+    tokens = OutstandingToken.objects.filter(user_id=instance.pk, blacklistedtoken__isnull=True)
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id in tokens.values_list("id", flat=True)],
+        ignore_conflicts=True,
+    )
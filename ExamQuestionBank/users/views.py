@@ -1,3 +1,20 @@
-from django.shortcuts import render
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.serializers import TokenBlacklistSerializer
 
-# Create your views here.
+from .authentication import revoke_token
+
+
+class LogoutView(APIView):
+    """
+    登出：將 refresh token 加入黑名單，並撤銷目前請求的 access token
+    """
+    @swagger_auto_schema(operation_summary="登出", request_body=TokenBlacklistSerializer, responses={205: "已登出"})
+    def post(self, request):
+        serializer = TokenBlacklistSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if request.auth is not None:
+            revoke_token(request.auth)
+        return Response(status=status.HTTP_205_RESET_CONTENT)